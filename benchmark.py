@@ -0,0 +1,440 @@
+#!/usr/bin/env python3
+"""
+排盘性能基准测试
+
+统计节气求解的星历观测次数、各入口的耗时，并对比各天文计算后端。
+
+用法：
+    python benchmark.py
+    python benchmark.py --years 1950 2050 --repeat 5
+    python benchmark.py --threads 64 --workers 1 2 4 8 --start-method spawn
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List
+import argparse
+import asyncio
+import http.client
+import json
+import logging
+import multiprocessing
+import os
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+
+import qimenpaipan
+from qimenpaipan import (
+    ASTRONOMY_BACKENDS, PLATE_TEMPLATE_COUNT, AstronomyCalculator, AstronomyConfig, BatchingBackend, GanzhiCalculator,
+    JieqiConstants, QiMenDunjiaPan, SkyfieldBackend, get_backend, get_calendar_index, iter_charts,
+    parallel_run, worker_config
+)
+from chart_server import ChartServer
+from worker_memory import init_memory_worker, memory_worker_chart
+
+
+class EphemerisCallCounter:
+    """统计 AstronomyCalculator.get_sun_longitude 的调用次数（星历观测次数）与观测时刻数"""
+
+    def __init__(self):
+        self.calls = 0
+        self.instants = 0
+        self._original = None
+
+    def __enter__(self):
+        self._original = AstronomyCalculator.__dict__['get_sun_longitude']
+        original = self._original.__func__
+
+        def counted(t):
+            self.calls += 1
+            self.instants += int(np.size(t.tt))
+            return original(t)
+
+        AstronomyCalculator.get_sun_longitude = staticmethod(counted)
+        return self
+
+    def __exit__(self, *exc):
+        AstronomyCalculator.get_sun_longitude = self._original
+
+
+def timed(func, repeat: int) -> float:
+    """返回多次运行的最短耗时（秒）"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_jieqi_solver(start_year: int, end_year: int):
+    """比较两种初值下每个节气所需的星历观测次数"""
+    print("-" * 60)
+    print("节气求解：每个节气的星历观测次数")
+    print("-" * 60)
+
+    years = np.repeat(np.arange(start_year, end_year + 1), len(JieqiConstants.JIEQI_INFO))
+    degrees = np.tile(JieqiConstants.JIEQI_DEGREES, end_year - start_year + 1)
+    months = np.tile(JieqiConstants.JIEQI_MONTHS, end_year - start_year + 1)
+    ts = qimenpaipan.ephemeris.ts
+
+    # 原搜索方式：前一月1日至后一月1日
+    window_guess = (ts.utc(years, months - 1, 1).tt + ts.utc(years, months + 1, 1).tt) / 2
+    window_days = 31
+
+    # 平黄经预测
+    predicted_guess = AstronomyCalculator.predict_jieqi_tt(years, degrees)
+
+    for label, guess, bracket_days in (
+        ('月份区间（±1月）', window_guess, window_days),
+        ('平黄经预测（±2.5日）', predicted_guess, None),
+    ):
+        with EphemerisCallCounter() as counter:
+            _, iterations = AstronomyCalculator.solve_sun_longitude(
+                degrees, guess, bracket_days=bracket_days
+            )
+        print(f"  {label}: 每节气 {iterations} 次观测（共 {len(degrees)} 个节气，"
+              f"{counter.calls} 次向量化观测）")
+
+    print("  （原逐项二分法：每节气 20 次观测）")
+
+
+def bench_entry_points(repeat: int):
+    """各入口耗时与星历观测次数"""
+    print("-" * 60)
+    print("入口耗时（最短）与星历观测次数")
+    print("-" * 60)
+
+    sample = '2025-02-28 18:30:00'
+    input_utc = QiMenDunjiaPan(sample).input_utc
+
+    cases = [
+        ('get_year_jieqi', lambda: AstronomyCalculator.get_year_jieqi(2025)),
+        ('find_lichun', lambda: AstronomyCalculator.find_lichun(2025)),
+        ('get_solstices', lambda: AstronomyCalculator.get_solstices(2025)),
+        ('find_jieqi', lambda: GanzhiCalculator.find_jieqi(input_utc)),
+        ('QiMenDunjiaPan.run', lambda: QiMenDunjiaPan(sample).run()['ju_number']),
+        ('run().to_dict', lambda: QiMenDunjiaPan(sample).run().to_dict()),
+    ]
+    for name, func in cases:
+        with EphemerisCallCounter() as counter:
+            func()
+        elapsed = timed(func, repeat)
+        print(f"  {name:<20} {elapsed * 1000:8.2f} ms   观测 {counter.calls:3d} 次 / {counter.instants:5d} 个时刻")
+
+
+def bench_backends(start_year: int, end_year: int, repeat: int):
+    """各天文计算后端的耗时、星历观测次数及与星历后端的节气时间偏差"""
+    print("-" * 60)
+    print("天文计算后端对比")
+    print("-" * 60)
+
+    years = list(range(start_year, end_year + 1))
+    sample = '2025-02-28 18:30:00'
+    input_utc = QiMenDunjiaPan(sample).input_utc
+    reference, _ = get_backend('skyfield').jieqi_instants(years)
+
+    for name in ASTRONOMY_BACKENDS:
+        backend = get_backend(name)
+        jieqi_times, _ = backend.jieqi_instants(years)
+        max_error = max(abs((t - r).total_seconds()) for t, r in zip(jieqi_times, reference))
+        print(f"  [{name}] 节气时间最大偏差 {max_error:.3f} 秒（{start_year}-{end_year}）")
+
+        cases = [
+            ('jieqi_instants', lambda: backend.jieqi_instants(years)),
+            ('find_jieqi', lambda: backend.find_jieqi(input_utc)),
+            ('QiMenDunjiaPan.run', lambda: QiMenDunjiaPan(sample, backend=backend).run()),
+        ]
+        for case, func in cases:
+            with EphemerisCallCounter() as counter:
+                func()
+            elapsed = timed(func, repeat)
+            print(f"    {case:<20} {elapsed * 1000:8.2f} ms   观测 {counter.calls:3d} 次")
+
+
+def bench_batching(thread_count: int):
+    """合批后端：多线程各自请求单个时刻的太阳黄经时，星历观测次数与吞吐量"""
+    print("-" * 60)
+    print(f"合批后端（{thread_count} 线程，窗口 {AstronomyConfig.BATCH_WINDOW_SECONDS * 1000:g} ms，"
+          f"每批最多 {AstronomyConfig.BATCH_MAX_ITEMS} 项）")
+    print("-" * 60)
+
+    rounds = 20
+    tt = 2451545.0 + np.arange(thread_count * rounds) * 0.37
+    expected = SkyfieldBackend().sun_longitude(tt)
+
+    for backend in (SkyfieldBackend(), BatchingBackend()):
+        barrier = threading.Barrier(thread_count)
+
+        def task(offset: int) -> np.ndarray:
+            barrier.wait()
+            return np.array([backend.sun_longitude(tt[offset + i]) for i in range(0, len(tt) - offset, thread_count)])
+
+        with EphemerisCallCounter() as counter:
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=thread_count) as executor:
+                results = list(executor.map(task, range(thread_count)))
+            elapsed = time.perf_counter() - start
+
+        max_error = max(np.abs(result - expected[offset::thread_count]).max() for offset, result in enumerate(results))
+        print(f"  [{backend.name:<8}] {len(tt) / elapsed:8.0f} 次/秒   观测 {counter.calls:5d} 次 / {counter.instants:5d} 个时刻"
+              f"   最大偏差 {max_error:.1e}°")
+
+
+def bench_calendar_index(repeat: int):
+    """逐日历法索引：查表排盘与逐项计算的耗时对比，以及一年中逐小时排盘的查表命中率"""
+    print("-" * 60)
+    print("逐日历法索引")
+    print("-" * 60)
+
+    index = get_calendar_index()
+    if index is None:
+        print(f"  未找到 {AstronomyConfig.CALENDAR_INDEX_FILE}（python calendar_index.py 生成），跳过")
+        return
+
+    sample = '2025-02-28 18:30:00'
+
+    def computed():
+        pan = QiMenDunjiaPan(sample)
+        pan.apply_calendar_index = lambda: False
+        return pan.run()
+
+    print(f"  索引范围 {index.first_date} - {index.last_date}，共 {len(index.rows)} 天")
+    print(f"  查表排盘 {timed(lambda: QiMenDunjiaPan(sample).run(), repeat) * 1000:8.3f} ms")
+    print(f"  逐项计算 {timed(computed, repeat) * 1000:8.3f} ms")
+
+    year = min(max(2025, index.first_date.year), index.last_date.year)
+    samples = [f'{year}-{month:02d}-{day:02d} {hour:02d}:00:00'
+               for month in range(1, 13) for day in range(1, 29) for hour in range(24)]
+    hits = sum(QiMenDunjiaPan(sample).apply_calendar_index() for sample in samples)
+    print(f"  {year} 年逐小时 {len(samples)} 盘，查表命中 {hits / len(samples):.1%}")
+
+
+def bench_plate_templates(repeat: int):
+    """盘面模板：选取模板与逐步排布九宫的耗时对比，以及每盘结果的内存占用"""
+    print("-" * 60)
+    print("盘面模板")
+    print("-" * 60)
+
+    pan = QiMenDunjiaPan('2025-02-28 18:30:00')
+    pan.run()
+
+    def arranged():
+        pan.arrange_earth_plate()
+        pan.arrange_sky_plate()
+        pan.arrange_doors()
+        pan.arrange_shen()
+        return pan.get_result_dict()
+
+    def templated():
+        pan.apply_plate_template()
+        return pan.get_result_dict()
+
+    count = 1000
+    print(f"  模板数 {PLATE_TEMPLATE_COUNT}")
+    print(f"  逐步排布 {timed(lambda: [arranged() for _ in range(count)], repeat) / count * 1e6:8.1f} us/盘")
+    print(f"  选取模板 {timed(lambda: [templated() for _ in range(count)], repeat) / count * 1e6:8.1f} us/盘")
+
+    # 一年逐小时排盘结果的内存占用：Plate 与结果字典
+    start = datetime(2025, 1, 1)
+    pans = [QiMenDunjiaPan((start + timedelta(hours=hour)).strftime('%Y-%m-%d %H:%M:%S'))
+            for hour in range(365 * 24)]
+    for pan in pans:
+        pan.run()
+    for label, build in (('Plate', lambda pan: pan._make_plate(pan.plate.template)),
+                         ('结果字典', lambda pan: pan.get_result_dict())):
+        tracemalloc.start()
+        results = [build(pan) for pan in pans]
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"  {len(results)} 盘 {label} {size / len(results):8.0f} 字节/盘（不含共享的输入时间与模板）")
+
+
+def bench_run_many(repeat: int):
+    """批量排盘：run_many、iter_charts 与逐个排盘的吞吐量对比（一年逐小时）"""
+    print("-" * 60)
+    print("批量排盘吞吐量")
+    print("-" * 60)
+
+    start = datetime(2025, 1, 1)
+    samples = [start + timedelta(hours=hour) for hour in range(365 * 24)]
+    texts = [sample.strftime('%Y-%m-%d %H:%M:%S') for sample in samples]
+
+    loop = timed(lambda: [QiMenDunjiaPan(text).run() for text in texts], repeat)
+    batch = timed(lambda: QiMenDunjiaPan.run_many(samples), repeat)
+    print(f"  逐个排盘 {len(samples) / loop:10.0f} 盘/秒")
+    print(f"  run_many {len(samples) / batch:10.0f} 盘/秒（{loop / batch:.1f} 倍）")
+
+    def stream():
+        return sum(1 for _ in iter_charts(samples[0], samples[-1] + timedelta(hours=1), 'hour'))
+
+    streamed = timed(stream, repeat)
+    tracemalloc.start()
+    stream()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  iter_charts {len(samples) / streamed:7.0f} 盘/秒（内存峰值 {peak / 1024:.0f} KB）")
+
+
+def bench_thread_safety(thread_count: int):
+    """多线程并发排盘：结果应与单线程一致，同一年份的节气只求解一次"""
+    print("-" * 60)
+    print(f"多线程并发排盘（{thread_count} 线程）")
+    print("-" * 60)
+
+    samples = [f'2025-{month:02d}-15 {hour:02d}:00:00' for month in range(1, 13) for hour in (0, 12)]
+    samples = (samples * thread_count)[:thread_count]
+
+    def result_key(result) -> str:
+        return json.dumps(result.to_dict(), ensure_ascii=False, sort_keys=True, default=str)
+
+    expected = [result_key(QiMenDunjiaPan(sample, backend=SkyfieldBackend()).run()) for sample in samples]
+
+    # 新建后端（空缓存），统计实际求解的年份
+    backend = SkyfieldBackend()
+    solved_years = []
+    solve_crossings = backend.solve_crossings
+
+    def counted(years, target_degrees, tolerance_seconds=None):
+        solved_years.extend(sorted(set(int(year) for year in years)))
+        return solve_crossings(years, target_degrees, tolerance_seconds)
+
+    backend.solve_crossings = counted
+    barrier = threading.Barrier(thread_count)
+
+    def task(sample: str) -> str:
+        barrier.wait()
+        return result_key(QiMenDunjiaPan(sample, backend=backend).run())
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=thread_count) as executor:
+        results = list(executor.map(task, samples))
+    elapsed = time.perf_counter() - start
+
+    matched = sum(result == reference for result, reference in zip(results, expected))
+    print(f"  结果一致 {matched}/{len(samples)}，耗时 {elapsed * 1000:.1f} ms")
+    print(f"  年份节气求解 {len(solved_years)} 次，涉及年份 {sorted(set(solved_years))}")
+
+
+def bench_worker_memory(worker_counts, start_method: str):
+    """进程池各工作进程的内存占用：星历映射应由各进程共享，总量不随进程数增长"""
+    print("-" * 60)
+    print(f"进程池内存（启动方式 {start_method}）")
+    print("-" * 60)
+
+    if not os.path.exists('/proc/self/smaps'):
+        print("  当前系统不支持 /proc/self/smaps，跳过")
+        return
+
+    context = multiprocessing.get_context(start_method)
+    samples = [f'{year}-06-15 12:00:00' for year in range(2000, 2032)]
+
+    for count in worker_counts:
+        with context.Pool(count, initializer=init_memory_worker, initargs=(worker_config(),)) as pool:
+            memory = dict(pool.map(memory_worker_chart, samples, chunksize=1))
+
+        private = sum(m['private'] for m in memory.values())
+        ephemeris_pss = sum(m['ephemeris_pss'] for m in memory.values())
+        ephemeris_rss = max(m['ephemeris_rss'] for m in memory.values())
+        print(f"  {count:2d} 个工作进程: 星历映射 PSS 合计 {ephemeris_pss:6.2f} MB（单进程 RSS {ephemeris_rss:6.2f} MB），"
+              f"私有内存合计 {private:7.1f} MB，平均每进程 {private / len(memory):5.1f} MB")
+
+
+def bench_parallel_run(worker_counts, start_method: str):
+    """多进程批量排盘：各工作进程数的吞吐量（十年逐小时，含进程池启动）"""
+    print("-" * 60)
+    print(f"多进程批量排盘（启动方式 {start_method}）")
+    print("-" * 60)
+
+    start = datetime(2020, 1, 1)
+    samples = [start + timedelta(hours=hour) for hour in range(10 * 365 * 24)]
+
+    elapsed = timed(lambda: QiMenDunjiaPan.run_many(samples), 1)
+    print(f"  单进程 run_many   {len(samples) / elapsed:10.0f} 盘/秒")
+    for count in worker_counts:
+        elapsed = timed(lambda: parallel_run(samples, workers=count, start_method=start_method), 1)
+        print(f"  {count:2d} 个工作进程      {len(samples) / elapsed:10.0f} 盘/秒")
+
+
+def _request_charts(port: int, sample: str, times: List[str], count: int) -> Dict[str, float]:
+    """客户端线程：同一长连接上逐个请求单盘，再批量请求一次，返回各自耗时（秒）"""
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    path = '/chart?t=' + sample.replace(' ', '+')
+    start = time.perf_counter()
+    for _ in range(count):
+        connection.request('GET', path)
+        connection.getresponse().read()
+    single = (time.perf_counter() - start) / count
+
+    body = json.dumps({'times': times})
+    start = time.perf_counter()
+    connection.request('POST', '/charts', body, {'Content-Type': 'application/json'})
+    connection.getresponse().read()
+    batch = time.perf_counter() - start
+    connection.close()
+    return {'single': single, 'batch': batch}
+
+
+def bench_chart_server(repeat: int):
+    """排盘服务：本机请求常驻服务与每次启动解释器排盘的耗时对比"""
+    print("-" * 60)
+    print("排盘服务（本机 HTTP）")
+    print("-" * 60)
+
+    sample = '2024-11-19 20:00:00'
+    script = f"from qimenpaipan import QiMenDunjiaPan; QiMenDunjiaPan({sample!r}).run()"
+    elapsed = timed(lambda: subprocess.run([sys.executable, '-c', script], capture_output=True, check=True), repeat)
+    print(f"  每次启动解释器   {elapsed * 1000:8.1f} ms/盘")
+
+    start = datetime(2025, 1, 1)
+    times = [(start + timedelta(hours=hour)).strftime('%Y-%m-%d %H:%M:%S') for hour in range(30 * 24)]
+
+    async def measure():
+        service = ChartServer()
+        await service.start(port=0)
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, _request_charts, service.address[1], sample, times, 200)
+        finally:
+            await service.close()
+
+    elapsed = asyncio.run(measure())
+    print(f"  GET /chart       {elapsed['single'] * 1000:8.2f} ms/盘")
+    print(f"  POST /charts     {len(times) / elapsed['batch']:8.0f} 盘/秒（{len(times)} 盘一次请求）")
+
+
+if __name__ == '__main__':
+    start_methods = multiprocessing.get_all_start_methods()
+    parser = argparse.ArgumentParser(description='排盘性能基准测试')
+    parser.add_argument('--years', type=int, nargs=2, default=[1950, 2049], metavar=('START', 'END'),
+                        help='节气求解统计的年份范围')
+    parser.add_argument('--repeat', type=int, default=3, help='每项计时重复次数')
+    parser.add_argument('--threads', type=int, default=32, help='多线程并发排盘的线程数')
+    parser.add_argument('--workers', type=int, nargs='*', default=[1, 2, 4], help='进程池内存统计的工作进程数')
+    parser.add_argument('--start-method', default='fork' if 'fork' in start_methods else start_methods[0],
+                        choices=start_methods, help='进程池启动方式')
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    qimenpaipan.ephemeris.preload()
+
+    print("=" * 60)
+    print("奇门遁甲排盘性能基准")
+    print("=" * 60)
+    bench_jieqi_solver(*args.years)
+    bench_entry_points(args.repeat)
+    bench_backends(*args.years, args.repeat)
+    bench_batching(args.threads)
+    bench_calendar_index(args.repeat)
+    bench_plate_templates(args.repeat)
+    bench_run_many(args.repeat)
+    bench_thread_safety(args.threads)
+    bench_worker_memory(args.workers, args.start_method)
+    bench_parallel_run(args.workers, args.start_method)
+    bench_chart_server(args.repeat)
+    print("=" * 60)
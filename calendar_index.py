@@ -0,0 +1,234 @@
+"""
+逐日历法索引
+
+主要功能：
+1. 预计算指定年份范围内每个公历日的年/月/日干支、当前节气、三元、阴阳遁及局数，
+   写入定长记录的二进制文件（每日18字节，1900-2100年约73000行、约1.3MB）
+2. CalendarIndex：以内存映射方式打开索引，按日序号直接读取一行
+
+日内有节气交接（年、月干支变化）或符头恰逢二至当日时，记录中的 change 字段给出该日
+记录失效的时刻（当日秒数），该时刻之后的排盘仍需实时计算；其余时刻查表即可确定局数，
+排盘只剩时干支推算与九宫排布。局数按置闰法预计算；拆补法由记录中的所在节气（term）
+与日干支符头直接推出。
+
+用法：
+    python calendar_index.py 1900 2050 -o calendar_index.bin
+
+作者：redrockhorse
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Optional
+import argparse
+import bisect
+import logging
+import struct
+
+import numpy as np
+
+
+# ============================================================================
+# 常量定义区
+# ============================================================================
+
+class CalendarIndexFormat:
+    """逐日历法索引文件格式"""
+    MAGIC = b'QMCI'
+    VERSION = 2
+
+    # 文件头：魔数、版本、首日序号（date.toordinal）、天数（小端）
+    HEADER = struct.Struct('<4sHii')
+
+    # 每日记录（干支为六十甲子序号，节气为 JIEQI_INFO 序号，三元 0-2 为上中下元，
+    # 局数为正表示阳遁、为负表示阴遁；late_* 为23点后（日干支已换日）的节气、三元、局数；
+    # term 为0点所在节气，term_change 为当日交节时刻（当日秒数，无交节为86400））
+    ROW = np.dtype([
+        ('day', 'u1'), ('year', 'u1'), ('month', 'u1'),
+        ('jieqi', 'u1'), ('yuan', 'u1'), ('ju', 'i1'),
+        ('late_jieqi', 'u1'), ('late_yuan', 'u1'), ('late_ju', 'i1'),
+        ('change', '<u4'), ('term', 'u1'), ('term_change', '<u4'),
+    ])
+
+    SECONDS_PER_DAY = 86400
+    LATE_HOUR_SECONDS = 23 * 3600  # 23点换日
+
+
+# ============================================================================
+# 索引查询
+# ============================================================================
+
+class CalendarIndex:
+    """逐日历法索引（内存映射，多进程共享同一份页缓存）"""
+
+    def __init__(self, start_day: int, rows: np.ndarray):
+        """
+        初始化索引
+
+        Args:
+            start_day: 首日序号（date.toordinal）
+            rows: 逐日记录数组（dtype 为 CalendarIndexFormat.ROW）
+        """
+        self.start_day = start_day
+        self.rows = rows
+
+    @classmethod
+    def load(cls, path: str) -> 'CalendarIndex':
+        """
+        以内存映射方式打开索引文件
+
+        Args:
+            path: 索引文件路径
+
+        Returns:
+            CalendarIndex: 索引
+        """
+        with open(path, 'rb') as f:
+            header = f.read(CalendarIndexFormat.HEADER.size)
+        magic, version, start_day, day_count = CalendarIndexFormat.HEADER.unpack(header)
+        if magic != CalendarIndexFormat.MAGIC or version != CalendarIndexFormat.VERSION:
+            raise ValueError(f"无效的日历索引文件: {path}")
+
+        rows = np.memmap(path, dtype=CalendarIndexFormat.ROW, mode='r',
+                         offset=CalendarIndexFormat.HEADER.size, shape=(day_count,))
+        return cls(start_day, rows)
+
+    def save(self, path: str):
+        """
+        将索引写入文件
+
+        Args:
+            path: 索引文件路径
+        """
+        with open(path, 'wb') as f:
+            f.write(CalendarIndexFormat.HEADER.pack(
+                CalendarIndexFormat.MAGIC, CalendarIndexFormat.VERSION,
+                self.start_day, len(self.rows)
+            ))
+            f.write(np.ascontiguousarray(self.rows, dtype=CalendarIndexFormat.ROW).tobytes())
+
+    @property
+    def first_date(self) -> date:
+        """索引首日"""
+        return date.fromordinal(self.start_day)
+
+    @property
+    def last_date(self) -> date:
+        """索引末日"""
+        return date.fromordinal(self.start_day + len(self.rows) - 1)
+
+    def lookup(self, day: date) -> Optional[np.void]:
+        """
+        读取指定日期的记录
+
+        Args:
+            day: 公历日期
+
+        Returns:
+            np.void: 该日记录；超出索引范围时返回None
+        """
+        i = day.toordinal() - self.start_day
+        if 0 <= i < len(self.rows):
+            return self.rows[i]
+        return None
+
+
+# ============================================================================
+# 索引生成
+# ============================================================================
+
+def _day_state(input_dt: datetime, backend) -> tuple:
+    """按排盘流程计算某一时刻的 (年干支, 月干支, 节气, 三元, 局数) 序号"""
+    from qimenpaipan import QiMenDunjiaPan
+
+    pan = QiMenDunjiaPan(input_dt.strftime('%Y-%m-%d %H:%M:%S'), backend=backend)
+    pan.calculate_ganzhi()
+    pan.calculate_futou()
+    pan.get_futou_jieqi()
+
+    return (
+        pan.year_gz, pan.month_gz, pan.curr_jieqi, pan.curr_yuan,
+        pan.ju_number if pan.is_yang else -pan.ju_number,
+    )
+
+
+def build_calendar_index(start_year: int, end_year: int, backend=None) -> CalendarIndex:
+    """
+    按排盘流程逐日计算，生成逐日历法索引
+
+    每日在0点、23点及日内可能改变结果的时刻（当日节气交接时刻、符头恰逢节气当日时的
+    节气时刻）分别计算；结果在两相邻时刻之间不变，首个变化时刻记入 change 字段。
+    星历文件需覆盖年份范围前后各一年。
+
+    Args:
+        start_year: 起始年份（含）
+        end_year: 结束年份（含）
+        backend: 天文计算后端（实例或名称），默认 AstronomyConfig.BACKEND
+
+    Returns:
+        CalendarIndex: 索引
+    """
+    from qimenpaipan import FutouCalculator, GanzhiConstants, get_backend
+
+    backend = get_backend(backend)
+    late_seconds = CalendarIndexFormat.LATE_HOUR_SECONDS
+
+    # 节气时刻（用于确定0点所在节气）及按日期归类的交节秒数
+    years = list(range(start_year - 1, end_year + 2))
+    jieqi_times, jieqi_indexes = backend.jieqi_instants(years)
+    jieqi_naive = [t.replace(tzinfo=None) for t in jieqi_times]
+    jieqi_seconds = backend.jieqi_day_seconds(years)
+
+    first = date(start_year, 1, 1)
+    day_count = (date(end_year + 1, 1, 1) - first).days
+    rows = np.zeros(day_count, dtype=CalendarIndexFormat.ROW)
+
+    for i in range(day_count):
+        day = first + timedelta(days=i)
+        midnight = datetime.combine(day, datetime.min.time())
+        day_idx = (day - GanzhiConstants.BASE_DATE).days % 60
+
+        # 可能改变结果的时刻：当日节气交接；符头（23点前后各一）恰逢节气当日时的节气时刻
+        candidates = set(jieqi_seconds.get(day, []))
+        for idx in (day_idx, (day_idx + 1) % 60):
+            futou = FutouCalculator.get_futou_details(idx)
+            candidates.update(jieqi_seconds.get(day - timedelta(days=futou['符头差日']), []))
+
+        state = _day_state(midnight, backend)
+        late_state = _day_state(midnight + timedelta(seconds=late_seconds), backend)
+        change = CalendarIndexFormat.SECONDS_PER_DAY
+        if late_state[:2] != state[:2]:
+            change = late_seconds
+
+        for seconds in sorted(candidates):
+            reference = state if seconds < late_seconds else late_state
+            if seconds < change and _day_state(midnight + timedelta(seconds=seconds), backend) != reference:
+                change = seconds
+                break
+
+        # 0点所在节气及当日交节时刻
+        term = jieqi_indexes[bisect.bisect_right(jieqi_naive, midnight) - 1]
+        term_change = min(jieqi_seconds.get(day, [CalendarIndexFormat.SECONDS_PER_DAY]))
+
+        rows[i] = (day_idx, *state, *late_state[2:], change, term, term_change)
+
+    return CalendarIndex(first.toordinal(), rows)
+
+
+# ============================================================================
+# 主程序入口
+# ============================================================================
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='生成逐日历法索引')
+    parser.add_argument('start_year', type=int, help='起始年份（含）')
+    parser.add_argument('end_year', type=int, help='结束年份（含）')
+    parser.add_argument('-o', '--output', default='calendar_index.bin', help='输出文件路径')
+    parser.add_argument('--backend', help='天文计算后端名称（默认 AstronomyConfig.BACKEND）')
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    index = build_calendar_index(args.start_year, args.end_year, args.backend)
+    index.save(args.output)
+    partial = int(np.count_nonzero(index.rows['change'] < CalendarIndexFormat.SECONDS_PER_DAY))
+    print(f"日历索引已写入 {args.output}: {index.first_date} - {index.last_date}, 共 {len(index.rows)} 天"
+          f"（其中 {partial} 天日内有变化）")
@@ -0,0 +1,329 @@
+"""
+排盘服务
+
+主要功能：
+1. 常驻进程的 asyncio HTTP 服务（只用标准库），节气表、日历索引、盘面模板（及后端所需的星历）只加载一次，
+   每次请求不再付出解释器启动和星历加载的开销
+2. GET /chart?t=YYYY-MM-DD HH:MM:SS[&method=拆补]：排一盘，返回排盘结果的 JSON
+3. POST /charts：请求体为 {"times": [...], "method": "置闰"}，批量排盘（run_many），结果按输入顺序返回
+4. 排盘计算交给执行器（默认线程池；--workers N 时为进程池），事件循环只负责收发
+5. 监听本机 TCP 端口或 Unix 套接字，支持 HTTP/1.1 长连接
+
+用法：
+    python chart_server.py --port 8080
+    python chart_server.py --unix /tmp/qimen.sock --workers 4
+    curl 'http://127.0.0.1:8080/chart?t=2024-11-19+20:00:00'
+    curl -d '{"times": ["2024-11-19 20:00:00"], "method": "拆补"}' http://127.0.0.1:8080/charts
+
+作者：redrockhorse
+"""
+
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from http import HTTPStatus
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+
+from qimenpaipan import FutouCalculator, QiMenDunjiaPan, init_worker, worker_config
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================================
+# 常量定义区
+# ============================================================================
+
+class ChartServerConfig:
+    """排盘服务配置"""
+    HOST = '127.0.0.1'
+    PORT = 8080
+    MAX_HEADER_LINES = 100  # 请求头最多行数
+    MAX_BODY_BYTES = 4 << 20  # 请求体上限（字节）
+    MAX_BATCH = 100000  # 单次批量排盘的输入数上限
+    IDLE_TIMEOUT = 30  # 长连接空闲超时（秒）
+
+
+# ============================================================================
+# 排盘计算（在执行器中运行）
+# ============================================================================
+
+def _init_service_worker(config: Dict, backend: Optional[str], level: int):
+    """进程池工作进程初始化：沿用父进程的日志级别和天文计算配置"""
+    logging.getLogger().setLevel(level)
+    init_worker(config, backend=backend)
+
+
+def _charts_json(times: List[str], method: str, backend: Optional[str], single: bool) -> bytes:
+    """批量排盘并编码为 JSON（single 为 True 时只返回第一盘）"""
+    results = [result.to_dict() for result in QiMenDunjiaPan.run_many(times, backend=backend, method=method)]
+    return json.dumps(results[0] if single else results, ensure_ascii=False).encode('utf-8')
+
+
+# ============================================================================
+# HTTP 服务
+# ============================================================================
+
+class ChartServer:
+    """排盘服务（asyncio，排盘计算交给执行器）"""
+
+    def __init__(self, backend: Optional[str] = None, method: str = '置闰', workers: Optional[int] = None,
+                 start_method: Optional[str] = None):
+        """
+        初始化服务（不加载星历、不监听）
+
+        Args:
+            backend: 天文计算后端名称，默认 AstronomyConfig.BACKEND
+            method: 请求未指定时的定局方法，"置闰" 或 "拆补"
+            workers: 进程池工作进程数；None表示在本进程的线程池中排盘
+            start_method: 进程池启动方式（"fork"、"spawn" 等），默认 multiprocessing 的默认方式
+        """
+        if method not in FutouCalculator.METHODS:
+            raise ValueError(f"无效的定局方法: {method}")
+        if backend is not None and not isinstance(backend, str):
+            raise ValueError("排盘服务的 backend 须为后端名称")
+
+        self.backend = backend
+        self.method = method
+        self.workers = workers
+        self.start_method = start_method
+        self.executor: Optional[Executor] = None
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    # ========================================================================
+    # 启动与关闭
+    # ========================================================================
+
+    async def start(self, host: str = ChartServerConfig.HOST, port: int = ChartServerConfig.PORT,
+                    path: Optional[str] = None) -> asyncio.AbstractServer:
+        """
+        预热排盘引擎并开始监听
+
+        Args:
+            host: 监听地址
+            port: 监听端口（0 表示由系统分配，实际端口见 address）
+            path: Unix 套接字路径；给出时忽略 host、port
+
+        Returns:
+            asyncio.AbstractServer: 已开始监听的服务
+        """
+        loop = asyncio.get_running_loop()
+
+        # 本进程先加载节气表、日历索引及后端所需的星历（fork 的工作进程直接继承）
+        await loop.run_in_executor(None, init_worker, None, self.backend)
+        if self.workers:
+            context = multiprocessing.get_context(self.start_method)
+            self.executor = ProcessPoolExecutor(
+                self.workers, mp_context=context, initializer=_init_service_worker,
+                initargs=(worker_config(), self.backend, logging.getLogger().level)
+            )
+        else:
+            self.executor = ThreadPoolExecutor(thread_name_prefix='chart')
+
+        if path:
+            self.server = await asyncio.start_unix_server(self.handle, path=path)
+        else:
+            self.server = await asyncio.start_server(self.handle, host, port)
+        logger.info(f"排盘服务已启动: {self.address}")
+        return self.server
+
+    @property
+    def address(self):
+        """监听地址：TCP 为 (host, port)，Unix 套接字为路径"""
+        return self.server.sockets[0].getsockname()
+
+    async def close(self):
+        """停止监听并关闭执行器"""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    # ========================================================================
+    # 请求处理
+    # ========================================================================
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """处理一个连接上的全部请求（HTTP/1.1 默认长连接）"""
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self._read_request(reader), ChartServerConfig.IDLE_TIMEOUT)
+                except ValueError as e:
+                    writer.write(self._response(HTTPStatus.BAD_REQUEST, self._error(str(e)), False))
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+
+                verb, target, version, headers, body = request
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection == 'keep-alive' or (version == 'HTTP/1.1' and connection != 'close')
+
+                status, payload = await self.dispatch(verb, target, body)
+                writer.write(self._response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, verb: str, target: str, body: bytes) -> Tuple[HTTPStatus, bytes]:
+        """
+        按路径分发请求
+
+        Args:
+            verb: 请求方法
+            target: 请求路径（含查询串）
+            body: 请求体
+
+        Returns:
+            tuple: (状态码, JSON 响应体)
+        """
+        url = urlsplit(target)
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+
+        try:
+            if url.path == '/chart':
+                if verb != 'GET':
+                    return HTTPStatus.METHOD_NOT_ALLOWED, self._error("/chart 只支持 GET")
+                if 't' not in query:
+                    return HTTPStatus.BAD_REQUEST, self._error("缺少参数 t（YYYY-MM-DD HH:MM:SS）")
+                return HTTPStatus.OK, await self._compute([query['t']], query.get('method', self.method), True)
+
+            if url.path == '/charts':
+                if verb != 'POST':
+                    return HTTPStatus.METHOD_NOT_ALLOWED, self._error("/charts 只支持 POST")
+                try:
+                    request = json.loads(body)
+                except (UnicodeDecodeError, json.JSONDecodeError):
+                    return HTTPStatus.BAD_REQUEST, self._error("请求体须为 JSON")
+                times = request.get('times') if isinstance(request, dict) else None
+                if not isinstance(times, list) or not all(isinstance(t, str) for t in times):
+                    return HTTPStatus.BAD_REQUEST, self._error("times 须为时间字符串列表")
+                if len(times) > ChartServerConfig.MAX_BATCH:
+                    return HTTPStatus.REQUEST_ENTITY_TOO_LARGE, self._error(
+                        f"单次最多 {ChartServerConfig.MAX_BATCH} 个时间")
+                if not times:
+                    return HTTPStatus.OK, b'[]'
+                return HTTPStatus.OK, await self._compute(times, request.get('method', self.method), False)
+
+            return HTTPStatus.NOT_FOUND, self._error(f"未知路径: {url.path}")
+
+        except ValueError as e:
+            return HTTPStatus.BAD_REQUEST, self._error(str(e))
+        except Exception as e:
+            logger.error(f"排盘失败: {str(e)}")
+            return HTTPStatus.INTERNAL_SERVER_ERROR, self._error(f"排盘失败: {str(e)}")
+
+    async def _compute(self, times: List[str], method: str, single: bool) -> bytes:
+        """在执行器中排盘"""
+        if method not in FutouCalculator.METHODS:
+            raise ValueError(f"无效的定局方法: {method}")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, _charts_json, times, method, self.backend, single)
+
+    # ========================================================================
+    # HTTP 报文
+    # ========================================================================
+
+    @staticmethod
+    async def _read_request(reader: asyncio.StreamReader) -> Optional[Tuple[str, str, str, Dict[str, str], bytes]]:
+        """
+        读取一个请求
+
+        Returns:
+            tuple: (方法, 路径, 协议版本, 请求头（小写键）, 请求体)；连接已关闭时返回None
+        """
+        line = await reader.readline()
+        if not line.strip():
+            return None
+        try:
+            verb, target, version = line.decode('latin-1').split()
+        except ValueError:
+            raise ValueError("无效的请求行")
+
+        headers = {}
+        for _ in range(ChartServerConfig.MAX_HEADER_LINES):
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        else:
+            raise ValueError("请求头过长")
+
+        length = int(headers.get('content-length') or 0)
+        if not 0 <= length <= ChartServerConfig.MAX_BODY_BYTES:
+            raise ValueError("请求体过大")
+        body = await reader.readexactly(length) if length else b''
+        return verb, target, version, headers, body
+
+    @staticmethod
+    def _response(status: HTTPStatus, payload: bytes, keep_alive: bool) -> bytes:
+        """组装 JSON 响应"""
+        head = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        return head.encode('latin-1') + payload
+
+    @staticmethod
+    def _error(message: str) -> bytes:
+        return json.dumps({'error': message}, ensure_ascii=False).encode('utf-8')
+
+
+async def serve(host: str = ChartServerConfig.HOST, port: int = ChartServerConfig.PORT, path: Optional[str] = None,
+                **options):
+    """
+    启动排盘服务并一直运行
+
+    Args:
+        host: 监听地址
+        port: 监听端口
+        path: Unix 套接字路径；给出时忽略 host、port
+        **options: ChartServer 的参数（backend、method、workers、start_method）
+    """
+    service = ChartServer(**options)
+    server = await service.start(host, port, path)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.close()
+        if path and os.path.exists(path):
+            os.remove(path)
+
+
+# ============================================================================
+# 主程序入口
+# ============================================================================
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='奇门遁甲排盘服务')
+    parser.add_argument('--host', default=ChartServerConfig.HOST, help='监听地址')
+    parser.add_argument('--port', type=int, default=ChartServerConfig.PORT, help='监听端口')
+    parser.add_argument('--unix', metavar='PATH', help='改为监听 Unix 套接字')
+    parser.add_argument('--workers', type=int, help='进程池工作进程数（默认在本进程的线程池中排盘）')
+    parser.add_argument('--backend', help='天文计算后端名称')
+    parser.add_argument('--method', default='置闰', help='默认定局方法（置闰/拆补）')
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    logger.setLevel(logging.INFO)
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix, backend=args.backend, method=args.method,
+                          workers=args.workers))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,149 @@
+"""
+星历加载
+
+主要功能：
+1. 延迟加载：首次使用时才导入 skyfield、加载时间尺度和星历文件
+2. 内存映射：星历段以只读内存映射方式访问，fork 出的子进程共享同一份页面
+3. 预加载：preload() 供服务端、进程池父进程在启动时一次性付出加载开销
+4. 线程安全：多线程同时首次使用时只加载一次
+
+作者：redrockhorse
+"""
+
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class EphemerisProvider:
+    """星历提供者"""
+
+    # 太阳、地球位置计算所需的星历段：(中心, 目标)
+    SUN_EARTH_SEGMENTS = {(0, 3), (3, 399), (0, 10)}
+
+    def __init__(self, ephemeris_file: str = 'de421.bsp', ephemeris_dir: str = './'):
+        """
+        初始化星历提供者（不做任何加载）
+
+        Args:
+            ephemeris_file: 星历文件名
+            ephemeris_dir: 星历文件目录
+        """
+        self.ephemeris_file = ephemeris_file
+        self.ephemeris_dir = ephemeris_dir
+
+        self._ts = None
+        self._eph = None
+        self._earth = None
+        self._sun = None
+
+        # 加载锁（已加载的对象读取时不加锁）
+        self._lock = threading.RLock()
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset_lock)
+
+    # ========================================================================
+    # 延迟加载的天文对象
+    # ========================================================================
+
+    @property
+    def ts(self):
+        """skyfield时间尺度"""
+        if self._ts is None:
+            with self._lock:
+                if self._ts is None:
+                    from skyfield.api import load
+
+                    self._ts = load.timescale()
+        return self._ts
+
+    @property
+    def eph(self):
+        """skyfield星历"""
+        if self._eph is None:
+            with self._lock:
+                if self._eph is None:
+                    from skyfield.api import Loader
+
+                    path = os.path.join(self.ephemeris_dir, self.ephemeris_file)
+                    logger.info(f"加载星历: {path}")
+                    eph = Loader(self.ephemeris_dir)(self.ephemeris_file)
+                    self._map_segments(eph)
+                    self._eph = eph
+        return self._eph
+
+    @property
+    def earth(self):
+        """地球（太阳系质心 -> 地月质心 -> 地球）"""
+        if self._earth is None:
+            with self._lock:
+                if self._earth is None:
+                    self._earth = self.eph['earth']
+        return self._earth
+
+    @property
+    def sun(self):
+        """太阳（太阳系质心 -> 太阳）"""
+        if self._sun is None:
+            with self._lock:
+                if self._sun is None:
+                    self._sun = self.eph['sun']
+        return self._sun
+
+    @property
+    def loaded(self) -> bool:
+        """星历是否已加载"""
+        return self._eph is not None
+
+    def preload(self):
+        """
+        预加载时间尺度、星历及太阳/地球星历段
+
+        进程池以 fork 方式启动时，父进程先调用本方法，子进程直接继承已加载的星历，
+        星历段为只读内存映射，不会复制到各子进程的私有内存。
+        """
+        self.ts
+        self.earth
+        self.sun
+
+    def configure(self, ephemeris_file: str, ephemeris_dir: str):
+        """
+        更换星历文件（已加载的星历在下次使用时按新文件重新加载）
+
+        Args:
+            ephemeris_file: 星历文件名
+            ephemeris_dir: 星历文件目录
+        """
+        with self._lock:
+            if (ephemeris_file, ephemeris_dir) == (self.ephemeris_file, self.ephemeris_dir):
+                return
+
+            self.ephemeris_file = ephemeris_file
+            self.ephemeris_dir = ephemeris_dir
+            self._eph = None
+            self._earth = None
+            self._sun = None
+
+    # ========================================================================
+    # 辅助方法
+    # ========================================================================
+
+    def _reset_lock(self):
+        """fork 后子进程中重建加载锁（父进程其他线程可能正持有该锁）"""
+        self._lock = threading.RLock()
+
+    def _map_segments(self, eph):
+        """
+        以内存映射方式打开太阳、地球所需的星历段
+
+        jplephem 的 map_array 使用只读 mmap，页面由操作系统页缓存提供，
+        不复制到进程私有内存，fork 后的子进程可直接共享。
+
+        Args:
+            eph: skyfield星历
+        """
+        for segment in eph.segments:
+            if (segment.center, segment.target) in self.SUN_EARTH_SEGMENTS:
+                segment.spk_segment._data
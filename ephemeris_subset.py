@@ -0,0 +1,78 @@
+"""
+星历子集提取
+
+主要功能：
+1. 从完整星历（如 de421.bsp）中只提取太阳、地球位置所需的星历段：
+   太阳系质心->太阳、太阳系质心->地月质心、地月质心->地球
+2. 只保留指定年份范围（前后各留一年余量）内的切比雪夫系数
+3. 输出标准 SPK 文件，skyfield 可直接加载，体积和加载时的内存占用远小于完整星历
+
+用法：
+    python ephemeris_subset.py de421.bsp 1900 2050 -o de421_sun_earth.bsp
+
+生成后设置 AstronomyConfig.EPHEMERIS_FILE = 'de421_sun_earth.bsp' 即可使用。
+
+作者：redrockhorse
+"""
+
+import argparse
+import os
+
+from jplephem.calendar import compute_julian_date
+from jplephem.daf import DAF
+from jplephem.excerpter import write_excerpt
+from jplephem.spk import SPK
+
+from ephemeris import EphemerisProvider
+
+# 年份范围前后的余量（年）：find_jieqi 会求解输入年份前后各一年的节气
+MARGIN_YEARS = 1
+
+
+def extract_sun_earth(input_path: str, output_path: str, start_year: int, end_year: int) -> int:
+    """
+    提取太阳、地球星历段的指定年份范围
+
+    Args:
+        input_path: 完整星历文件路径
+        output_path: 输出星历文件路径
+        start_year: 起始年份（含）
+        end_year: 结束年份（含）
+
+    Returns:
+        int: 输出文件大小（字节）
+    """
+    start_jd = compute_julian_date(start_year - MARGIN_YEARS, 1, 1)
+    end_jd = compute_julian_date(end_year + MARGIN_YEARS + 1, 1, 1)
+
+    with open(input_path, 'rb') as f:
+        spk = SPK(DAF(f))
+        summaries = [
+            summary for summary, segment in zip(spk.daf.summaries(), spk.segments)
+            if (segment.center, segment.target) in EphemerisProvider.SUN_EARTH_SEGMENTS
+        ]
+
+        found = {(segment.center, segment.target) for segment in spk.segments}
+        missing = EphemerisProvider.SUN_EARTH_SEGMENTS - found
+        if missing:
+            raise ValueError(f"星历文件缺少所需星历段 (中心, 目标): {sorted(missing)}")
+
+        with open(output_path, 'w+b') as output_file:
+            write_excerpt(spk, output_file, start_jd, end_jd, summaries)
+
+    return os.path.getsize(output_path)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='提取太阳、地球星历段的年份子集')
+    parser.add_argument('input', help='完整星历文件路径，如 de421.bsp')
+    parser.add_argument('start_year', type=int, help='起始年份（含）')
+    parser.add_argument('end_year', type=int, help='结束年份（含）')
+    parser.add_argument('-o', '--output', default='de421_sun_earth.bsp', help='输出文件路径')
+    args = parser.parse_args()
+
+    size = extract_sun_earth(args.input, args.output, args.start_year, args.end_year)
+    print(f"星历子集已写入 {args.output}: {args.start_year}-{args.end_year}"
+          f"（前后各留 {MARGIN_YEARS} 年），{size / 1024:.1f} KB")
+    with open(args.output, 'rb') as f:
+        print(SPK(DAF(f)))
@@ -1,19 +1,13 @@
-from skyfield.api import load, Topos
-from skyfield.units import Angle
+from qimenpaipan import ephemeris
 
-# 初始化天文数据
-load.directory = './'  # 从当前目录加载星历文件
-ts = load.timescale()
-eph = load('de421.bsp')
+# 天文数据由 qimenpaipan.ephemeris 统一加载（首次计算时加载一次）
 
 def get_solar_longitude(year, month, day, hour=0, minute=0, second=0):
-    # 创建时间对象
-    t = ts.utc(year, month, day, hour, minute, second)
+    # 创建时间对象（各参数可为数组，此时只做一次向量化观测）
+    t = ephemeris.ts.utc(year, month, day, hour, minute, second)
     
     # 获取天体位置
-    sun = eph['sun']
-    earth = eph['earth']
-    astrometric = earth.at(t).observe(sun)
+    astrometric = ephemeris.earth.at(t).observe(ephemeris.sun)
     
     # 转换黄道坐标系
     lat, lon, _ = astrometric.ecliptic_latlon(t)
@@ -0,0 +1,437 @@
+"""
+节气时间缓存
+
+主要功能：
+1. 以 SQLite 保存已计算的节气时间，键为 (星历文件指纹, 年份, 黄经度数, 精度)
+2. 多进程并发安全（WAL 模式 + INSERT OR IGNORE），首次使用时才打开数据库
+3. 命中缓存时直接返回 UTC 时间，无需导入 skyfield、无需加载星历
+4. SingleFlightCache：进程内缓存，读取不加锁，多线程同时未命中同一键时只计算一次，可按最近最少使用限定大小
+5. MicroBatcher：多线程在短时间窗内提交的向量化计算合并为一次调用，再把结果分发给各调用方
+
+作者：redrockhorse
+"""
+
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+import functools
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import weakref
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 星历文件指纹缓存：(路径, 大小, 修改时间) -> 指纹
+_fingerprints: Dict[Tuple[str, int, int], str] = {}
+
+
+def ephemeris_fingerprint(path: str) -> Optional[str]:
+    """
+    计算星历文件指纹（文件内容的 SHA-256）
+
+    结果按 (路径, 大小, 修改时间) 在进程内缓存，文件不变时只读一次。
+
+    Args:
+        path: 星历文件路径
+
+    Returns:
+        str: 十六进制指纹；文件不存在时返回None
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    fingerprint = _fingerprints.get(key)
+    if fingerprint is None:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        fingerprint = _fingerprints[key] = digest.hexdigest()
+    return fingerprint
+
+
+class JieqiCache:
+    """节气时间持久化缓存（SQLite）"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jieqi (
+            ephemeris   TEXT    NOT NULL,
+            year        INTEGER NOT NULL,
+            degree      REAL    NOT NULL,
+            precision   REAL    NOT NULL,
+            utc_seconds REAL    NOT NULL,
+            PRIMARY KEY (ephemeris, year, degree, precision)
+        ) WITHOUT ROWID
+    """
+
+    def __init__(self, path: str, ephemeris_path: str):
+        """
+        初始化缓存（不打开数据库）
+
+        Args:
+            path: SQLite 数据库文件路径
+            ephemeris_path: 星历文件路径（用于计算指纹）
+        """
+        self.path = path
+        self.ephemeris_path = ephemeris_path
+
+        # 每个线程、每个进程使用独立连接
+        self._local = threading.local()
+
+    # ========================================================================
+    # 查询与写入
+    # ========================================================================
+
+    def get_many(self, keys: Iterable[Tuple[int, float]], precision: float) -> Dict[Tuple[int, float], float]:
+        """
+        批量查询节气时间
+
+        Args:
+            keys: (年份, 黄经度数) 列表
+            precision: 求解精度（秒）
+
+        Returns:
+            dict: {(年份, 黄经度数): UTC Unix秒}，只包含命中的项
+        """
+        fingerprint = ephemeris_fingerprint(self.ephemeris_path)
+        keys = set(keys)
+        if fingerprint is None or not keys:
+            return {}
+
+        years = sorted({year for year, _ in keys})
+        placeholders = ','.join('?' * len(years))
+        rows = self._connection().execute(
+            f"SELECT year, degree, utc_seconds FROM jieqi "
+            f"WHERE ephemeris = ? AND precision = ? AND year IN ({placeholders})",
+            [fingerprint, precision, *years]
+        ).fetchall()
+
+        return {
+            (year, degree): seconds
+            for year, degree, seconds in rows
+            if (year, degree) in keys
+        }
+
+    def put_many(self, items: Dict[Tuple[int, float], float], precision: float):
+        """
+        批量写入节气时间（已存在的键保持不变）
+
+        Args:
+            items: {(年份, 黄经度数): UTC Unix秒}
+            precision: 求解精度（秒）
+        """
+        fingerprint = ephemeris_fingerprint(self.ephemeris_path)
+        if fingerprint is None or not items:
+            return
+
+        connection = self._connection()
+        with connection:
+            connection.executemany(
+                "INSERT OR IGNORE INTO jieqi (ephemeris, year, degree, precision, utc_seconds) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(fingerprint, year, degree, precision, seconds)
+                 for (year, degree), seconds in items.items()]
+            )
+
+    # ========================================================================
+    # 辅助方法
+    # ========================================================================
+
+    def _connection(self) -> sqlite3.Connection:
+        """获取当前线程的数据库连接（fork 后的子进程重新连接）"""
+        local = self._local
+        if getattr(local, 'pid', None) != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(self.SCHEMA)
+            local.connection = connection
+            local.pid = os.getpid()
+            logger.info(f"已打开节气缓存: {self.path}")
+        return local.connection
+
+
+# ============================================================================
+# 进程内缓存
+# ============================================================================
+
+# 全部进程内缓存实例（fork 后在子进程中重置锁和计算中的键）
+_single_flight_caches = weakref.WeakSet()
+
+# 缓存未命中标记（缓存值本身可以是None）
+_MISSING = object()
+
+
+class SingleFlightCache:
+    """
+    进程内缓存：读取不加锁，同一键只由一个线程计算
+
+    命中时直接读字典；未命中的键由第一个线程登记并计算，其他线程等待该线程算完后直接取值。
+    计算失败时等待的线程各自重新登记计算。指定 maxsize 时按最近最少使用淘汰，
+    常驻进程内不随见过的键无限增长；键的取值范围本身有限（如年份）时可不限大小。
+    """
+
+    def __init__(self, maxsize: Optional[int] = None):
+        """
+        初始化缓存
+
+        Args:
+            maxsize: 最多缓存的键数，None表示不限
+        """
+        self.maxsize = maxsize
+        self._values: Dict[Hashable, Any] = self._new_store()
+        self._pending: Dict[Hashable, threading.Event] = {}
+        self._lock = threading.Lock()
+        _single_flight_caches.add(self)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def get(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        获取单个键的值
+
+        Args:
+            key: 缓存键
+            compute: 未命中时计算该键的函数
+
+        Returns:
+            缓存值
+        """
+        return self.get_many([key], lambda keys: {key: compute()})[key]
+
+    def get_many(self, keys: Iterable[Hashable],
+                 compute_many: Callable[[List[Hashable]], Dict[Hashable, Any]]) -> Dict[Hashable, Any]:
+        """
+        批量获取，由本线程负责的未命中键一次性交给 compute_many 计算
+
+        Args:
+            keys: 缓存键
+            compute_many: 输入未命中的键列表，返回 {键: 值}
+
+        Returns:
+            dict: {键: 值}
+        """
+        keys = list(dict.fromkeys(keys))
+        result = {}
+        for key in keys:
+            value = self._lookup(key)
+            if value is not _MISSING:
+                result[key] = value
+        if len(result) == len(keys):
+            return result
+
+        # 登记：已在计算的键等待，其余由本线程计算
+        owned, waiting = [], []
+        with self._lock:
+            for key in keys:
+                if key in result:
+                    continue
+                value = self._lookup(key)
+                if value is not _MISSING:
+                    result[key] = value
+                elif key in self._pending:
+                    waiting.append((key, self._pending[key]))
+                else:
+                    self._pending[key] = threading.Event()
+                    owned.append(key)
+
+        if owned:
+            try:
+                computed = compute_many(owned)
+                with self._lock:
+                    for key in owned:
+                        self._values[key] = result[key] = computed[key]
+                    if self.maxsize is not None:
+                        while len(self._values) > self.maxsize:
+                            self._values.popitem(last=False)
+            finally:
+                with self._lock:
+                    for key in owned:
+                        self._pending.pop(key).set()
+
+        for key, event in waiting:
+            event.wait()
+            value = self._lookup(key)
+            if value is not _MISSING:
+                result[key] = value
+            else:
+                # 计算失败，或算完后已被淘汰
+                result.update(self.get_many([key], compute_many))
+
+        return result
+
+    def clear(self):
+        """清空缓存（计算中的键不受影响）"""
+        with self._lock:
+            self._values = self._new_store()
+
+    def _new_store(self) -> Dict[Hashable, Any]:
+        """不限大小时用普通字典；限定大小时用有序字典记录使用顺序"""
+        return {} if self.maxsize is None else OrderedDict()
+
+    def _lookup(self, key: Hashable) -> Any:
+        """读取缓存值（未命中返回 _MISSING）；限定大小时把命中的键移到最近使用端"""
+        values = self._values
+        value = values.get(key, _MISSING)
+        if value is not _MISSING and self.maxsize is not None:
+            try:
+                values.move_to_end(key)
+            except KeyError:
+                # 其他线程刚好淘汰了该键，本次读到的值仍然有效
+                pass
+        return value
+
+    def _reset_after_fork(self):
+        """fork 后子进程中只有当前线程：重建锁，丢弃其他线程计算中的键"""
+        self._lock = threading.Lock()
+        self._pending = {}
+
+
+def _reset_caches_after_fork():
+    for cache in list(_single_flight_caches):
+        cache._reset_after_fork()
+    for batcher in list(_micro_batchers):
+        batcher._reset_after_fork()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_caches_after_fork)
+
+
+def single_flight(func: Optional[Callable] = None, *, maxsize: Optional[int] = None) -> Callable:
+    """
+    函数结果缓存装饰器（按位置参数缓存，线程安全，同一参数只计算一次）
+
+    用法同 functools.lru_cache：@single_flight 不限大小，@single_flight(maxsize=256) 按最近最少使用淘汰。
+
+    Args:
+        func: 被缓存的函数，参数须可哈希
+        maxsize: 最多缓存的参数组数，None表示不限
+
+    Returns:
+        带缓存的函数，cache 属性为对应的 SingleFlightCache
+    """
+    if func is None:
+        return functools.partial(single_flight, maxsize=maxsize)
+
+    cache = SingleFlightCache(maxsize)
+
+    @functools.wraps(func)
+    def wrapper(*args):
+        return cache.get(args, lambda: func(*args))
+
+    wrapper.cache = cache
+    return wrapper
+
+
+# ============================================================================
+# 请求合批
+# ============================================================================
+
+# 全部合批器实例（fork 后在子进程中重置锁和未完成的批次）
+_micro_batchers = weakref.WeakSet()
+
+
+class _Batch:
+    """一个合批窗口内的调用：各调用的参数列、结果 Future 及累计项数"""
+
+    __slots__ = ('calls', 'size')
+
+    def __init__(self):
+        self.calls: List[Tuple[Tuple[np.ndarray, ...], Future]] = []
+        self.size = 0
+
+
+class MicroBatcher:
+    """
+    向量化计算的合批器：并发提交的调用在时间窗内合并为一次计算
+
+    窗口内第一个提交的线程负责本批：等到窗口结束或累计项数达到上限后，把各调用的参数
+    按列拼接，只调用一次 func，再按各自项数切分结果、写入各调用的 Future；其他线程只等待
+    自己的 Future。单个调用的额外等待不超过一个窗口；计算失败时本批各调用都得到该异常。
+    """
+
+    def __init__(self, func: Callable[..., np.ndarray], window_seconds: float, max_items: int):
+        """
+        初始化合批器
+
+        Args:
+            func: 向量化计算函数，参数为若干等长的一维数组，返回与之等长的一维数组
+            window_seconds: 合批窗口（秒）
+            max_items: 每批最多项数，达到后立即计算
+        """
+        self.func = func
+        self.window_seconds = window_seconds
+        self.max_items = max_items
+        self.batches = 0  # 已执行的批次数
+        self._batch: Optional[_Batch] = None
+        self._condition = threading.Condition()
+        _micro_batchers.add(self)
+
+    def submit(self, *columns) -> np.ndarray:
+        """
+        提交一次计算并等待结果
+
+        Args:
+            *columns: func 的参数（标量或等长的一维数组）
+
+        Returns:
+            np.ndarray: 本次提交对应的结果（一维数组）
+        """
+        columns = tuple(np.atleast_1d(column) for column in columns)
+        future = Future()
+        with self._condition:
+            batch = self._batch
+            leader = batch is None or batch.size >= self.max_items
+            if leader:
+                batch = self._batch = _Batch()
+            batch.calls.append((columns, future))
+            batch.size += len(columns[0])
+            if batch.size >= self.max_items:
+                self._condition.notify_all()
+
+        if leader:
+            deadline = time.monotonic() + self.window_seconds
+            with self._condition:
+                while batch.size < self.max_items:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                if self._batch is batch:
+                    self._batch = None
+            self._run(batch)
+
+        return future.result()
+
+    def _run(self, batch: _Batch):
+        """执行一批：参数按列拼接后计算一次，结果按各调用的项数切分"""
+        calls = batch.calls
+        try:
+            if len(calls) == 1:
+                results = [np.asarray(self.func(*calls[0][0]))]
+            else:
+                merged = [np.concatenate(column) for column in zip(*(columns for columns, _ in calls))]
+                bounds = np.cumsum([len(columns[0]) for columns, _ in calls])[:-1]
+                results = np.split(np.asarray(self.func(*merged)), bounds)
+        except BaseException as e:
+            for _, future in calls:
+                future.set_exception(e)
+            return
+        self.batches += 1
+        for (_, future), result in zip(calls, results):
+            future.set_result(result)
+
+    def _reset_after_fork(self):
+        """fork 后子进程中只有当前线程：重建锁，丢弃父进程其他线程未完成的批次"""
+        self._condition = threading.Condition()
+        self._batch = None
@@ -0,0 +1,300 @@
+"""
+节气时间预计算表
+
+主要功能：
+1. 将指定年份范围内的全部节气时间写入紧凑的二进制表（int64 秒，不足整秒向上取整，200年约40KB）
+2. JieqiTable：加载节气表，用二分查找回答 find_jieqi / find_lichun / get_solstices
+
+查表过程只依赖标准库，表覆盖查询范围时无需导入 skyfield、无需加载星历文件。
+
+用法：
+    python jieqi_table.py 1900 2050 -o jieqi_table.bin
+
+作者：redrockhorse
+"""
+
+from datetime import datetime, timezone
+from typing import List, Tuple, Optional
+from array import array
+import argparse
+import bisect
+import math
+import struct
+import sys
+
+
+# ============================================================================
+# 常量定义区
+# ============================================================================
+
+class JieqiTableFormat:
+    """节气表文件格式"""
+    MAGIC = b'JQTB'
+    VERSION = 2  # 版本2起节气时间按整秒向上取整（与逐日历法索引的交节时刻一致）
+
+    # 文件头：魔数、版本、起始年份、结束年份（小端）
+    HEADER = struct.Struct('<4sHhh')
+
+    # 节气名称（与 qimenpaipan.JieqiConstants.JIEQI_INFO 顺序一致）
+    JIEQI_NAMES = (
+        '立春', '雨水', '惊蛰', '春分', '清明', '谷雨', '立夏', '小满',
+        '芒种', '夏至', '小暑', '大暑', '立秋', '处暑', '白露', '秋分',
+        '寒露', '霜降', '立冬', '小雪', '大雪', '冬至', '小寒', '大寒'
+    )
+
+    # 一个公历年内节气的时间顺序（JIEQI_NAMES索引）：小寒、大寒、立春……冬至
+    YEAR_ORDER = (22, 23) + tuple(range(22))
+
+    # 每个节气在年内的位置
+    YEAR_POSITION = {jieqi_idx: pos for pos, jieqi_idx in enumerate(YEAR_ORDER)}
+
+    TERMS_PER_YEAR = 24
+
+
+# ============================================================================
+# 节气表查询
+# ============================================================================
+
+class JieqiTable:
+    """节气时间预计算表"""
+
+    def __init__(self, start_year: int, end_year: int, seconds: array):
+        """
+        初始化节气表
+
+        Args:
+            start_year: 起始年份（含）
+            end_year: 结束年份（含）
+            seconds: 按时间排序的节气时间（UTC Unix秒）
+        """
+        expected = (end_year - start_year + 1) * JieqiTableFormat.TERMS_PER_YEAR
+        if len(seconds) != expected:
+            raise ValueError(f"节气表长度错误: 期望{expected}项，实际{len(seconds)}项")
+
+        self.start_year = start_year
+        self.end_year = end_year
+        self.seconds = seconds
+
+    @classmethod
+    def load(cls, path: str) -> 'JieqiTable':
+        """
+        从文件加载节气表
+
+        Args:
+            path: 节气表文件路径
+
+        Returns:
+            JieqiTable: 节气表
+        """
+        with open(path, 'rb') as f:
+            header = f.read(JieqiTableFormat.HEADER.size)
+            magic, version, start_year, end_year = JieqiTableFormat.HEADER.unpack(header)
+            if magic != JieqiTableFormat.MAGIC or version != JieqiTableFormat.VERSION:
+                raise ValueError(f"无效的节气表文件: {path}")
+
+            seconds = array('q')
+            seconds.frombytes(f.read())
+
+        if sys.byteorder != 'little':
+            seconds.byteswap()
+
+        return cls(start_year, end_year, seconds)
+
+    def save(self, path: str):
+        """
+        将节气表写入文件
+
+        Args:
+            path: 节气表文件路径
+        """
+        seconds = array('q', self.seconds)
+        if sys.byteorder != 'little':
+            seconds.byteswap()
+
+        with open(path, 'wb') as f:
+            f.write(JieqiTableFormat.HEADER.pack(
+                JieqiTableFormat.MAGIC, JieqiTableFormat.VERSION,
+                self.start_year, self.end_year
+            ))
+            f.write(seconds.tobytes())
+
+    # ========================================================================
+    # 覆盖范围
+    # ========================================================================
+
+    def covers_year(self, year: int) -> bool:
+        """判断年份是否在表内"""
+        return self.start_year <= year <= self.end_year
+
+    def covers(self, input_dt: datetime) -> bool:
+        """
+        判断表能否确定输入时间前后相邻的节气
+
+        Args:
+            input_dt: 输入时间（带时区；不带时区按UTC处理）
+
+        Returns:
+            bool: 输入时间是否位于表内首末节气之间
+        """
+        ts = self._timestamp(input_dt)
+        return self.seconds[0] <= ts < self.seconds[-1]
+
+    # ========================================================================
+    # 查询方法
+    # ========================================================================
+
+    def get_jieqi_time(self, year: int, target_degree: int) -> datetime:
+        """
+        查询指定年份特定黄经度数对应的节气时间
+
+        Args:
+            year: 年份
+            target_degree: 目标黄经度数
+
+        Returns:
+            datetime: 节气时间（UTC）
+        """
+        jieqi_idx = (target_degree % 360 - 315) % 360 // 15
+        return self._get(year, jieqi_idx)
+
+    def get_year_jieqi(self, year: int) -> List[datetime]:
+        """
+        查询指定年份的全部24节气时间
+
+        Args:
+            year: 年份
+
+        Returns:
+            list: 按时间排序的24个节气时间（UTC），顺序见 JieqiTableFormat.YEAR_ORDER
+        """
+        if not self.covers_year(year):
+            raise KeyError(f"年份 {year} 超出节气表范围 {self.start_year}-{self.end_year}")
+
+        start = (year - self.start_year) * JieqiTableFormat.TERMS_PER_YEAR
+        return [self._to_datetime(seconds)
+                for seconds in self.seconds[start:start + JieqiTableFormat.TERMS_PER_YEAR]]
+
+    def find_lichun(self, year: int) -> datetime:
+        """
+        查询指定年份的立春时间
+
+        Args:
+            year: 年份
+
+        Returns:
+            datetime: 立春时间（UTC）
+        """
+        return self._get(year, JieqiTableFormat.JIEQI_NAMES.index('立春'))
+
+    def get_solstices(self, year: int) -> Tuple[datetime, datetime]:
+        """
+        查询指定年份的夏至和冬至时间
+
+        Args:
+            year: 年份
+
+        Returns:
+            tuple: (夏至时间, 冬至时间)
+        """
+        return (
+            self._get(year, JieqiTableFormat.JIEQI_NAMES.index('夏至')),
+            self._get(year, JieqiTableFormat.JIEQI_NAMES.index('冬至'))
+        )
+
+    def find_jieqi(self, input_dt: datetime, forward: bool = True) -> Optional[Tuple[datetime, str]]:
+        """
+        找到输入时间对应的节气
+
+        Args:
+            input_dt: 输入时间
+            forward: True表示向前找（找小于等于输入时间的最近节气），
+                    False表示向后找（找大于输入时间的最近节气）
+
+        Returns:
+            tuple: (节气时间, 节气名称) 或 None（超出表范围）
+        """
+        if not self.covers(input_dt):
+            return None
+
+        i = bisect.bisect_right(self.seconds, self._timestamp(input_dt))
+        if forward:
+            i -= 1
+
+        jieqi_idx = JieqiTableFormat.YEAR_ORDER[i % JieqiTableFormat.TERMS_PER_YEAR]
+        return self._to_datetime(self.seconds[i]), JieqiTableFormat.JIEQI_NAMES[jieqi_idx]
+
+    # ========================================================================
+    # 辅助方法
+    # ========================================================================
+
+    def _get(self, year: int, jieqi_idx: int) -> datetime:
+        """按年份和节气索引取节气时间"""
+        if not self.covers_year(year):
+            raise KeyError(f"年份 {year} 超出节气表范围 {self.start_year}-{self.end_year}")
+
+        i = ((year - self.start_year) * JieqiTableFormat.TERMS_PER_YEAR
+             + JieqiTableFormat.YEAR_POSITION[jieqi_idx])
+        return self._to_datetime(self.seconds[i])
+
+    @staticmethod
+    def _timestamp(input_dt: datetime) -> float:
+        """datetime转UTC Unix秒（不带时区按UTC处理）"""
+        if input_dt.tzinfo is None:
+            input_dt = input_dt.replace(tzinfo=timezone.utc)
+        return input_dt.timestamp()
+
+    @staticmethod
+    def _to_datetime(seconds: int) -> datetime:
+        """UTC Unix秒转datetime"""
+        return datetime.fromtimestamp(seconds, tz=timezone.utc)
+
+
+# ============================================================================
+# 节气表生成
+# ============================================================================
+
+def build_jieqi_table(start_year: int, end_year: int, backend='skyfield') -> JieqiTable:
+    """
+    用天文计算后端求解指定年份范围内的全部节气，生成节气表
+
+    默认用星历计算，星历文件需覆盖整个年份范围（de421 覆盖 1900-2050，更大范围请改用 de440 等星历）。
+    与 calendar_index.build_calendar_index 使用同一后端时，两者对交节那一秒的判定一致。
+
+    Args:
+        start_year: 起始年份（含）
+        end_year: 结束年份（含）
+        backend: 天文计算后端（实例或名称），默认星历后端
+
+    Returns:
+        JieqiTable: 节气表
+    """
+    from qimenpaipan import get_backend
+
+    years = list(range(start_year, end_year + 1))
+    jieqi_times, jieqi_indexes = get_backend(backend).jieqi_instants(years)
+
+    # 校验求解结果的时间顺序与表格式约定一致
+    expected = JieqiTableFormat.YEAR_ORDER * len(years)
+    if tuple(jieqi_indexes) != expected:
+        raise ValueError("节气时间顺序异常，无法生成节气表")
+
+    # 向上取整：整秒输入时间在交节时刻之后的首个取值即为表中时刻，与星历计算、逐日历法索引判定一致
+    seconds = array('q', (math.ceil(t.timestamp()) for t in jieqi_times))
+    return JieqiTable(start_year, end_year, seconds)
+
+
+# ============================================================================
+# 主程序入口
+# ============================================================================
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='生成节气时间预计算表')
+    parser.add_argument('start_year', type=int, help='起始年份（含）')
+    parser.add_argument('end_year', type=int, help='结束年份（含）')
+    parser.add_argument('-o', '--output', default='jieqi_table.bin', help='输出文件路径')
+    parser.add_argument('--backend', default='skyfield', help='天文计算后端名称（默认 skyfield）')
+    args = parser.parse_args()
+
+    table = build_jieqi_table(args.start_year, args.end_year, args.backend)
+    table.save(args.output)
+    print(f"节气表已写入 {args.output}: {args.start_year}-{args.end_year}, 共 {len(table.seconds)} 项")
@@ -4,18 +4,32 @@
 主要功能：
 1. 天文历法计算（立春、节气、太阳黄经等）
 2. 干支计算（年月日时干支）
-3. 奇门遁甲排盘（置闰法）
+3. 奇门遁甲排盘（置闰法、拆补法）
 4. 地盘、天盘、八门、八神排布
 
 作者：redrockhorse
 版本：2.0（优化版）
 """
 
-from datetime import datetime, timezone, timedelta
-from typing import Tuple, Dict, List, Optional
+from datetime import date, datetime, timezone, timedelta
+from typing import Tuple, Dict, Iterable, Iterator, List, Optional, Union
 from collections import deque
-from skyfield.api import load
+from collections.abc import Mapping
+import abc
+import bisect
 import logging
+import multiprocessing
+import os
+import threading
+
+import numpy as np
+
+from ephemeris import EphemerisProvider
+from jieqi_cache import JieqiCache, MicroBatcher, SingleFlightCache
+from calendar_index import CalendarIndex, CalendarIndexFormat
+from jieqi_table import JieqiTable, JieqiTableFormat
+from solar_model import SolarLongitudeModel
+import solar_analytic
 
 # ============================================================================
 # 配置日志
@@ -33,19 +47,33 @@ logger = logging.getLogger(__name__)
 
 class AstronomyConfig:
     """天文计算配置"""
-    EPHEMERIS_FILE = 'de421.bsp'
+    EPHEMERIS_FILE = 'de421.bsp'  # 星历文件，也可用 ephemeris_subset.py 提取的太阳/地球子集
     EPHEMERIS_DIR = './'
     LICHUN_DEGREE = 315  # 立春对应的太阳黄经度数
-    BINARY_SEARCH_ITERATIONS = 20  # 二分法查找迭代次数
+    SUN_MEAN_SPEED = 0.9856474  # 太阳平均角速度（度/日），作为牛顿迭代的导数估计
+    SUN_SPEED_RANGE = (0.95, 1.02)  # 太阳视角速度上下界（度/日），用于校验搜索区间
+    SUN_MEAN_LONGITUDE_J2000 = 280.46646  # J2000.0时刻太阳平黄经（J2000黄道，度）
+    SUN_MEAN_LONGITUDE_RATE = 0.9856091  # 太阳平黄经变化率（J2000黄道，度/日）
+    PREDICT_BRACKET_DAYS = 2.5  # 平黄经预测时刻前后的搜索半宽（日）
+    ROOT_TOLERANCE_SECONDS = 0.5  # 黄经求根默认精度（秒）
+    ROOT_MAX_ITERATIONS = 20  # 黄经求根最大迭代次数
+    JIEQI_TABLE_FILE = 'jieqi_table.bin'  # 节气预计算表（由 jieqi_table.py 生成，不存在时实时计算）
+    JIEQI_CACHE_FILE = None  # 节气持久化缓存（SQLite），如 'jieqi_cache.sqlite'；None表示不启用
+    SOLAR_MODEL_FILE = 'solar_model.npz'  # 切比雪夫太阳黄经模型（由 solar_model.py 生成，不存在时直接用星历）
+    CALENDAR_INDEX_FILE = 'calendar_index.bin'  # 逐日历法索引（由 calendar_index.py 生成，不存在时逐项计算）
+    BEIJING_UTC_OFFSET_HOURS = 8  # 北京时间与UTC的时差（小时）
+    BACKEND = 'table'  # 默认天文计算后端：'table'（节气表，表外回退到星历）、'skyfield'、'analytic'、'batching'，也可为后端实例
+    BATCH_WINDOW_SECONDS = 0.002  # 合批后端的合批窗口（秒）
+    BATCH_MAX_ITEMS = 256  # 合批后端每批最多的时刻/节气数，达到后立即计算
 
 
 class GanzhiConstants:
-    """干支常量"""
+    """干支常量（内部以序号表示：天干0-9、地支0-11、六十甲子0-59，名称只在输出时取用）"""
     # 十天干
-    TIANGAN = ['甲', '乙', '丙', '丁', '戊', '己', '庚', '辛', '壬', '癸']
+    TIANGAN = ('甲', '乙', '丙', '丁', '戊', '己', '庚', '辛', '壬', '癸')
     
     # 十二地支
-    DIZHI = ['子', '丑', '寅', '卯', '辰', '巳', '午', '未', '申', '酉', '戌', '亥']
+    DIZHI = ('子', '丑', '寅', '卯', '辰', '巳', '午', '未', '申', '酉', '戌', '亥')
     
     # 天干序号映射
     TIANGAN_ORDER = {gan: idx for idx, gan in enumerate(TIANGAN)}
@@ -53,14 +81,15 @@ class GanzhiConstants:
     # 地支序号映射
     DIZHI_ORDER = {zhi: idx for idx, zhi in enumerate(DIZHI)}
     
-    # 年干对应正月天干规则（五虎遁月）
-    YEAR_GAN_TO_MONTH_START = {
-        '甲': '丙', '己': '丙',
-        '乙': '戊', '庚': '戊',
-        '丙': '庚', '辛': '庚',
-        '丁': '壬', '壬': '壬',
-        '戊': '甲', '癸': '甲'
-    }
+    # 六十甲子（序号 i 的天干为 i % 10，地支为 i % 12）及其序号映射
+    JIAZI = tuple(gan + zhi for gan, zhi in zip(TIANGAN * 6, DIZHI * 5))
+    JIAZI_ORDER = {gz: idx for idx, gz in enumerate(JIAZI)}
+    
+    # 年干 -> 正月天干（五虎遁月）：甲己丙、乙庚戊、丙辛庚、丁壬壬、戊癸甲
+    YEAR_GAN_TO_MONTH_START = (2, 4, 6, 8, 0, 2, 4, 6, 8, 0)
+    
+    # 日干 -> 子时天干（五鼠遁日）：甲己甲、乙庚丙、丙辛戊、丁壬庚、戊癸壬
+    DAY_GAN_TO_HOUR_START = (0, 2, 4, 6, 8, 0, 2, 4, 6, 8)
     
     # 六十甲子基准日期（用于日干支计算）
     BASE_DATE = datetime(2025, 2, 24).date()  # 甲子日
@@ -68,23 +97,33 @@ class GanzhiConstants:
 
 
 class JieqiConstants:
-    """节气常量"""
+    """节气常量（内部以 JIEQI_INFO 序号0-23表示节气）"""
     # 节气信息：(太阳黄经度数, 所在月份, 节气名称)
-    JIEQI_INFO = [
+    JIEQI_INFO = (
         (315, 2, '立春'), (330, 2, '雨水'), (345, 3, '惊蛰'), (0, 3, '春分'),
         (15, 4, '清明'), (30, 4, '谷雨'), (45, 5, '立夏'), (60, 5, '小满'),
         (75, 6, '芒种'), (90, 6, '夏至'), (105, 7, '小暑'), (120, 7, '大暑'),
         (135, 8, '立秋'), (150, 8, '处暑'), (165, 9, '白露'), (180, 9, '秋分'),
         (195, 10, '寒露'), (210, 10, '霜降'), (225, 11, '立冬'), (240, 11, '小雪'),
         (255, 12, '大雪'), (270, 12, '冬至'), (285, 1, '小寒'), (300, 1, '大寒')
-    ]
+    )
+    
+    # 节气名称
+    JIEQI_NAMES = tuple(name for _, _, name in JIEQI_INFO)
     
     # 节气名称到索引的映射
-    JIEQI_ORDER = {name: idx for idx, (_, _, name) in enumerate(JIEQI_INFO)}
+    JIEQI_ORDER = {name: idx for idx, name in enumerate(JIEQI_NAMES)}
+    
+    # 常用节气序号
+    MANGZHONG, XIAZHI, DAXUE, DONGZHI = 8, 9, 20, 21
+    
+    # 节气黄经度数与所在月份数组（用于向量化求解）
+    JIEQI_DEGREES = np.array([degree for degree, _, _ in JIEQI_INFO], dtype=float)
+    JIEQI_MONTHS = np.array([month for _, month, _ in JIEQI_INFO], dtype=int)
 
 
 class QimenConstants:
-    """奇门遁甲常量"""
+    """奇门遁甲常量（九星、八门、八神均以序号表示，名称只在输出时取用）"""
     
     # 九宫方位映射（洛书数序）
     PALACE_MAP = {
@@ -93,134 +132,110 @@ class QimenConstants:
         7: ("兑", "西"), 8: ("艮", "东北"), 9: ("离", "南")
     }
     
-    # 宫位对应的原始星
-    POS_STAR_MAP = {
-        1: "天蓬", 2: "天芮", 3: "天冲", 4: "天辅",
-        5: "天禽", 6: "天心", 7: "天柱", 8: "天任", 9: "天英"
-    }
-    
-    # 九星原始宫位映射
-    STAR_ORIGIN_POS = {
-        "天蓬": 1, "天芮": 2, "天冲": 3, "天辅": 4,
-        "天禽": 5, "天心": 6, "天柱": 7, "天任": 8, "天英": 9
-    }
+    # 九星（序号+1为原始宫位）
+    STARS = ("天蓬", "天芮", "天冲", "天辅", "天禽", "天心", "天柱", "天任", "天英")
+    TIANRUI, TIANQIN = 1, 4
     
-    # 九星顺序数组（用于旋转排布）
-    STAR_ORIGIN_ARRAY = ["天蓬", "天任", "天冲", "天辅", "天英", "天芮", "天柱", "天心"]
+    # 九星顺序数组（用于旋转排布）：天蓬、天任、天冲、天辅、天英、天芮、天柱、天心
+    STAR_ORIGIN_ARRAY = (0, 7, 2, 3, 8, 1, 6, 5)
     
-    # 三奇六仪顺序
-    QIYI_ORDER = ["戊", "己", "庚", "辛", "壬", "癸", "丁", "丙", "乙"]
+    # 三奇六仪顺序（天干序号）：戊、己、庚、辛、壬、癸、丁、丙、乙
+    QIYI_ORDER = (4, 5, 6, 7, 8, 9, 3, 2, 1)
     
-    # 六甲旬首对应的宫位
-    XUNSHOU_POSITION = {
-        "甲子": 1, "甲戌": 2, "甲申": 8,
-        "甲午": 9, "甲辰": 4, "甲寅": 3
-    }
+    # 六甲旬首对应的宫位（按旬序号：甲子、甲戌、甲申、甲午、甲辰、甲寅）
+    XUNSHOU_POSITION = (1, 2, 8, 9, 4, 3)
     
-    # 旬首六仪映射
-    XUNSHOU_LIUYI = {
-        "甲子": "戊", "甲戌": "己", "甲申": "庚",
-        "甲午": "辛", "甲辰": "壬", "甲寅": "癸"
-    }
+    # 旬首六仪（按旬序号）：甲子戊、甲戌己、甲申庚、甲午辛、甲辰壬、甲寅癸
+    XUNSHOU_LIUYI = (4, 5, 6, 7, 8, 9)
     
     # 八门顺序
-    MEN_ORDER = ["休", "生", "伤", "杜", "景", "死", "惊", "开"]
+    MEN_ORDER = ("休", "生", "伤", "杜", "景", "死", "惊", "开")
+    
+    # 八神
+    SHEN = ("值符", "腾蛇", "太阴", "六合", "白虎", "玄武", "九地", "九天")
     
     # 八神顺序（阳遁）
-    SHEN_ORDER_YANG = ["值符", "腾蛇", "太阴", "六合", "白虎", "玄武", "九地", "九天"]
+    SHEN_ORDER_YANG = (0, 1, 2, 3, 4, 5, 6, 7)
     
-    # 八神顺序（阴遁）
-    SHEN_ORDER_YIN = ["值符", "九天", "九地", "玄武", "白虎", "六合", "太阴", "腾蛇"]
+    # 八神顺序（阴遁）：值符、九天、九地、玄武、白虎、六合、太阴、腾蛇
+    SHEN_ORDER_YIN = (0, 7, 6, 5, 4, 3, 2, 1)
     
-    # 时支与宫位映射
-    SHIZHI_POSITION = {
-        "子": 1, "丑": 8, "寅": 8, "卯": 3, "辰": 4, "巳": 4,
-        "午": 9, "未": 2, "申": 2, "酉": 7, "戌": 6, "亥": 6
-    }
+    # 时支与宫位映射（按地支序号）
+    SHIZHI_POSITION = (1, 8, 8, 3, 4, 4, 9, 2, 2, 7, 6, 6)
     
-    # 阳遁局数表
-    YANG_JU_MAPPING = {
-        "冬至": {"上元": 1, "中元": 7, "下元": 4},
-        "小寒": {"上元": 2, "中元": 8, "下元": 5},
-        "大寒": {"上元": 3, "中元": 9, "下元": 6},
-        "立春": {"上元": 8, "中元": 5, "下元": 2},
-        "雨水": {"上元": 9, "中元": 6, "下元": 3},
-        "惊蛰": {"上元": 1, "中元": 7, "下元": 4},
-        "春分": {"上元": 3, "中元": 9, "下元": 6},
-        "清明": {"上元": 4, "中元": 1, "下元": 7},
-        "谷雨": {"上元": 5, "中元": 2, "下元": 8},
-        "立夏": {"上元": 4, "中元": 1, "下元": 7},
-        "小满": {"上元": 5, "中元": 2, "下元": 8},
-        "芒种": {"上元": 6, "中元": 3, "下元": 9}
-    }
+    # 局数表：节气序号 -> (上元, 中元, 下元) 局数
+    JU_NUMBERS = (
+        (8, 5, 2), (9, 6, 3), (1, 7, 4), (3, 9, 6),  # 立春、雨水、惊蛰、春分
+        (4, 1, 7), (5, 2, 8), (4, 1, 7), (5, 2, 8),  # 清明、谷雨、立夏、小满
+        (6, 3, 9), (9, 3, 6), (8, 2, 5), (7, 1, 4),  # 芒种、夏至、小暑、大暑
+        (2, 5, 8), (1, 4, 7), (9, 3, 6), (7, 6, 5),  # 立秋、处暑、白露、秋分
+        (6, 5, 4), (5, 4, 3), (6, 5, 4), (5, 8, 3),  # 寒露、霜降、立冬、小雪
+        (4, 3, 2), (1, 7, 4), (2, 8, 5), (3, 9, 6),  # 大雪、冬至、小寒、大寒
+    )
     
-    # 阴遁局数表
-    YIN_JU_MAPPING = {
-        "夏至": {"上元": 9, "中元": 3, "下元": 6},
-        "小暑": {"上元": 8, "中元": 2, "下元": 5},
-        "大暑": {"上元": 7, "中元": 1, "下元": 4},
-        "立秋": {"上元": 2, "中元": 5, "下元": 8},
-        "处暑": {"上元": 1, "中元": 4, "下元": 7},
-        "白露": {"上元": 9, "中元": 3, "下元": 6},
-        "秋分": {"上元": 7, "中元": 6, "下元": 5},
-        "寒露": {"上元": 6, "中元": 5, "下元": 4},
-        "霜降": {"上元": 5, "中元": 4, "下元": 3},
-        "立冬": {"上元": 6, "中元": 5, "下元": 4},
-        "小雪": {"上元": 5, "中元": 8, "下元": 3},
-        "大雪": {"上元": 4, "中元": 3, "下元": 2}
-    }
+    # 阳遁节气（冬至至芒种），其余为阴遁
+    YANG_DUN = tuple(idx <= 8 or idx >= 21 for idx in range(24))
+    
+    # 三元顺序
+    SANYUAN = ("上元", "中元", "下元")
     
     # 九宫遍历顺序（不含中宫）
-    PALACE_TRAVERSE_ORDER = [1, 8, 3, 4, 9, 2, 7, 6]
+    PALACE_TRAVERSE_ORDER = (1, 8, 3, 4, 9, 2, 7, 6)
+    
+    # 宫位 -> 遍历顺序中的位置（中宫排在最后，下标0不用）
+    PALACE_TRAVERSE_INDEX = (None, 0, 5, 2, 3, 8, 7, 6, 1, 4)
     
-    # 置闰符头对应关系
-    ZHIRUN_FUTOU = {'甲子', '甲午', '己卯', '己酉'}
+    # 置闰符头（六十甲子序号）：甲子、己卯、甲午、己酉
+    ZHIRUN_FUTOU = frozenset({0, 15, 30, 45})
     
-    # 十天干墓库对应地支及奇门宫位
+    # 拆补法符头地支 -> 三元：子午卯酉上元、寅申巳亥中元、辰戌丑未下元
+    CHAIBU_YUAN = (0, 2, 1, 0, 2, 1, 0, 2, 1, 0, 2, 1)
+    
+    # 十天干墓库（按天干序号）：(墓库地支序号, 奇门宫位)
     # 天干入墓：天盘干落在其墓库对应宫位即为入墓
-    TIANGAN_MUKU = {
-        '甲': {'地支': '未', '宫位': 2},   # 坤二宫
-        '乙': {'地支': '戌', '宫位': 6},   # 乾六宫
-        '丙': {'地支': '戌', '宫位': 6},   # 乾六宫
-        '丁': {'地支': '丑', '宫位': 8},   # 艮八宫
-        '戊': {'地支': '戌', '宫位': 6},   # 乾六宫
-        '己': {'地支': '丑', '宫位': 8},   # 艮八宫
-        '庚': {'地支': '丑', '宫位': 8},   # 艮八宫
-        '辛': {'地支': '辰', '宫位': 4},   # 巽四宫
-        '壬': {'地支': '辰', '宫位': 4},   # 巽四宫
-        '癸': {'地支': '未', '宫位': 2},   # 坤二宫
-    }
+    TIANGAN_MUKU = (
+        (7, 2),    # 甲：未，坤二宫
+        (10, 6),   # 乙：戌，乾六宫
+        (10, 6),   # 丙：戌，乾六宫
+        (1, 8),    # 丁：丑，艮八宫
+        (10, 6),   # 戊：戌，乾六宫
+        (1, 8),    # 己：丑，艮八宫
+        (1, 8),    # 庚：丑，艮八宫
+        (4, 4),    # 辛：辰，巽四宫
+        (4, 4),    # 壬：辰，巽四宫
+        (7, 2),    # 癸：未，坤二宫
+    )
     
-    # 六仪击刑的宫位对应
+    # 六仪击刑的宫位对应（按天干序号，甲乙丙丁不是六仪）
     # 六仪击刑：天盘六仪落在其击刑宫位即为击刑
-    LIUYI_JIXING = {
-        '戊': {'旬首': '甲子戊', '击刑宫位': 3, '刑理': '子刑卯', '地支关系': '子（戊）加震（卯）'},   # 震三宫
-        '己': {'旬首': '甲戌己', '击刑宫位': 2, '刑理': '戌刑未', '地支关系': '戌（己）加坤（未）'},   # 坤二宫
-        '庚': {'旬首': '甲申庚', '击刑宫位': 8, '刑理': '申刑寅', '地支关系': '申（庚）加艮（寅）'},   # 艮八宫
-        '辛': {'旬首': '甲午辛', '击刑宫位': 9, '刑理': '午午自刑', '地支关系': '午（辛）加离（午）'},   # 离九宫
-        '壬': {'旬首': '甲辰壬', '击刑宫位': 4, '刑理': '辰辰自刑', '地支关系': '辰（壬）加巽（辰）'},   # 巽四宫
-        '癸': {'旬首': '甲寅癸', '击刑宫位': 4, '刑理': '寅刑巳', '地支关系': '寅（癸）加巽（巳）'},   # 巽四宫
-    }
+    LIUYI_JIXING = (
+        None, None, None, None,
+        {'旬首': '甲子戊', '击刑宫位': 3, '刑理': '子刑卯', '地支关系': '子（戊）加震（卯）'},   # 戊：震三宫
+        {'旬首': '甲戌己', '击刑宫位': 2, '刑理': '戌刑未', '地支关系': '戌（己）加坤（未）'},   # 己：坤二宫
+        {'旬首': '甲申庚', '击刑宫位': 8, '刑理': '申刑寅', '地支关系': '申（庚）加艮（寅）'},   # 庚：艮八宫
+        {'旬首': '甲午辛', '击刑宫位': 9, '刑理': '午午自刑', '地支关系': '午（辛）加离（午）'},   # 辛：离九宫
+        {'旬首': '甲辰壬', '击刑宫位': 4, '刑理': '辰辰自刑', '地支关系': '辰（壬）加巽（辰）'},   # 壬：巽四宫
+        {'旬首': '甲寅癸', '击刑宫位': 4, '刑理': '寅刑巳', '地支关系': '寅（癸）加巽（巳）'},   # 癸：巽四宫
+    )
     
     # 马星：根据时支确定马星地支及所落宫位
-    # 时支 -> (马星地支, 宫位)
-    MAXING = {
-        '申': ('寅', 8), '子': ('寅', 8), '辰': ('寅', 8),   # 艮八宫
-        '亥': ('巳', 4), '卯': ('巳', 4), '未': ('巳', 4),   # 巽四宫
-        '寅': ('申', 2), '午': ('申', 2), '戌': ('申', 2),   # 坤二宫
-        '巳': ('亥', 6), '酉': ('亥', 6), '丑': ('亥', 6),   # 乾六宫
-    }
+    # 时支序号 -> (马星地支序号, 宫位)：申子辰马在寅（艮八宫）、亥卯未马在巳（巽四宫）、
+    # 寅午戌马在申（坤二宫）、巳酉丑马在亥（乾六宫）
+    MAXING = (
+        (2, 8), (11, 6), (8, 2), (5, 4), (2, 8), (11, 6),
+        (8, 2), (5, 4), (2, 8), (11, 6), (8, 2), (5, 4),
+    )
     
     # 门迫：门与宫位五行相克
-    # (门, 宫位) -> 门迫描述
+    # (门序号, 宫位) -> 门迫描述
     MEN_PO = {
-        ('伤', 2): '木门落土宫', ('伤', 8): '木门落土宫',
-        ('杜', 2): '木门落土宫', ('杜', 8): '木门落土宫',
-        ('惊', 3): '金门落木宫', ('惊', 4): '金门落木宫',
-        ('开', 3): '金门落木宫', ('开', 4): '金门落木宫',
-        ('景', 6): '火门落金宫', ('景', 7): '火门落金宫',
-        ('休', 9): '水门落火宫',
-        ('生', 1): '土门落水宫', ('死', 1): '土门落水宫',
+        (2, 2): '木门落土宫', (2, 8): '木门落土宫',   # 伤
+        (3, 2): '木门落土宫', (3, 8): '木门落土宫',   # 杜
+        (6, 3): '金门落木宫', (6, 4): '金门落木宫',   # 惊
+        (7, 3): '金门落木宫', (7, 4): '金门落木宫',   # 开
+        (4, 6): '火门落金宫', (4, 7): '火门落金宫',   # 景
+        (0, 9): '水门落火宫',                          # 休
+        (1, 1): '土门落水宫', (5, 1): '土门落水宫',   # 生、死
     }
 
 
@@ -228,124 +243,890 @@ class QimenConstants:
 # 天文计算模块
 # ============================================================================
 
-# 初始化天文数据
-load.directory = AstronomyConfig.EPHEMERIS_DIR
-ts = load.timescale()
-eph = load(AstronomyConfig.EPHEMERIS_FILE)
+# 天文数据（首次使用时加载，服务端可调用 ephemeris.preload() 预加载）
+ephemeris = EphemerisProvider(AstronomyConfig.EPHEMERIS_FILE, AstronomyConfig.EPHEMERIS_DIR)
+
+# 节气表、太阳黄经模型、节气缓存、后端实例的加载锁（加载完成后读取不加锁）
+_load_lock = threading.Lock()
+
+
+def _reset_load_lock():
+    """fork 后子进程中重建加载锁（父进程其他线程可能正持有该锁）"""
+    global _load_lock
+    _load_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_load_lock)
+
+# 节气预计算表（首次使用时加载）
+_jieqi_table = None
+_jieqi_table_checked = False
+
+
+def get_jieqi_table() -> Optional[JieqiTable]:
+    """
+    获取节气预计算表
+    
+    Returns:
+        JieqiTable: 节气表；表文件不存在时返回None
+    """
+    global _jieqi_table, _jieqi_table_checked
+    if not _jieqi_table_checked:
+        with _load_lock:
+            if not _jieqi_table_checked:
+                path = os.path.join(AstronomyConfig.EPHEMERIS_DIR, AstronomyConfig.JIEQI_TABLE_FILE)
+                if os.path.exists(path):
+                    _jieqi_table = JieqiTable.load(path)
+                    logger.info(f"已加载节气表: {path} ({_jieqi_table.start_year}-{_jieqi_table.end_year})")
+                _jieqi_table_checked = True
+    return _jieqi_table
+
+
+# 切比雪夫太阳黄经模型（首次使用时加载）
+_solar_model = None
+_solar_model_checked = False
+
+
+def get_solar_model() -> Optional[SolarLongitudeModel]:
+    """
+    获取切比雪夫太阳黄经模型
+    
+    Returns:
+        SolarLongitudeModel: 模型；模型文件不存在或并非由当前星历拟合时返回None
+    """
+    global _solar_model, _solar_model_checked
+    if not _solar_model_checked:
+        with _load_lock:
+            if not _solar_model_checked:
+                path = os.path.join(AstronomyConfig.EPHEMERIS_DIR, AstronomyConfig.SOLAR_MODEL_FILE)
+                if os.path.exists(path):
+                    model = SolarLongitudeModel.load(path)
+                    ephemeris_name = os.path.basename(AstronomyConfig.EPHEMERIS_FILE)
+                    if model.ephemeris != ephemeris_name:
+                        logger.warning(f"太阳黄经模型 {path} 由星历 {model.ephemeris or '(未记录)'} 拟合，"
+                                       f"与当前星历 {ephemeris_name} 不符，已忽略（请用 solar_model.py 重新拟合）")
+                    else:
+                        _solar_model = model
+                        logger.info(f"已加载太阳黄经模型: {path} (最大误差 {_solar_model.max_error_seconds:.3f} 秒)")
+                _solar_model_checked = True
+    return _solar_model
+
+
+# 逐日历法索引（首次使用时以内存映射方式打开）
+_calendar_index = None
+_calendar_index_checked = False
+
+
+def get_calendar_index() -> Optional[CalendarIndex]:
+    """
+    获取逐日历法索引
+    
+    Returns:
+        CalendarIndex: 索引；索引文件不存在时返回None
+    """
+    global _calendar_index, _calendar_index_checked
+    if not _calendar_index_checked:
+        with _load_lock:
+            if not _calendar_index_checked:
+                path = os.path.join(AstronomyConfig.EPHEMERIS_DIR, AstronomyConfig.CALENDAR_INDEX_FILE)
+                if os.path.exists(path):
+                    _calendar_index = CalendarIndex.load(path)
+                    logger.info(f"已加载日历索引: {path} ({_calendar_index.first_date} - {_calendar_index.last_date})")
+                _calendar_index_checked = True
+    return _calendar_index
+
+
+# 节气持久化缓存（首次使用时创建）
+_jieqi_cache = None
+
+
+def get_jieqi_cache() -> Optional[JieqiCache]:
+    """
+    获取节气持久化缓存
+    
+    Returns:
+        JieqiCache: 节气缓存；未配置 AstronomyConfig.JIEQI_CACHE_FILE 时返回None
+    """
+    global _jieqi_cache
+    if AstronomyConfig.JIEQI_CACHE_FILE is None:
+        return None
+    if _jieqi_cache is None:
+        with _load_lock:
+            if _jieqi_cache is None:
+                _jieqi_cache = JieqiCache(
+                    os.path.join(AstronomyConfig.EPHEMERIS_DIR, AstronomyConfig.JIEQI_CACHE_FILE),
+                    os.path.join(AstronomyConfig.EPHEMERIS_DIR, AstronomyConfig.EPHEMERIS_FILE)
+                )
+    return _jieqi_cache
 
 
 class AstronomyCalculator:
-    """天文计算类"""
+    """天文计算类（节气相关查询按 AstronomyConfig.BACKEND 或参数 backend 指定的后端计算）"""
     
     @staticmethod
-    def get_sun_longitude(t) -> float:
+    def get_sun_longitude(t):
         """
         获取太阳黄经
         
         Args:
-            t: skyfield时间对象
+            t: skyfield时间对象（可为时间数组，此时只做一次向量化观测）
             
         Returns:
-            float: 太阳黄经度数
+            float | np.ndarray: 太阳黄经度数
         """
-        astro = eph['earth'].at(t).observe(eph['sun'])
+        astro = ephemeris.earth.at(t).observe(ephemeris.sun)
         lat, lon, _ = astro.ecliptic_latlon()
         return lon.degrees
     
     @staticmethod
-    def find_lichun(year: int) -> datetime:
+    def to_time(times, beijing_time: bool = False):
+        """
+        将一批时间转换为一个skyfield时间数组
+        
+        Args:
+            times: datetime、datetime序列或 numpy datetime64 数组（大批量建议用 datetime64）；
+                   带时区的datetime按自身时区换算，不带时区的datetime与datetime64默认按UTC处理
+            beijing_time: 不带时区的时间是否按北京时间（UTC+8）处理
+            
+        Returns:
+            skyfield时间对象（形状与输入一致）
+        """
+        offset_hours = AstronomyConfig.BEIJING_UTC_OFFSET_HOURS if beijing_time else 0
+        naive_tz = timezone(timedelta(hours=offset_hours))
+        values = np.asarray(times)
+        
+        if values.dtype.kind == 'M':
+            microseconds = values.astype('datetime64[us]').astype(np.int64) - offset_hours * 3600 * 10 ** 6
+            days, day_microseconds = np.divmod(microseconds, 86400 * 10 ** 6)
+            seconds = day_microseconds / 1e6
+        else:
+            timestamps = np.fromiter(
+                ((t if t.tzinfo else t.replace(tzinfo=naive_tz)).timestamp() for t in values.ravel()),
+                dtype=float, count=values.size
+            ).reshape(values.shape)
+            days, seconds = np.divmod(timestamps, 86400)
+        
+        # 按日、日内秒数构造，闰秒由skyfield按所在日期处理
+        return ephemeris.ts.utc(1970, 1, 1 + days.astype(int), 0, 0, seconds)
+    
+    @staticmethod
+    def sun_longitudes(times, beijing_time: bool = False, backend=None) -> np.ndarray:
+        """
+        批量计算太阳黄经（只构造一个时间数组、只做一次向量化观测）
+        
+        Args:
+            times: datetime、datetime序列或 numpy datetime64 数组，时区处理见 to_time()
+            beijing_time: 不带时区的时间是否按北京时间（UTC+8）处理
+            backend: 天文计算后端（实例或名称），默认 AstronomyConfig.BACKEND
+            
+        Returns:
+            np.ndarray: 太阳黄经度数（float64，形状与输入一致）
+        """
+        t = AstronomyCalculator.to_time(times, beijing_time)
+        return np.asarray(get_backend(backend).sun_longitude(t.tt), dtype=np.float64)
+    
+    @staticmethod
+    def _longitude_offset(longitude, target_degree):
+        """
+        计算太阳黄经超过目标度数的角度（按±180°环形比较，避免0°/360°处误判）
+        
+        Args:
+            longitude: 太阳黄经度数（标量或数组）
+            target_degree: 目标黄经度数（标量或数组）
+            
+        Returns:
+            float | np.ndarray: 黄经差，范围[-180, 180)，正值表示已越过目标
+        """
+        return (np.asarray(longitude) - target_degree + 180) % 360 - 180
+    
+    @staticmethod
+    def predict_jieqi_tt(years, target_degrees) -> np.ndarray:
+        """
+        用太阳平黄经模型预测节气时刻（忽略中心差，误差约±2日，无需星历）
+        
+        Args:
+            years: 年份（标量或数组），小寒、大寒取该年1月，冬至取该年12月
+            target_degrees: 目标黄经度数（标量或数组）
+            
+        Returns:
+            np.ndarray: 预测的TT儒略日
+        """
+        years = np.asarray(years, dtype=int)
+        
+        # 当年1月1日的儒略日（1970-01-01 = JD 2440587.5）
+        jan1 = (years - 1970).astype('datetime64[Y]').astype('datetime64[D]').astype(float) + 2440587.5
+        jan1_longitude = (
+            AstronomyConfig.SUN_MEAN_LONGITUDE_J2000
+            + AstronomyConfig.SUN_MEAN_LONGITUDE_RATE * (jan1 - 2451545.0)
+        )
+        
+        return jan1 + (np.asarray(target_degrees) - jan1_longitude) % 360 / AstronomyConfig.SUN_MEAN_LONGITUDE_RATE
+    
+    @staticmethod
+    def solve_sun_longitude(target_degrees, guess_tt,
+                            tolerance_seconds: Optional[float] = None,
+                            bracket_days: Optional[float] = None,
+                            longitude_func=None) -> Tuple[np.ndarray, int]:
+        """
+        求太阳黄经到达目标度数的时刻（带区间保护的牛顿/割线法，数组同步迭代）
+        
+        首步以太阳平均角速度作为导数做牛顿迭代，之后用最近两次黄经值做割线迭代，
+        每轮只做一次向量化星历观测。迭代点限制在搜索区间内，越界时改用二分。
+        每次观测后按太阳角速度上下界推出根所在范围：若与搜索区间不相交，
+        说明预测失准，搜索区间扩展为该范围。
+        
+        Args:
+            target_degrees: 目标黄经度数（标量或数组）
+            guess_tt: 初始猜测时刻（TT儒略日，标量或数组）
+            tolerance_seconds: 精度（秒），默认 AstronomyConfig.ROOT_TOLERANCE_SECONDS
+            bracket_days: 初始搜索区间半宽（日），默认 AstronomyConfig.PREDICT_BRACKET_DAYS
+            longitude_func: 太阳黄经函数（输入TT儒略日数组），默认用星历观测
+            
+        Returns:
+            tuple: (各目标的TT儒略日数组, 黄经计算次数)
+        """
+        if tolerance_seconds is None:
+            tolerance_seconds = AstronomyConfig.ROOT_TOLERANCE_SECONDS
+        if bracket_days is None:
+            bracket_days = AstronomyConfig.PREDICT_BRACKET_DAYS
+        if longitude_func is None:
+            longitude_func = lambda tt: AstronomyCalculator.get_sun_longitude(ephemeris.ts.tt_jd(tt))
+        tolerance_days = tolerance_seconds / 86400
+        speed_min, speed_max = AstronomyConfig.SUN_SPEED_RANGE
+        
+        target_degrees = np.asarray(target_degrees, dtype=float)
+        t = np.broadcast_to(np.asarray(guess_tt, dtype=float), target_degrees.shape).copy()
+        lo, hi = t - bracket_days, t + bracket_days
+        speed = np.full(t.shape, AstronomyConfig.SUN_MEAN_SPEED)
+        prev_t = prev_offset = None
+        
+        for iteration in range(1, AstronomyConfig.ROOT_MAX_ITERATIONS + 1):
+            offset = AstronomyCalculator._longitude_offset(longitude_func(t), target_degrees)
+            
+            # 由角速度上下界推出根的范围，与搜索区间求交；不相交则扩展区间
+            root_lo = t - np.maximum(offset / speed_min, offset / speed_max)
+            root_hi = t - np.minimum(offset / speed_min, offset / speed_max)
+            contained = (root_lo <= hi) & (root_hi >= lo)
+            if not np.all(contained):
+                logger.debug(f"平黄经预测区间未包含节气时刻，扩展 {np.count_nonzero(~contained)} 项")
+            lo = np.where(contained, np.maximum(lo, root_lo), root_lo)
+            hi = np.where(contained, np.minimum(hi, root_hi), root_hi)
+            
+            # 割线斜率：仅在两点可区分且斜率合理时替代平均角速度
+            if prev_t is not None:
+                dt = t - prev_t
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    secant = (offset - prev_offset) / dt
+                usable = (np.abs(dt) > 1e-9) & (secant > speed_min) & (secant < speed_max)
+                speed = np.where(usable, secant, speed)
+            
+            # 牛顿步越出区间时取区间中点
+            t_next = t - offset / speed
+            t_next = np.where((t_next < lo) | (t_next > hi), (lo + hi) / 2, t_next)
+            
+            step = t_next - t
+            prev_t, prev_offset = t, offset
+            t = t_next
+            
+            # 迭代步长或根的范围已小于精度即收敛
+            if np.all((np.abs(step) <= tolerance_days) | (hi - lo <= tolerance_days)):
+                return t, iteration
+        
+        raise ValueError(f"太阳黄经求解未收敛：{AstronomyConfig.ROOT_MAX_ITERATIONS}次迭代后误差超过{tolerance_seconds}秒")
+    
+    @staticmethod
+    def find_lichun(year: int, tolerance_seconds: Optional[float] = None,
+                    backend=None) -> datetime:
         """
         计算指定年份的立春准确时间
         
         Args:
             year: 年份
+            tolerance_seconds: 精度（秒），默认 AstronomyConfig.ROOT_TOLERANCE_SECONDS
+            backend: 天文计算后端（实例或名称），默认 AstronomyConfig.BACKEND
             
         Returns:
             datetime: 立春时间（UTC）
         """
-        start = ts.utc(year, 2, 1)
-        end = ts.utc(year, 2, 15)
+        return get_backend(backend).lichun(year, tolerance_seconds)
+    
+    @staticmethod
+    def get_year_jieqi(year: int, backend=None) -> np.ndarray:
+        """
+        一次性计算指定年份的全部24节气时间
         
-        t0, t1 = start, end
-        for _ in range(AstronomyConfig.BINARY_SEARCH_ITERATIONS):
-            tm = ts.tt_jd((t0.tt + t1.tt) / 2)
-            if AstronomyCalculator.get_sun_longitude(tm) >= AstronomyConfig.LICHUN_DEGREE:
-                t1 = tm
-            else:
-                t0 = tm
+        Args:
+            year: 年份
+            backend: 天文计算后端（实例或名称），默认 AstronomyConfig.BACKEND
+            
+        Returns:
+            np.ndarray: 按时间排序的24个节气时间（UTC）
+        """
+        return AstronomyCalculator.get_years_jieqi([year], backend)
+    
+    @staticmethod
+    def get_years_jieqi(years: List[int], backend=None) -> np.ndarray:
+        """
+        一次性计算多个年份的全部节气时间
         
-        return t1.utc_datetime()
+        Args:
+            years: 年份列表
+            backend: 天文计算后端（实例或名称），默认 AstronomyConfig.BACKEND
+            
+        Returns:
+            np.ndarray: 按时间排序的 24×len(years) 个节气时间（UTC）
+        """
+        jieqi_times, _ = get_backend(backend).jieqi_instants(years)
+        return jieqi_times
     
     @staticmethod
-    def get_jieqi_time(year: int, target_degree: int) -> datetime:
+    def get_jieqi_time(year: int, target_degree: int,
+                       tolerance_seconds: Optional[float] = None,
+                       backend=None) -> datetime:
         """
         计算指定年份特定黄经度数对应的节气时间
         
         Args:
             year: 年份
             target_degree: 目标黄经度数
+            tolerance_seconds: 精度（秒），默认 AstronomyConfig.ROOT_TOLERANCE_SECONDS
+            backend: 天文计算后端（实例或名称），默认 AstronomyConfig.BACKEND
             
         Returns:
             datetime: 节气时间（UTC）
         """
-        # 根据黄经度数确定对应的月份
-        month = 1
-        for degree, m, _ in JieqiConstants.JIEQI_INFO:
-            if degree == target_degree:
-                month = m
-                break
-        
-        # 设置搜索范围
-        start_year = year
-        start_month = month - 1
-        if start_month < 1:
-            start_month = 12
-            start_year -= 1
-        
-        end_year = year
-        end_month = month + 1
-        if end_month > 12:
-            end_month = 1
-            end_year += 1
-        
-        start = ts.utc(start_year, start_month, 1)
-        end = ts.utc(end_year, end_month, 1)
-        
-        # 二分法查找
-        t0, t1 = start, end
-        for _ in range(AstronomyConfig.BINARY_SEARCH_ITERATIONS):
-            tm = ts.tt_jd((t0.tt + t1.tt) / 2)
-            if AstronomyCalculator.get_sun_longitude(tm) % 360 >= target_degree % 360:
-                t1 = tm
-            else:
-                t0 = tm
-        
-        return t1.utc_datetime()
+        return get_backend(backend).jieqi_time(year, target_degree, tolerance_seconds)
     
     @staticmethod
-    def get_solstices(year: int) -> Tuple[datetime, datetime]:
+    def get_solstices(year: int, tolerance_seconds: Optional[float] = None,
+                      backend=None) -> Tuple[datetime, datetime]:
         """
         获取指定年份的夏至和冬至时间
         
         Args:
             year: 年份
+            tolerance_seconds: 精度（秒），默认 AstronomyConfig.ROOT_TOLERANCE_SECONDS
+            backend: 天文计算后端（实例或名称），默认 AstronomyConfig.BACKEND
             
         Returns:
             tuple: (夏至时间, 冬至时间)
         """
-        summer_solstice = None
-        winter_solstice = None
+        return get_backend(backend).solstices(year, tolerance_seconds)
+
+
+# ============================================================================
+# 天文计算后端
+# ============================================================================
+
+class AstronomyBackend(abc.ABC):
+    """
+    天文计算后端基类
+    
+    抽象基类，不能直接实例化：子类须实现 sun_longitude()；节气求解默认以平黄经预测时刻为初值，
+    在 sun_longitude() 上做向量化求根。
+    按默认精度求得的各年份节气及置闰起局锚点保存在进程内缓存中（线程安全，同一年份只计算一次）。
+    """
+    
+    name = None
+    exact = True  # 节气时刻与星历一致（可使用逐日历法索引）
+    
+    def __init__(self):
+        # (年份, 精度) -> 按 JIEQI_INFO 顺序的24个节气时间（键只随年份增长，星历覆盖数百年，不限大小）
+        self._year_cache = SingleFlightCache()
+        # 年份 -> (二至时间列表, 置闰起局锚点列表)
+        self._anchor_cache = SingleFlightCache()
+    
+    @abc.abstractmethod
+    def sun_longitude(self, tt) -> np.ndarray:
+        """
+        计算太阳黄经（J2000黄道）
+        
+        Args:
+            tt: TT儒略日（标量或数组）
+            
+        Returns:
+            np.ndarray: 太阳黄经度数
+        """
+    
+    def uses_ephemeris(self, years: Optional[Iterable[int]] = None) -> bool:
+        """
+        查询指定年份的节气时是否需要星历文件（决定 init_worker 是否预加载星历）
+        
+        Args:
+            years: 查询的年份，None表示不限定
+            
+        Returns:
+            bool: 是否需要星历
+        """
+        return True
+    
+    def solve_crossings(self, years, target_degrees, tolerance_seconds: Optional[float] = None) -> np.ndarray:
+        """
+        求解各年份太阳黄经到达目标度数的时刻（所有节气同步迭代）
+        
+        Args:
+            years: 年份数组
+            target_degrees: 目标黄经度数数组（与years逐项对应）
+            tolerance_seconds: 精度（秒），默认 AstronomyConfig.ROOT_TOLERANCE_SECONDS
+            
+        Returns:
+            np.ndarray: 各节气时间（UTC datetime）
+        """
+        years = np.asarray(years, dtype=int)
+        target_degrees = np.asarray(target_degrees, dtype=float) % 360
+        
+        tt, _ = AstronomyCalculator.solve_sun_longitude(
+            target_degrees,
+            AstronomyCalculator.predict_jieqi_tt(years, target_degrees),
+            tolerance_seconds,
+            longitude_func=self.sun_longitude
+        )
+        return ephemeris.ts.tt_jd(tt).utc_datetime()
+    
+    def jieqi_instants(self, years) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        求解多个年份的全部节气，按时间排序
+        
+        Args:
+            years: 年份列表
+            
+        Returns:
+            tuple: (节气时间数组（UTC datetime）, 对应的JIEQI_INFO索引数组)
+        """
+        years = [int(year) for year in years]
+        year_jieqi = self._get_years(years)
         
-        for degree, _, name in JieqiConstants.JIEQI_INFO:
-            if name == '夏至':
-                summer_solstice = AstronomyCalculator.get_jieqi_time(year, degree)
-            elif name == '冬至':
-                winter_solstice = AstronomyCalculator.get_jieqi_time(year, degree)
+        jieqi_times = np.concatenate([year_jieqi[year] for year in years]) if years else np.empty(0, dtype=object)
+        index_grid = np.tile(np.arange(len(JieqiConstants.JIEQI_INFO)), len(years))
+        order = np.argsort([t.timestamp() for t in jieqi_times], kind='stable')
+        
+        return jieqi_times[order], index_grid[order]
+    
+    def _get_years(self, years: List[int]) -> Dict[int, np.ndarray]:
+        """
+        按默认精度获取各年份的全部节气（缓存未命中的年份一次性同步求解）
+        
+        Args:
+            years: 年份列表
+            
+        Returns:
+            dict: {年份: 按 JIEQI_INFO 顺序的24个节气时间}
+        """
+        tolerance_seconds = AstronomyConfig.ROOT_TOLERANCE_SECONDS
+        count = len(JieqiConstants.JIEQI_INFO)
+        
+        def solve(keys):
+            missing_years = np.array([year for year, _ in keys], dtype=int)
+            jieqi_times = self.solve_crossings(
+                np.repeat(missing_years, count),
+                np.tile(JieqiConstants.JIEQI_DEGREES, len(missing_years)),
+                tolerance_seconds
+            )
+            return {key: jieqi_times[i * count:(i + 1) * count] for i, key in enumerate(keys)}
+        
+        cached = self._year_cache.get_many([(year, tolerance_seconds) for year in years], solve)
+        return {year: cached[(year, tolerance_seconds)] for year in years}
+    
+    @staticmethod
+    def _uses_year_cache(tolerance_seconds: Optional[float]) -> bool:
+        """是否按默认精度求解（可直接取年份缓存）"""
+        return tolerance_seconds in (None, AstronomyConfig.ROOT_TOLERANCE_SECONDS)
+    
+    def lichun(self, year: int, tolerance_seconds: Optional[float] = None) -> datetime:
+        """
+        计算指定年份的立春时间
+        
+        Args:
+            year: 年份
+            tolerance_seconds: 精度（秒）
             
-            if summer_solstice and winter_solstice:
-                break
+        Returns:
+            datetime: 立春时间（UTC）
+        """
+        return self.jieqi_time(year, AstronomyConfig.LICHUN_DEGREE, tolerance_seconds)
+    
+    def jieqi_time(self, year: int, target_degree: int,
+                   tolerance_seconds: Optional[float] = None) -> datetime:
+        """
+        计算指定年份特定黄经度数对应的节气时间
+        
+        Args:
+            year: 年份
+            target_degree: 目标黄经度数
+            tolerance_seconds: 精度（秒）
+            
+        Returns:
+            datetime: 节气时间（UTC）
+        """
+        if self._uses_year_cache(tolerance_seconds) and target_degree % 15 == 0:
+            jieqi_idx = int((target_degree % 360 - AstronomyConfig.LICHUN_DEGREE) % 360 // 15)
+            return self._get_years([year])[year][jieqi_idx]
+        return self.solve_crossings([year], [target_degree], tolerance_seconds)[0]
+    
+    def solstices(self, year: int, tolerance_seconds: Optional[float] = None) -> Tuple[datetime, datetime]:
+        """
+        计算指定年份的夏至和冬至时间（同步求解）
         
+        Args:
+            year: 年份
+            tolerance_seconds: 精度（秒）
+            
+        Returns:
+            tuple: (夏至时间, 冬至时间)
+        """
+        summer_idx = JieqiConstants.XIAZHI
+        winter_idx = JieqiConstants.DONGZHI
+        
+        if self._uses_year_cache(tolerance_seconds):
+            year_jieqi = self._get_years([year])[year]
+            return year_jieqi[summer_idx], year_jieqi[winter_idx]
+        
+        summer_degree = JieqiConstants.JIEQI_INFO[summer_idx][0]
+        winter_degree = JieqiConstants.JIEQI_INFO[winter_idx][0]
+        summer_solstice, winter_solstice = self.solve_crossings(
+            [year, year], [summer_degree, winter_degree], tolerance_seconds
+        )
         return summer_solstice, winter_solstice
+    
+    def jieqi_day_seconds(self, years) -> Dict[date, List[int]]:
+        """
+        各年份节气时刻按日期归类
+        
+        Args:
+            years: 年份列表
+            
+        Returns:
+            dict: {日期: 当日交节时刻的秒数列表}（不足整秒向上取整，即输入时间能取到的首个交节后时刻）
+        """
+        jieqi_seconds = {}
+        for t in self.jieqi_instants(list(years))[0]:
+            t = t.replace(tzinfo=None)
+            seconds = t.hour * 3600 + t.minute * 60 + t.second + (t.microsecond > 0)
+            jieqi_seconds.setdefault(t.date(), []).append(seconds)
+        return jieqi_seconds
+    
+    def zhirun_anchor(self, futou_dt: datetime) -> Tuple[datetime, date, bool, int]:
+        """
+        查找符头时刻所属的置闰起局锚点（不晚于符头时刻的最近一个二至）
+        
+        Args:
+            futou_dt: 符头时刻（UTC）
+            
+        Returns:
+            tuple: (二至时间, 锚点符头日期, 是否置闰, 起始节气序号)
+        """
+        year = futou_dt.year
+        instants, anchors = self._anchor_cache.get(
+            year, lambda: FutouCalculator.build_zhirun_anchors(year, self)
+        )
+        return anchors[bisect.bisect_right(instants, futou_dt.replace(tzinfo=None)) - 1]
+    
+    def find_jieqi(self, input_dt: datetime, forward: bool = True) -> Optional[Tuple[datetime, str]]:
+        """
+        找到输入时间对应的节气
+        
+        Args:
+            input_dt: 输入时间
+            forward: True表示向前找（找小于等于输入时间的最近节气），
+                    False表示向后找（找大于输入时间的最近节气）
+                    
+        Returns:
+            tuple: (节气时间, 节气名称) 或 None
+        """
+        # 一次性求解前后三年所有节气时间（已按时间排序）
+        jieqi_times, jieqi_indexes = self.jieqi_instants(
+            [input_dt.year - 1, input_dt.year, input_dt.year + 1]
+        )
+        jieqi_times = list(jieqi_times)
+        
+        if forward:
+            # 向前找：找到最后一个小于等于输入时间的节气
+            i = bisect.bisect_right(jieqi_times, input_dt) - 1
+            if i < 0:
+                return None
+        else:
+            # 向后找：找到第一个大于输入时间的节气
+            i = bisect.bisect_right(jieqi_times, input_dt)
+            if i >= len(jieqi_times):
+                return None
+        
+        _, _, name = JieqiConstants.JIEQI_INFO[jieqi_indexes[i]]
+        return jieqi_times[i], name
+
+
+class SkyfieldBackend(AstronomyBackend):
+    """星历后端：skyfield + JPL星历精确计算（支持持久化缓存与切比雪夫黄经模型）"""
+    
+    name = 'skyfield'
+    
+    def sun_longitude(self, tt) -> np.ndarray:
+        # 模型精度满足默认求解精度且覆盖全部时刻时用多项式求值，否则直接用星历
+        model = get_solar_model()
+        if model and model.max_error_seconds <= AstronomyConfig.ROOT_TOLERANCE_SECONDS and model.covers(tt):
+            return model.longitude(tt)
+        return AstronomyCalculator.get_sun_longitude(ephemeris.ts.tt_jd(tt))
+    
+    def solve_crossings(self, years, target_degrees, tolerance_seconds: Optional[float] = None) -> np.ndarray:
+        """
+        向量化求解：以平黄经预测时刻为初值，所有节气同步迭代，每轮只做一次星历观测
+        
+        启用持久化缓存时先查缓存，只计算未命中的节气并写回缓存；
+        有可用的切比雪夫太阳黄经模型时在多项式上求根，不调用星历。
+        
+        Args:
+            years: 年份数组
+            target_degrees: 目标黄经度数数组（与years逐项对应）
+            tolerance_seconds: 精度（秒），默认 AstronomyConfig.ROOT_TOLERANCE_SECONDS
+            
+        Returns:
+            np.ndarray: 各节气时间（UTC datetime）
+        """
+        if tolerance_seconds is None:
+            tolerance_seconds = AstronomyConfig.ROOT_TOLERANCE_SECONDS
+        years = np.asarray(years, dtype=int)
+        target_degrees = np.asarray(target_degrees, dtype=float) % 360
+        keys = list(zip(years.tolist(), target_degrees.tolist()))
+        
+        cache = get_jieqi_cache()
+        cached = cache.get_many(keys, tolerance_seconds) if cache else {}
+        
+        result = np.empty(len(keys), dtype=object)
+        missing = np.array([key not in cached for key in keys], dtype=bool)
+        for i, key in enumerate(keys):
+            if key in cached:
+                result[i] = datetime.fromtimestamp(cached[key], tz=timezone.utc)
+        
+        if missing.any():
+            guess = AstronomyCalculator.predict_jieqi_tt(years[missing], target_degrees[missing])
+            bracket_days = AstronomyConfig.PREDICT_BRACKET_DAYS
+            
+            # 模型精度满足要求且覆盖搜索范围时在多项式上求根，否则直接用星历
+            model = get_solar_model()
+            if (model and model.max_error_seconds <= tolerance_seconds
+                    and model.covers(guess - bracket_days) and model.covers(guess + bracket_days)):
+                tt, _ = model.solve(target_degrees[missing], guess, tolerance_seconds)
+            else:
+                tt, _ = AstronomyCalculator.solve_sun_longitude(
+                    target_degrees[missing], guess, tolerance_seconds
+                )
+            result[missing] = ephemeris.ts.tt_jd(tt).utc_datetime()
+            
+            if cache:
+                cache.put_many(
+                    {key: result[i].timestamp() for i, key in enumerate(keys) if missing[i]},
+                    tolerance_seconds
+                )
+        
+        return result
+
+
+class TableBackend(AstronomyBackend):
+    """节气表后端：表内年份直接查表，表外及任意黄经度数回退到备用后端（默认星历后端）"""
+    
+    name = 'table'
+    
+    def __init__(self, table: Optional[JieqiTable] = None, fallback: Optional[AstronomyBackend] = None):
+        """
+        初始化节气表后端
+        
+        Args:
+            table: 节气表，默认使用星历目录下的 AstronomyConfig.JIEQI_TABLE_FILE
+            fallback: 表外查询使用的后端，默认星历后端
+        """
+        super().__init__()
+        self._table = table
+        self.fallback = fallback or SkyfieldBackend()
+    
+    @property
+    def table(self) -> Optional[JieqiTable]:
+        """节气表（未指定时延迟加载默认表文件）"""
+        return self._table if self._table is not None else get_jieqi_table()
+    
+    def sun_longitude(self, tt) -> np.ndarray:
+        return self.fallback.sun_longitude(tt)
+    
+    def uses_ephemeris(self, years: Optional[Iterable[int]] = None) -> bool:
+        table = self.table
+        if table and all(table.covers_year(year) for year in years or ()):
+            return False
+        return self.fallback.uses_ephemeris(years)
+    
+    def solve_crossings(self, years, target_degrees, tolerance_seconds: Optional[float] = None) -> np.ndarray:
+        return self.fallback.solve_crossings(years, target_degrees, tolerance_seconds)
+    
+    def jieqi_instants(self, years) -> Tuple[np.ndarray, np.ndarray]:
+        table = self.table
+        if not (table and all(table.covers_year(year) for year in years)):
+            return self.fallback.jieqi_instants(years)
+        
+        years = sorted(years)
+        jieqi_times = np.empty(len(years) * JieqiTableFormat.TERMS_PER_YEAR, dtype=object)
+        jieqi_times[:] = [t for year in years for t in table.get_year_jieqi(year)]
+        jieqi_indexes = np.tile(JieqiTableFormat.YEAR_ORDER, len(years))
+        return jieqi_times, jieqi_indexes
+    
+    def lichun(self, year: int, tolerance_seconds: Optional[float] = None) -> datetime:
+        table = self.table
+        if table and table.covers_year(year):
+            return table.find_lichun(year)
+        return self.fallback.lichun(year, tolerance_seconds)
+    
+    def jieqi_time(self, year: int, target_degree: int,
+                   tolerance_seconds: Optional[float] = None) -> datetime:
+        table = self.table
+        if table and table.covers_year(year) and target_degree % 15 == 0:
+            return table.get_jieqi_time(year, target_degree)
+        return self.fallback.jieqi_time(year, target_degree, tolerance_seconds)
+    
+    def solstices(self, year: int, tolerance_seconds: Optional[float] = None) -> Tuple[datetime, datetime]:
+        table = self.table
+        if table and table.covers_year(year):
+            return table.get_solstices(year)
+        return self.fallback.solstices(year, tolerance_seconds)
+    
+    def find_jieqi(self, input_dt: datetime, forward: bool = True) -> Optional[Tuple[datetime, str]]:
+        table = self.table
+        if table and table.covers(input_dt):
+            return table.find_jieqi(input_dt, forward)
+        return self.fallback.find_jieqi(input_dt, forward)
+
+
+class AnalyticBackend(AstronomyBackend):
+    """解析后端：太阳黄经按截断 VSOP87 级数计算，不加载星历文件（节气时刻误差见 max_error_seconds）"""
+    
+    name = 'analytic'
+    exact = False
+    max_error_seconds = solar_analytic.MAX_ERROR_SECONDS
+    
+    def sun_longitude(self, tt) -> np.ndarray:
+        return solar_analytic.sun_longitude(tt)
+    
+    def uses_ephemeris(self, years: Optional[Iterable[int]] = None) -> bool:
+        return False
+
+
+class BatchingBackend(AstronomyBackend):
+    """合批后端：多线程并发的黄经观测、节气求解在合批窗口内合并为一次向量化计算（默认包装星历后端）"""
+    
+    name = 'batching'
+    
+    def __init__(self, backend: Optional[AstronomyBackend] = None, window_seconds: Optional[float] = None,
+                 max_items: Optional[int] = None):
+        """
+        初始化合批后端
+        
+        Args:
+            backend: 实际计算的后端，默认星历后端
+            window_seconds: 合批窗口（秒），默认 AstronomyConfig.BATCH_WINDOW_SECONDS
+            max_items: 每批最多的时刻/节气数，默认 AstronomyConfig.BATCH_MAX_ITEMS
+        """
+        super().__init__()
+        self.backend = backend or SkyfieldBackend()
+        self.exact = self.backend.exact
+        self.window_seconds = AstronomyConfig.BATCH_WINDOW_SECONDS if window_seconds is None else window_seconds
+        self.max_items = max_items or AstronomyConfig.BATCH_MAX_ITEMS
+        self.longitude_batcher = MicroBatcher(self.backend.sun_longitude, self.window_seconds, self.max_items)
+        # 精度（秒） -> 节气求解合批器（不同精度的求解不能合并）
+        self._crossing_batchers: Dict[float, MicroBatcher] = {}
+    
+    def sun_longitude(self, tt) -> np.ndarray:
+        # 合批器按一维数组计数、拼接，多维输入展平后提交，结果还原为输入形状
+        return self.longitude_batcher.submit(np.ravel(np.asarray(tt, dtype=float))).reshape(np.shape(tt))
+    
+    def uses_ephemeris(self, years: Optional[Iterable[int]] = None) -> bool:
+        return self.backend.uses_ephemeris(years)
+    
+    def solve_crossings(self, years, target_degrees, tolerance_seconds: Optional[float] = None) -> np.ndarray:
+        if tolerance_seconds is None:
+            tolerance_seconds = AstronomyConfig.ROOT_TOLERANCE_SECONDS
+        
+        batcher = self._crossing_batchers.get(tolerance_seconds)
+        if batcher is None:
+            batcher = self._crossing_batchers.setdefault(tolerance_seconds, MicroBatcher(
+                lambda years, degrees: self.backend.solve_crossings(years, degrees, tolerance_seconds),
+                self.window_seconds, self.max_items
+            ))
+        return batcher.submit(np.asarray(years, dtype=int), np.asarray(target_degrees, dtype=float))
+
+
+# 可选的天文计算后端
+ASTRONOMY_BACKENDS = {
+    backend.name: backend
+    for backend in (SkyfieldBackend, TableBackend, AnalyticBackend, BatchingBackend)
+}
+
+# 按名称创建的后端实例
+_backends: Dict[str, AstronomyBackend] = {}
+
+
+def get_backend(backend=None) -> AstronomyBackend:
+    """
+    获取天文计算后端
+    
+    Args:
+        backend: 后端实例或名称（'skyfield' / 'table' / 'analytic' / 'batching'），默认 AstronomyConfig.BACKEND
+        
+    Returns:
+        AstronomyBackend: 天文计算后端
+    """
+    if backend is None:
+        backend = AstronomyConfig.BACKEND
+    if isinstance(backend, AstronomyBackend):
+        return backend
+    
+    if backend not in ASTRONOMY_BACKENDS:
+        raise ValueError(f"未知的天文计算后端: {backend}，可选: {', '.join(ASTRONOMY_BACKENDS)}")
+    if backend not in _backends:
+        with _load_lock:
+            if backend not in _backends:
+                _backends[backend] = ASTRONOMY_BACKENDS[backend]()
+    return _backends[backend]
+
+
+# ============================================================================
+# 多进程支持
+# ============================================================================
+
+def worker_config() -> Dict:
+    """
+    获取当前进程的天文计算配置，作为 init_worker 的参数传给进程池
+    
+    Returns:
+        dict: AstronomyConfig 的全部配置项
+    """
+    return {name: value for name, value in vars(AstronomyConfig).items() if name.isupper()}
+
+
+def init_worker(config: Optional[Dict] = None, backend=None, years: Optional[Iterable[int]] = None):
+    """
+    进程池工作进程初始化函数
+    
+    父进程先调用 ephemeris.preload()，再创建进程池：
+        multiprocessing.Pool(initializer=init_worker, initargs=(worker_config(),))
+    fork 启动的子进程继承父进程已映射的星历，不再打开、解析星历文件；
+    spawn 启动的子进程按父进程的配置加载同一星历文件，只读映射的页面由操作系统页缓存共享。
+    后端不需要星历时（解析后端，或节气表覆盖所涉年份的节气表后端）不加载星历、不导入 skyfield。
+    
+    Args:
+        config: 父进程的天文计算配置（worker_config() 的返回值），None表示使用子进程自身配置
+        backend: 预热的天文计算后端名称，默认 AstronomyConfig.BACKEND
+        years: 预先求解节气的年份（写入后端的年份缓存）
+    """
+    if config:
+        for name, value in config.items():
+            setattr(AstronomyConfig, name, value)
+        ephemeris.configure(AstronomyConfig.EPHEMERIS_FILE, AstronomyConfig.EPHEMERIS_DIR)
+    
+    backend = get_backend(backend)
+    years = sorted(set(years)) if years else None
+    if backend.uses_ephemeris(years):
+        ephemeris.preload()
+    get_jieqi_table()
+    get_solar_model()
+    get_calendar_index()
+    if years:
+        backend.jieqi_instants(years)
 
 
 # ============================================================================
@@ -356,31 +1137,27 @@ class GanzhiCalculator:
     """干支计算类"""
     
     @staticmethod
-    def get_year_ganzhi(input_datetime: datetime) -> str:
+    def get_year_ganzhi(input_datetime: datetime, backend=None) -> int:
         """
         获取年干支（以立春为界）
         
         Args:
             input_datetime: 输入时间
+            backend: 天文计算后端（实例或名称），默认 AstronomyConfig.BACKEND
             
         Returns:
-            str: 年干支，如"甲子"
+            int: 年干支的六十甲子序号（GanzhiConstants.JIAZI 取名称）
         """
         year = input_datetime.year
-        lichun_current = AstronomyCalculator.find_lichun(year)
+        lichun_current = AstronomyCalculator.find_lichun(year, backend=backend)
         
         # 判断输入日期是否在当前年立春之后
         calc_year = year if input_datetime >= lichun_current else year - 1
         
-        # 计算干支索引
-        idx = (calc_year - GanzhiConstants.BASE_YEAR) % 60
-        gan_idx = idx % 10
-        zhi_idx = idx % 12
-        
-        return GanzhiConstants.TIANGAN[gan_idx] + GanzhiConstants.DIZHI[zhi_idx]
+        return (calc_year - GanzhiConstants.BASE_YEAR) % 60
     
     @staticmethod
-    def find_jieqi(input_dt: datetime, forward: bool = True) -> Optional[Tuple[datetime, str]]:
+    def find_jieqi(input_dt: datetime, forward: bool = True, backend=None) -> Optional[Tuple[datetime, str]]:
         """
         找到输入时间对应的节气
         
@@ -388,49 +1165,30 @@ class GanzhiCalculator:
             input_dt: 输入时间
             forward: True表示向前找（找小于等于输入时间的最近节气），
                     False表示向后找（找大于输入时间的最近节气）
+            backend: 天文计算后端（实例或名称），默认 AstronomyConfig.BACKEND
                     
         Returns:
             tuple: (节气时间, 节气名称) 或 None
         """
-        # 生成前后两年所有节气时间
-        jieqi_events = []
-        for y in [input_dt.year - 1, input_dt.year, input_dt.year + 1]:
-            for degree, _, name in JieqiConstants.JIEQI_INFO:
-                jt = AstronomyCalculator.get_jieqi_time(y, degree)
-                jieqi_events.append((jt, name))
-        
-        # 按时间排序
-        jieqi_events.sort(key=lambda x: x[0])
-        
-        if forward:
-            # 向前找：找到最后一个小于等于输入时间的节气
-            for i in range(len(jieqi_events) - 1, -1, -1):
-                if jieqi_events[i][0] <= input_dt:
-                    return jieqi_events[i]
-        else:
-            # 向后找：找到第一个大于输入时间的节气
-            for event in jieqi_events:
-                if event[0] > input_dt:
-                    return event
-        
-        return None
+        return get_backend(backend).find_jieqi(input_dt, forward)
     
     @staticmethod
-    def get_month_ganzhi(input_dt: datetime) -> str:
+    def get_month_ganzhi(input_dt: datetime, backend=None) -> int:
         """
         获取月干支（以节气为界）
         
         Args:
             input_dt: 输入时间
+            backend: 天文计算后端（实例或名称），默认 AstronomyConfig.BACKEND
             
         Returns:
-            str: 月干支，如"丙寅"
+            int: 月干支的六十甲子序号
         """
         # 获取年干
-        year_gan = GanzhiCalculator.get_year_ganzhi(input_dt)[0]
+        year_gan = GanzhiCalculator.get_year_ganzhi(input_dt, backend) % 10
         
         # 获取对应节气及索引
-        jieqi_result = GanzhiCalculator.find_jieqi(input_dt)
+        jieqi_result = GanzhiCalculator.find_jieqi(input_dt, backend=backend)
         if not jieqi_result:
             raise ValueError("无法确定节气")
         
@@ -439,165 +1197,573 @@ class GanzhiCalculator:
         month_num = idx // 2  # 0-11对应正月到腊月
         
         # 根据年干确定正月天干（五虎遁月）
-        start_gan = GanzhiConstants.YEAR_GAN_TO_MONTH_START[year_gan]
-        gan_idx = (GanzhiConstants.TIANGAN.index(start_gan) + month_num) % 10
+        gan_idx = (GanzhiConstants.YEAR_GAN_TO_MONTH_START[year_gan] + month_num) % 10
         zhi_idx = (month_num + 2) % 12  # 正月建寅
         
-        return GanzhiConstants.TIANGAN[gan_idx] + GanzhiConstants.DIZHI[zhi_idx]
+        return GanzhiCalculator.jiazi_index(gan_idx, zhi_idx)
     
     @staticmethod
-    def get_day_hour_ganzhi(input_str: str) -> Tuple[str, str]:
+    def get_day_hour_ganzhi(input_dt: datetime) -> Tuple[int, int]:
         """
         获取日时干支
         
         Args:
-            input_str: 时间字符串，格式："YYYY-MM-DD HH:MM:SS"
+            input_dt: 输入时间
             
         Returns:
-            tuple: (日干支, 时干支)
+            tuple: (日干支, 时干支) 的六十甲子序号
         """
-        dt = datetime.strptime(input_str, "%Y-%m-%d %H:%M:%S")
-        
         # ===== 日干支计算 =====
         # 23点后算下一天
-        adjusted_date = dt.date() + timedelta(days=1) if dt.hour >= 23 else dt.date()
+        adjusted_date = input_dt.date() + timedelta(days=1) if input_dt.hour >= 23 else input_dt.date()
         
         # 计算与基准日的天数差
-        days_diff = (adjusted_date - GanzhiConstants.BASE_DATE).days
-        ganzhi_index = days_diff % 60
+        day_idx = (adjusted_date - GanzhiConstants.BASE_DATE).days % 60
+        
+        return day_idx, GanzhiCalculator.get_hour_ganzhi(day_idx, input_dt.hour)
+    
+    @staticmethod
+    def get_hour_ganzhi(day_idx: int, hour: int) -> int:
+        """
+        由日干支推算时干支（23点已换日，传入换日后的日干支）
+        
+        Args:
+            day_idx: 日干支的六十甲子序号
+            hour: 小时（0-23）
+            
+        Returns:
+            int: 时干支的六十甲子序号
+        """
+        zhi_idx = (hour + 1) // 2 % 12  # 23点为子时
+        
+        # 根据日干确定时干起始（五鼠遁日）
+        gan_idx = (GanzhiConstants.DAY_GAN_TO_HOUR_START[day_idx % 10] + zhi_idx) % 10
+        
+        return GanzhiCalculator.jiazi_index(gan_idx, zhi_idx)
+    
+    @staticmethod
+    def jiazi_index(gan_idx: int, zhi_idx: int) -> int:
+        """
+        天干、地支序号合成六十甲子序号（二者须同为阳或同为阴）
+        
+        Args:
+            gan_idx: 天干序号
+            zhi_idx: 地支序号
+            
+        Returns:
+            int: 六十甲子序号
+        """
+        return (6 * gan_idx - 5 * zhi_idx) % 60
+    
+    @staticmethod
+    def calculate_xunshou(hour_gz: int) -> int:
+        """
+        计算旬首
+        
+        Args:
+            hour_gz: 时干支的六十甲子序号
+            
+        Returns:
+            int: 旬首的六十甲子序号（甲子0、甲戌10……甲寅50）
+        """
+        return hour_gz - hour_gz % 10
+
+
+# ============================================================================
+# 符头计算模块
+# ============================================================================
+
+def _futou_table(method: str) -> Tuple[Tuple[int, int, int, int], ...]:
+    """
+    生成60日干支的符头表
+    
+    Args:
+        method: 定局方法，"置闰" 或 "拆补"
+        
+    Returns:
+        tuple: 按日干支序号排列的 (符头, 符头差日, 三元, 某元第几天)
+    """
+    table = []
+    for day in range(60):
+        if method == '置闰':
+            # 符头为甲子、己卯、甲午、己酉，相隔15日；差日0-5为上元、6-10为中元、其余为下元
+            days_ago = day % 15
+            yuan = 0 if days_ago <= 5 else 1 if days_ago <= 10 else 2
+        else:
+            # 符头为甲、己日，相隔5日；三元由符头地支确定
+            days_ago = day % 5
+            yuan = QimenConstants.CHAIBU_YUAN[(day - days_ago) % 12]
+        table.append((day - days_ago, days_ago, yuan, days_ago % 5 + 1))
+    return tuple(table)
+
+
+class FutouCalculator:
+    """符头计算类（置闰、拆补两种定局方法的60日干支符头表在导入时生成）"""
+    
+    # 定局方法
+    METHODS = ('置闰', '拆补')
+    
+    # 定局方法 -> 按日干支序号排列的 (符头, 符头差日, 三元, 某元第几天)
+    TABLES = {method: _futou_table(method) for method in METHODS}
+    
+    @staticmethod
+    def get_futou_details(day_ganzhi: int, method: str = '置闰') -> Dict:
+        """
+        根据日干支和定局方法计算符头、三元及距离天数（查表）
         
-        ri_gan = GanzhiConstants.TIANGAN[ganzhi_index % 10]
-        ri_zhi = GanzhiConstants.DIZHI[ganzhi_index % 12]
-        ri_gz = f"{ri_gan}{ri_zhi}"
+        Args:
+            day_ganzhi: 日干支的六十甲子序号
+            method: 定局方法，"置闰" 或 "拆补"
+            
+        Returns:
+            dict: 包含符头（六十甲子序号）、三元（QimenConstants.SANYUAN 序号）、距离天数等信息
+        """
+        table = FutouCalculator.TABLES.get(method)
+        if table is None:
+            raise ValueError(f"无效的定局方法: {method}")
+        if not 0 <= day_ganzhi < 60:
+            raise ValueError(f"无效的日干支: {day_ganzhi}")
         
-        # ===== 时干支计算 =====
-        h = dt.hour
-        if h == 23:
-            h = 24  # 便于计算时辰索引
+        futou, days_ago, yuan, step_day = table[day_ganzhi]
+        return {
+            '符头': futou,
+            '上中下元': yuan,
+            '符头差日': days_ago,
+            '某元第几天': step_day
+        }
+    
+    @staticmethod
+    def build_zhirun_anchors(year: int, backend=None) -> Tuple[List[datetime], List[Tuple[datetime, date, bool, int]]]:
+        """
+        生成符头在指定年份时可能用到的置闰起局锚点（上一年冬至、本年夏至、本年冬至）
         
-        zhi_index = (h + 1) // 2 % 12
-        shi_zhi = GanzhiConstants.DIZHI[zhi_index]
+        锚点符头为二至当日（23点后按次日）干支的符头；符头距二至超过9日时置闰，
+        起始节气由冬至、夏至改为大雪、芒种。
+        
+        Args:
+            year: 符头所在年份
+            backend: 天文计算后端（实例或名称），默认 AstronomyConfig.BACKEND
+            
+        Returns:
+            tuple: (按时间排序的二至时间列表, 对应的 (二至时间, 锚点符头日期, 是否置闰, 起始节气序号) 列表)
+        """
+        backend = get_backend(backend)
+        _, prev_winter = backend.solstices(year - 1)
+        summer, winter = backend.solstices(year)
+        
+        instants, anchors = [], []
+        for solstice, jieqi_idx, leap_idx in (
+            (prev_winter, JieqiConstants.DONGZHI, JieqiConstants.DAXUE),
+            (summer, JieqiConstants.XIAZHI, JieqiConstants.MANGZHONG),
+            (winter, JieqiConstants.DONGZHI, JieqiConstants.DAXUE),
+        ):
+            solstice = solstice.replace(tzinfo=None)
+            day_gz, _ = GanzhiCalculator.get_day_hour_ganzhi(solstice)
+            days_diff = FutouCalculator.TABLES['置闰'][day_gz][1]
+            leap = days_diff > 9
+            
+            instants.append(solstice)
+            anchors.append((
+                solstice, solstice.date() - timedelta(days=days_diff),
+                leap, leap_idx if leap else jieqi_idx
+            ))
+        return instants, anchors
+
+
+# ============================================================================
+# 盘面数据模块
+# ============================================================================
+
+def _frozen_items(items: List[Dict]) -> Tuple[Tuple, ...]:
+    """将信息字典列表转为只读的 (键, 值) 元组"""
+    return tuple(tuple(item.items()) for item in items)
+
+
+class PlateTemplate:
+    """
+    盘面模板（只读）：九宫 × 五层序号及旬首、值使、入墓、击刑、门迫
+    
+    只取决于 (阴阳遁, 局数, 时干支)，共1080个，首次用到时生成并由各盘共享（见 get_plate_template）。
+    九宫五层存于定长字节数组，下标为 宫位 * 5 + 层序号，空位为 EMPTY。
+    """
+    
+    # 层名称（与排盘时九宫字典的键一致）及序号
+    LAYERS = ('earth', 'sky', 'door', 'star', 'shen')
+    EARTH, SKY, DOOR, STAR, SHEN = range(5)
+    EMPTY = 0xFF
+    
+    __slots__ = ('layers', 'xunshou_ganzhi', 'xunshou_original_pos', 'zhishi_pos', 'zhishi_men',
+                 'tianpan_rumu', 'liuyi_jixing', 'men_po')
+    
+    def __init__(self, layers: bytes, xunshou_ganzhi: int, xunshou_original_pos: int,
+                 zhishi_pos: int, zhishi_men: int):
+        """
+        初始化盘面模板（入墓、击刑、门迫在此一并算好）
+        
+        Args:
+            layers: 九宫五层序号（长度 10 * 5，下标0宫不用）
+            xunshou_ganzhi: 旬首的六十甲子序号
+            xunshou_original_pos: 旬首原始宫位（中宫寄坤二宫）
+            zhishi_pos: 值使门所落宫位
+            zhishi_men: 值使门序号
+        """
+        values = (
+            bytes(layers), xunshou_ganzhi, xunshou_original_pos, zhishi_pos, zhishi_men
+        )
+        for name, value in zip(self.__slots__, values):
+            object.__setattr__(self, name, value)
+        object.__setattr__(self, 'tianpan_rumu', _frozen_items(self._find_rumu()))
+        object.__setattr__(self, 'liuyi_jixing', _frozen_items(self._find_jixing()))
+        object.__setattr__(self, 'men_po', _frozen_items(self._find_men_po()))
+    
+    def __setattr__(self, name, value):
+        raise AttributeError(f"盘面模板只读: {name}")
+    
+    @classmethod
+    def from_palaces(cls, palaces: Dict[int, Dict], xunshou_ganzhi: int, xunshou_original_pos: int,
+                     zhishi_pos: int, zhishi_men: int) -> 'PlateTemplate':
+        """
+        由排盘时的九宫字典生成盘面模板
+        
+        Args:
+            palaces: {宫位: {'earth': 地盘干, 'sky': 天盘干, 'door': 八门, 'star': 九星, 'shen': 八神}}，空位为None
+            xunshou_ganzhi: 旬首的六十甲子序号
+            xunshou_original_pos: 旬首原始宫位
+            zhishi_pos: 值使门所落宫位
+            zhishi_men: 值使门序号
+        
+        Returns:
+            PlateTemplate: 盘面模板
+        """
+        width = len(cls.LAYERS)
+        layers = bytearray([cls.EMPTY]) * (10 * width)
+        for pos, data in palaces.items():
+            for layer, key in enumerate(cls.LAYERS):
+                if data[key] is not None:
+                    layers[pos * width + layer] = data[key]
+        return cls(layers, xunshou_ganzhi, xunshou_original_pos, zhishi_pos, zhishi_men)
+    
+    # ========================================================================
+    # 宫位数据
+    # ========================================================================
+    
+    def get(self, pos: int, layer: int) -> Optional[int]:
+        """
+        读取宫位某一层的序号
+        
+        Args:
+            pos: 宫位（1-9）
+            layer: 层序号（EARTH、SKY、DOOR、STAR、SHEN）
+        
+        Returns:
+            int: 天干、八门、九星或八神序号；空位返回None
+        """
+        value = self.layers[pos * len(self.LAYERS) + layer]
+        return None if value == self.EMPTY else value
+    
+    def palace(self, pos: int) -> Dict:
+        """宫位数据（序号），键同排盘时的九宫字典"""
+        return {key: self.get(pos, layer) for layer, key in enumerate(self.LAYERS)}
+    
+    def sky_gans(self, pos: int) -> Tuple[int, ...]:
+        """
+        获取宫位的天盘干序号。天芮所在宫另加中宫天盘干（天禽随天芮），与本宫相同时不重复
+        """
+        sky = self.get(pos, self.SKY)
+        if self.get(pos, self.STAR) == QimenConstants.TIANRUI:
+            sky_5 = self.get(5, self.SKY)
+            if sky_5 != sky:
+                return sky, sky_5
+        return (sky,)
+    
+    def sky_display(self, pos: int) -> str:
+        """获取天盘干的显示值（天芮所在宫如 "戊/己"）"""
+        return '/'.join(GanzhiConstants.TIANGAN[gan] for gan in self.sky_gans(pos))
+    
+    def earth_display(self, pos: int) -> str:
+        """
+        获取地盘干的显示值。2宫需显示寄宫关系（中宫寄坤宫）：
+        - 2宫：2宫地盘干 + 5宫地盘干
+        """
+        raw = self.get(pos, self.EARTH)
+        if pos == 2:
+            other = self.get(5, self.EARTH)
+            if other != raw:
+                return f"{GanzhiConstants.TIANGAN[raw]}/{GanzhiConstants.TIANGAN[other]}"
+        return GanzhiConstants.TIANGAN[raw]
+    
+    def palace_display(self, pos: int) -> Dict:
+        """宫位数据的显示值（2宫地盘干、天芮所在宫天盘干含寄宫）"""
+        door = self.get(pos, self.DOOR)
+        shen = self.get(pos, self.SHEN)
+        return {
+            'earth': self.earth_display(pos),
+            'sky': self.sky_display(pos),
+            'door': None if door is None else QimenConstants.MEN_ORDER[door],
+            'star': QimenConstants.STARS[self.get(pos, self.STAR)],
+            'shen': None if shen is None else QimenConstants.SHEN[shen]
+        }
+    
+    # ========================================================================
+    # 格局判断（生成模板时计算）
+    # ========================================================================
+    
+    def _find_rumu(self) -> List[Dict]:
+        """
+        计算哪些宫位的天盘干入墓
+        
+        天盘干入墓：天盘干落在其墓库对应宫位即为入墓
+        例如：甲墓在未(坤二宫)，若天盘甲在2宫则入墓
+        """
+        rumu_list = []
+        for pos in QimenConstants.PALACE_MAP:
+            if self.get(pos, self.SKY) is None:
+                continue
+            # 天芮所在宫可能有两个天盘干，需分开判断
+            for gan in self.sky_gans(pos):
+                muku_zhi, muku_pos = QimenConstants.TIANGAN_MUKU[gan]
+                if muku_pos == pos:
+                    palace_name, _ = QimenConstants.PALACE_MAP[pos]
+                    rumu_list.append({
+                        '宫位': pos,
+                        '天盘干': GanzhiConstants.TIANGAN[gan],
+                        '墓库地支': GanzhiConstants.DIZHI[muku_zhi],
+                        '宫名': palace_name
+                    })
+        return rumu_list
+    
+    def _find_jixing(self) -> List[Dict]:
+        """
+        计算哪些宫位的天盘六仪击刑
+        
+        六仪击刑：天盘六仪（戊己庚辛壬癸）落在其击刑宫位即为击刑
+        例如：戊（甲子戊）击刑宫位在震三宫，若天盘戊在3宫则击刑
+        """
+        jixing_list = []
+        for pos in QimenConstants.PALACE_MAP:
+            if self.get(pos, self.SKY) is None:
+                continue
+            for gan in self.sky_gans(pos):
+                jx_info = QimenConstants.LIUYI_JIXING[gan]
+                if jx_info and jx_info['击刑宫位'] == pos:
+                    palace_name, _ = QimenConstants.PALACE_MAP[pos]
+                    jixing_list.append({
+                        '宫位': pos,
+                        '六仪': GanzhiConstants.TIANGAN[gan],
+                        '旬首': jx_info['旬首'],
+                        '刑理': jx_info['刑理'],
+                        '地支关系': jx_info['地支关系'],
+                        '宫名': palace_name
+                    })
+        return jixing_list
+    
+    def _find_men_po(self) -> List[Dict]:
+        """
+        计算哪些宫位门迫
+        
+        门迫：门与宫位五行相克
+        伤门、杜门（木）落坤二宫、艮八宫（土）→ 门迫
+        惊门、开门（金）落震三宫、巽四宫（木）→ 门迫
+        景门（火）落乾六宫、兑七宫（金）→ 门迫
+        休门（水）落离九宫（火）→ 门迫
+        生门、死门（土）落坎一宫（水）→ 门迫
+        """
+        men_po_list = []
+        for pos in QimenConstants.PALACE_MAP:
+            men = self.get(pos, self.DOOR)
+            if men is None:
+                continue
+            key = (men, pos)
+            if key in QimenConstants.MEN_PO:
+                palace_name, _ = QimenConstants.PALACE_MAP[pos]
+                men_po_list.append({
+                    '宫位': pos,
+                    '门': QimenConstants.MEN_ORDER[men],
+                    '宫名': palace_name,
+                    '描述': QimenConstants.MEN_PO[key]
+                })
+        return men_po_list
+
+
+class Plate:
+    """
+    排盘结果（只读）：干支、节气、三元、局数等标量字段用 __slots__ 保存，
+    九宫数据引用共享的盘面模板，每盘只占一百余字节（不含输入时间）
+    """
+    
+    __slots__ = ('input_dt', 'year_gz', 'month_gz', 'day_gz', 'hour_gz',
+                 'curr_jieqi', 'curr_yuan', 'is_yang', 'ju_number', 'template')
+    
+    def __init__(self, input_dt: datetime, year_gz: int, month_gz: int, day_gz: int, hour_gz: int,
+                 curr_jieqi: int, curr_yuan: int, is_yang: bool, ju_number: int, template: PlateTemplate):
+        """
+        初始化排盘结果
+        
+        Args:
+            input_dt: 输入时间
+            year_gz, month_gz, day_gz, hour_gz: 年月日时干支的六十甲子序号
+            curr_jieqi: 当前节气（JIEQI_INFO 序号）
+            curr_yuan: 三元（SANYUAN 序号）
+            is_yang: 是否阳遁
+            ju_number: 局数
+            template: 盘面模板
+        """
+        values = (input_dt, year_gz, month_gz, day_gz, hour_gz,
+                  curr_jieqi, curr_yuan, is_yang, ju_number, template)
+        for name, value in zip(self.__slots__, values):
+            object.__setattr__(self, name, value)
+    
+    def __setattr__(self, name, value):
+        raise AttributeError(f"排盘结果只读: {name}")
+    
+    def __reduce__(self):
+        # 序列化时只含标量字段，反序列化时按 (阴阳遁, 局数, 时干支) 重新选取共享的盘面模板
+        return _restore_plate, tuple(getattr(self, name) for name in self.__slots__[:-1])
+    
+    def __repr__(self) -> str:
+        return (f"Plate({self.input_dt:%Y-%m-%d %H:%M:%S}, "
+                f"{'阳遁' if self.is_yang else '阴遁'}{self.ju_number}局)")
+    
+    @property
+    def xunshou_ganzhi(self) -> int:
+        """旬首的六十甲子序号"""
+        return self.template.xunshou_ganzhi
+    
+    @property
+    def zhishi_men(self) -> int:
+        """值使门序号"""
+        return self.template.zhishi_men
+    
+    def ganzhi_text(self) -> str:
+        """年月日时干支的显示文本"""
+        jiazi = GanzhiConstants.JIAZI
+        return (f"{jiazi[self.year_gz]}年 {jiazi[self.month_gz]}月 "
+                f"{jiazi[self.day_gz]}日 {jiazi[self.hour_gz]}时")
+    
+    def palace(self, pos: int) -> Dict:
+        """宫位数据（序号）"""
+        return self.template.palace(pos)
+    
+    def palace_display(self, pos: int) -> Dict:
+        """宫位数据的显示值"""
+        return self.template.palace_display(pos)
+    
+    def rumu_palaces(self) -> List[Dict]:
+        """天盘干入墓的宫位列表，每项为 {'宫位': int, '天盘干': str, '墓库地支': str, '宫名': str}"""
+        return [dict(item) for item in self.template.tianpan_rumu]
+    
+    def liuyi_jixing(self) -> List[Dict]:
+        """六仪击刑的宫位列表，每项为 {'宫位': int, '六仪': str, '旬首': str, '刑理': str, '地支关系': str, '宫名': str}"""
+        return [dict(item) for item in self.template.liuyi_jixing]
+    
+    def men_po(self) -> List[Dict]:
+        """门迫的宫位列表，每项为 {'宫位': int, '门': str, '宫名': str, '描述': str}"""
+        return [dict(item) for item in self.template.men_po]
+    
+    def maxing_palace(self) -> Dict:
+        """
+        计算马星所落宫位
+        
+        根据时支确定马星地支及奇门宫位：
+        申、子、辰 → 寅 → 艮八宫
+        亥、卯、未 → 巳 → 巽四宫
+        寅、午、戌 → 申 → 坤二宫
+        巳、酉、丑 → 亥 → 乾六宫
         
-        # 根据日干确定时干起始（五鼠遁日）
-        ri_gan_idx = GanzhiConstants.TIANGAN.index(ri_gan)
-        if ri_gan_idx in [0, 5]:      # 甲/己日
-            start = 0
-        elif ri_gan_idx in [1, 6]:    # 乙/庚日
-            start = 2
-        elif ri_gan_idx in [2, 7]:    # 丙/辛日
-            start = 4
-        elif ri_gan_idx in [3, 8]:    # 丁/壬日
-            start = 6
-        else:                          # 戊/癸日
-            start = 8
-        
-        shi_gan = GanzhiConstants.TIANGAN[(start + zhi_index) % 10]
-        shi_gz = f"{shi_gan}{shi_zhi}"
-        
-        return ri_gz, shi_gz
+        Returns:
+            dict: {'时支': str, '马星地支': str, '宫位': int, '宫名': str}
+        """
+        shi_zhi = self.hour_gz % 12  # 时支
+        maxing_zhi, pos = QimenConstants.MAXING[shi_zhi]
+        palace_name, _ = QimenConstants.PALACE_MAP[pos]
+        return {
+            '时支': GanzhiConstants.DIZHI[shi_zhi],
+            '马星地支': GanzhiConstants.DIZHI[maxing_zhi],
+            '宫位': pos,
+            '宫名': palace_name
+        }
     
-    @staticmethod
-    def calculate_xunshou(hour_gz: str) -> str:
+    def to_dict(self) -> Dict:
         """
-        计算旬首
+        排盘结果字典（字段同 QiMenDunjiaPan.get_result_dict，每次调用重新生成）
         
-        Args:
-            hour_gz: 时干支
-            
         Returns:
-            str: 旬首干支
+            dict: 包含所有排盘信息的字典
         """
-        gan, zhi = hour_gz[0], hour_gz[1]
-        gan_idx = GanzhiConstants.TIANGAN_ORDER[gan]
-        zhi_idx = GanzhiConstants.DIZHI_ORDER[zhi]
-        
-        delta = (zhi_idx - gan_idx) % 12
-        
-        xunshou_map = {
-            0: "甲子", 10: "甲戌", 8: "甲申",
-            6: "甲午", 4: "甲辰", 2: "甲寅"
-        }
-        
-        return xunshou_map[delta]
+        return {key: build(self) for key, build in ChartResult.SECTIONS.items()}
 
 
-# ============================================================================
-# 符头计算模块
-# ============================================================================
+def _restore_plate(*fields) -> Plate:
+    """由 Plate.__reduce__ 的标量字段恢复排盘结果"""
+    hour_gz, is_yang, ju_number = fields[4], fields[7], fields[8]
+    return Plate(*fields, get_plate_template(is_yang, ju_number, hour_gz))
 
-class FutouCalculator:
-    """符头计算类"""
+
+class ChartResult(Mapping):
+    """
+    排盘结果视图（只读映射）：字段同 get_result_dict，各字段在首次读取时由 Plate 生成并缓存
     
-    @staticmethod
-    def get_futou_details(day_ganzhi: str, method: str = '置闰') -> Dict:
+    只读取局数等少数字段时不生成九宫显示值和格局列表；to_dict() 每次重新生成完整字典，可自由修改。
+    """
+    
+    # 结果字段 -> 由 Plate 生成该字段的函数
+    SECTIONS = {
+        'input_time': lambda plate: plate.input_dt.strftime('%Y-%m-%d %H:%M:%S'),
+        'ganzhi': lambda plate: {
+            'year': GanzhiConstants.JIAZI[plate.year_gz],
+            'month': GanzhiConstants.JIAZI[plate.month_gz],
+            'day': GanzhiConstants.JIAZI[plate.day_gz],
+            'hour': GanzhiConstants.JIAZI[plate.hour_gz]
+        },
+        'jieqi': lambda plate: JieqiConstants.JIEQI_NAMES[plate.curr_jieqi],
+        'yuan': lambda plate: QimenConstants.SANYUAN[plate.curr_yuan],
+        'ju_type': lambda plate: '阳遁' if plate.is_yang else '阴遁',
+        'ju_number': lambda plate: plate.ju_number,
+        'xunshou': lambda plate: GanzhiConstants.JIAZI[plate.xunshou_ganzhi],
+        'zhishi_men': lambda plate: QimenConstants.MEN_ORDER[plate.zhishi_men],
+        'tianpan_rumu': Plate.rumu_palaces,  # 天盘干入墓的宫位列表
+        'liuyi_jixing': Plate.liuyi_jixing,  # 六仪击刑的宫位列表
+        'men_po': Plate.men_po,  # 门迫的宫位列表
+        'maxing': Plate.maxing_palace,  # 马星所落宫位
+        # 包含显示值的宫位数据（2宫地盘干、天芮所在宫天盘干使用寄宫显示）
+        'palaces': lambda plate: {pos: plate.palace_display(pos) for pos in QimenConstants.PALACE_MAP},
+    }
+    
+    __slots__ = ('plate', '_sections')
+    
+    def __init__(self, plate: Plate):
         """
-        根据日干支和定局方法计算符头、三元及距离天数
+        初始化结果视图
         
         Args:
-            day_ganzhi: 日干支，如"甲子"
-            method: 定局方法，"置闰" 或 "拆补"
-            
-        Returns:
-            dict: 包含符头、三元、距离天数等信息
+            plate: 排盘结果
         """
-        # 生成干支表（60甲子）
-        ganzhi = [
-            f"{GanzhiConstants.TIANGAN[i % 10]}{GanzhiConstants.DIZHI[i % 12]}"
-            for i in range(60)
-        ]
-        ganzhi_map = {gz: i for i, gz in enumerate(ganzhi)}
-        
-        # 校验输入合法性
-        if day_ganzhi not in ganzhi_map:
-            raise ValueError(f"无效的日干支: {day_ganzhi}")
-        
-        current_idx = ganzhi_map[day_ganzhi]
-        
-        # 逆向查找符头
-        futou, days_ago = None, 0
-        zhi_type = ''
-        step_day = 0
-        
-        for steps in range(60):
-            check_idx = (current_idx - steps) % 60
-            check_gz = ganzhi[check_idx]
-            
-            # 置闰法：仅匹配甲子、甲午、己卯、己酉
-            if method == '置闰' and check_gz in QimenConstants.ZHIRUN_FUTOU:
-                futou = check_gz
-                days_ago = steps
-                step_day = days_ago % 5 + 1
-                
-                # 确定三元
-                if 0 <= days_ago <= 5:
-                    zhi_type = "上元"
-                elif 6 <= days_ago <= 10:
-                    zhi_type = "中元"
-                elif 11 <= days_ago <= 15:
-                    zhi_type = "下元"
-                else:
-                    zhi_type = "上元"
-                break
-            
-            # 拆补法：匹配所有甲/己日
-            if method == '拆补' and check_gz[0] in {'甲', '己'}:
-                futou = check_gz
-                days_ago = steps
-                # 确定三元
-                zhi_type_map = {
-                    '子': '上元', '午': '上元', '卯': '上元', '酉': '上元',
-                    '寅': '中元', '申': '中元', '巳': '中元', '亥': '中元',
-                    '辰': '下元', '戌': '下元', '丑': '下元', '未': '下元'
-                }
-                zhi_type = zhi_type_map[futou[1]]
-                break
+        self.plate = plate
+        self._sections = {}
+    
+    def __getitem__(self, key: str):
+        sections = self._sections
+        if key not in sections:
+            sections[key] = self.SECTIONS[key](self.plate)
+        return sections[key]
+    
+    def __iter__(self):
+        return iter(self.SECTIONS)
+    
+    def __len__(self) -> int:
+        return len(self.SECTIONS)
+    
+    def __repr__(self) -> str:
+        return f"ChartResult({self.plate!r})"
+    
+    def to_dict(self) -> Dict:
+        """
+        完整的排盘结果字典（每次调用重新生成，与视图缓存的字段互不影响）
         
-        return {
-            '符头': futou,
-            '上中下元': zhi_type,
-            '符头差日': days_ago,
-            '某元第几天': step_day
-        }
+        Returns:
+            dict: 包含所有排盘信息的字典
+        """
+        return self.plate.to_dict()
 
 
 # ============================================================================
@@ -605,37 +1771,34 @@ class FutouCalculator:
 # ============================================================================
 
 class QiMenDunjiaPan:
-    """奇门遁甲排盘主类"""
+    """奇门遁甲排盘主类（干支、节气、星门神均以序号计算，输出时转为名称）"""
+    
+    log_steps = True  # 逐步排盘（arrange_*）时是否输出各步骤日志（生成盘面模板时在实例上关闭）
     
-    def __init__(self, input_datetime_str: str):
+    def __init__(self, input_datetime_str: Union[str, datetime], backend=None, method: str = '置闰'):
         """
         初始化排盘
         
         Args:
-            input_datetime_str: 输入时间字符串，格式："YYYY-MM-DD HH:MM:SS"
+            input_datetime_str: 输入时间字符串，格式："YYYY-MM-DD HH:MM:SS"；也可传入 datetime（无时区视为UTC）
+            backend: 天文计算后端（实例或名称），默认 AstronomyConfig.BACKEND
+            method: 定局方法，"置闰" 或 "拆补"
         """
-        self.input_dt = datetime.strptime(input_datetime_str, "%Y-%m-%d %H:%M:%S")
-        self.input_utc = self.input_dt.replace(tzinfo=timezone.utc)
+        if method not in FutouCalculator.METHODS:
+            raise ValueError(f"无效的定局方法: {method}")
         
-        # 初始化九宫数据结构
-        self.palaces = {
-            num: {
-                'earth': None,   # 地盘天干
-                'sky': None,     # 天盘天干
-                'door': None,    # 八门
-                'star': None,    # 九星
-                'shen': None     # 八神
-            }
-            for num in QimenConstants.PALACE_MAP
-        }
+        self.input_dt = self.parse_input(input_datetime_str)
+        self.input_utc = self.input_dt.replace(tzinfo=timezone.utc)
+        self.backend = get_backend(backend)
+        self.method = method
         
-        # 干支信息
+        # 干支信息（六十甲子序号）
         self.year_gz = None
         self.month_gz = None
         self.day_gz = None
         self.hour_gz = None
         
-        # 符头相关
+        # 符头相关（节气为 JIEQI_INFO 序号，三元为 SANYUAN 序号）
         self.futou_date = None
         self.period = None
         self.curr_jieqi = None
@@ -645,6 +1808,38 @@ class QiMenDunjiaPan:
         self.ju_number = None
         self.is_yang = None
         
+        self._reset_plate()
+    
+    @staticmethod
+    def parse_input(value: Union[str, datetime]) -> datetime:
+        """
+        解析输入时间（精确到秒）
+        
+        Args:
+            value: 时间字符串（"YYYY-MM-DD HH:MM:SS"）或 datetime（带时区时换算为UTC）
+            
+        Returns:
+            datetime: 无时区的UTC时间
+        """
+        if isinstance(value, str):
+            return datetime.strptime(value, "%Y-%m-%d %H:%M:%S")
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value.replace(microsecond=0)
+    
+    def _reset_plate(self):
+        """初始化逐步排盘（arrange_*）使用的九宫及盘面相关数据"""
+        self.palaces = {
+            num: {
+                'earth': None,   # 地盘天干序号
+                'sky': None,     # 天盘天干序号
+                'door': None,    # 八门序号
+                'star': None,    # 九星序号
+                'shen': None     # 八神序号
+            }
+            for num in QimenConstants.PALACE_MAP
+        }
+        
         # 旬首相关
         self.xunshou_ganzhi = None
         self.xunshou_original_pos = None
@@ -655,24 +1850,80 @@ class QiMenDunjiaPan:
         
         # 地盘天干数组（用于天盘旋转）
         self.dipan_tiangan_array = []
+        
+        # 天干序号 -> 地盘宫位（甲不在地盘，默认中宫）
+        self.earth_positions = [5] * 10
+        
+        # 排盘结果（选取盘面模板时生成；逐步排盘时在首次读取 plate 时按九宫数据生成）及其结果视图
+        self._plate = None
+        self._result = None
     
     # ========================================================================
     # 主流程方法
     # ========================================================================
     
+    def apply_calendar_index(self) -> bool:
+        """
+        查逐日历法索引确定干支、节气、三元和局数（代替 calculate_ganzhi、calculate_futou、get_futou_jieqi）
+        
+        Returns:
+            bool: 是否查表成功；索引不存在、未覆盖输入日期、后端非精确星历或输入时刻晚于当日记录失效时刻时返回False
+        """
+        index = get_calendar_index() if self.backend.exact else None
+        row = index.lookup(self.input_dt.date()) if index else None
+        seconds = self.input_dt.hour * 3600 + self.input_dt.minute * 60 + self.input_dt.second
+        if row is None or seconds >= row['change']:
+            return False
+        
+        # 23点后日干支换日
+        late = self.input_dt.hour >= 23
+        day_idx = (int(row['day']) + late) % 60
+        
+        if self.method == '置闰':
+            # 节气、三元、局数取（换日前或换日后的）记录
+            jieqi_idx, yuan_idx, ju = (
+                (row['late_jieqi'], row['late_yuan'], row['late_ju']) if late
+                else (row['jieqi'], row['yuan'], row['ju'])
+            )
+            self.curr_jieqi = int(jieqi_idx)
+            self.curr_yuan = int(yuan_idx)
+            self.is_yang = bool(ju > 0)
+            self.ju_number = abs(int(ju))
+        else:
+            # 拆补：输入时刻所在节气（当日交节后顺延一个），符头定元
+            self.curr_jieqi = (int(row['term']) + (seconds >= row['term_change'])) % len(JieqiConstants.JIEQI_INFO)
+            self.curr_yuan = FutouCalculator.TABLES['拆补'][day_idx][2]
+            self.is_yang = QimenConstants.YANG_DUN[self.curr_jieqi]
+            self.ju_number = QimenConstants.JU_NUMBERS[self.curr_jieqi][self.curr_yuan]
+        
+        self.year_gz = int(row['year'])
+        self.month_gz = int(row['month'])
+        self.day_gz = day_idx
+        self.hour_gz = GanzhiCalculator.get_hour_ganzhi(day_idx, self.input_dt.hour)
+        
+        logger.info(f"干支: {self._ganzhi_text()}（日历索引）")
+        logger.info(f"当前节气: {JieqiConstants.JIEQI_NAMES[self.curr_jieqi]}, 三元: {QimenConstants.SANYUAN[self.curr_yuan]}, "
+                    f"{'阳遁' if self.is_yang else '阴遁'} {self.ju_number} 局")
+        return True
+    
+    def calculate_ju(self):
+        """确定干支、节气、三元、阴阳遁和局数（先查逐日历法索引，未命中时逐项计算）"""
+        if not self.apply_calendar_index():
+            self.calculate_ganzhi()
+            self.calculate_futou()
+            self.get_futou_jieqi()
+    
     def calculate_ganzhi(self):
         """计算干支"""
-        self.year_gz = GanzhiCalculator.get_year_ganzhi(self.input_utc)
-        self.month_gz = GanzhiCalculator.get_month_ganzhi(self.input_utc)
-        self.day_gz, self.hour_gz = GanzhiCalculator.get_day_hour_ganzhi(
-            self.input_dt.strftime('%Y-%m-%d %H:%M:%S')
-        )
+        self.year_gz = GanzhiCalculator.get_year_ganzhi(self.input_utc, self.backend)
+        self.month_gz = GanzhiCalculator.get_month_ganzhi(self.input_utc, self.backend)
+        self.day_gz, self.hour_gz = GanzhiCalculator.get_day_hour_ganzhi(self.input_dt)
         
-        logger.info(f"干支: {self.year_gz}年 {self.month_gz}月 {self.day_gz}日 {self.hour_gz}时")
+        logger.info(f"干支: {self._ganzhi_text()}")
     
     def calculate_futou(self):
         """计算符头日期"""
-        futou_info = FutouCalculator.get_futou_details(self.day_gz)
+        futou_info = FutouCalculator.get_futou_details(self.day_gz, self.method)
         futou_days_diff = futou_info['符头差日']
         
         self.futou_date = datetime.combine(
@@ -684,131 +1935,98 @@ class QiMenDunjiaPan:
         logger.info(f"符头日期: {self.futou_date}")
     
     def get_futou_jieqi(self):
-        """获取符头所在的节气，确定阴阳遁和局数"""
-        # 获取夏至和冬至时间
-        summer_solstice, winter_solstice = AstronomyCalculator.get_solstices(
-            self.futou_date.year
-        )
-        
-        # 确保时区一致性
-        futou_date_naive = self.futou_date.replace(tzinfo=None)
-        summer_solstice_naive = summer_solstice.replace(tzinfo=None)
-        winter_solstice_naive = winter_solstice.replace(tzinfo=None)
-        
-        # 判断符头日期在夏至和冬至的相对位置
-        if futou_date_naive < summer_solstice_naive:
-            # 如果在夏至前，使用前一年的冬至
-            _, prev_winter = AstronomyCalculator.get_solstices(self.futou_date.year - 1)
-            prev_winter_naive = prev_winter.replace(tzinfo=None)
-            period = "夏至前"
-            self.period = '冬至'
-            effective_jieqi = prev_winter_naive
-        elif futou_date_naive < winter_solstice_naive:
-            period = "夏至后冬至前"
-            self.period = '夏至'
-            effective_jieqi = summer_solstice_naive
-        else:
-            period = "冬至后"
-            self.period = '冬至'
-            effective_jieqi = winter_solstice_naive
+        """获取符头所在的节气，确定阴阳遁和局数（置闰法以二至前的符头起算并置闰，拆补法见 get_chaibu_jieqi）"""
+        if self.method == '拆补':
+            self.get_chaibu_jieqi()
+            return
+        
+        # 符头所属的二至锚点：锚点符头日期、是否置闰、起始节气
+        solstice, anchor_date, leap, self.period = self.backend.zhirun_anchor(self.futou_date)
+        logger.info(f"参考二至: {solstice}, 参考符头日期: {anchor_date}{'（置闰）' if leap else ''}, "
+                    f"起始节气: {JieqiConstants.JIEQI_NAMES[self.period]}")
+        
+        # 输入日期与锚点符头日期相差的天数（只比较日期部分），每15日一个节气、每5日一元
+        input_futou_diff = (self.input_dt.date() - anchor_date).days
+        quotient, remainder = divmod(input_futou_diff, 15)
+        logger.info(f"输入日期与符头相差 {input_futou_diff} 天")
         
-        logger.info(f"符头日期 {self.futou_date} 在{period}")
+        # 从起始节气顺推（考虑循环）
+        self.curr_jieqi = (self.period + quotient) % len(JieqiConstants.JIEQI_INFO)
         
-        # 计算参考节气日期的日干支
-        effective_day_ganzhi, _ = GanzhiCalculator.get_day_hour_ganzhi(
-            effective_jieqi.strftime("%Y-%m-%d %H:%M:%S")
-        )
+        # 确定三元（每元5天）、阴阳遁和局数
+        self._set_ju(remainder // 5)
+    
+    def get_chaibu_jieqi(self):
+        """拆补法：节气取输入时刻所在的节气，三元取日干支的符头（甲、己日）地支，确定阴阳遁和局数"""
+        jieqi_result = GanzhiCalculator.find_jieqi(self.input_utc, backend=self.backend)
+        if not jieqi_result:
+            raise ValueError("无法确定节气")
         
-        # 获取符头信息
-        futou_info = FutouCalculator.get_futou_details(effective_day_ganzhi)
-        futou_days_diff = futou_info['符头差日']
+        jieqi_time, jieqi_name = jieqi_result
+        self.curr_jieqi = self.period = JieqiConstants.JIEQI_ORDER[jieqi_name]
+        logger.info(f"拆补：所在节气 {jieqi_name}，交节时间 {jieqi_time}")
         
-        # 计算符头日期
-        effective_futou_date = datetime.combine(
-            effective_jieqi.date() - timedelta(days=futou_days_diff),
-            effective_jieqi.time(),
-            tzinfo=effective_jieqi.tzinfo
+        self._set_ju(FutouCalculator.get_futou_details(self.day_gz, '拆补')['上中下元'])
+    
+    def _set_ju(self, yuan: int):
+        """按当前节气和三元确定阴阳遁和局数"""
+        self.curr_yuan = yuan
+        logger.info(f"当前节气: {JieqiConstants.JIEQI_NAMES[self.curr_jieqi]}, 三元: {QimenConstants.SANYUAN[self.curr_yuan]}")
+        
+        self.is_yang = QimenConstants.YANG_DUN[self.curr_jieqi]
+        self.ju_number = QimenConstants.JU_NUMBERS[self.curr_jieqi][self.curr_yuan]
+        logger.info(f"{'阳遁' if self.is_yang else '阴遁'} {self.ju_number} 局")
+    
+    def apply_plate_template(self):
+        """按阴阳遁、局数和时干支选取盘面模板（代替 arrange_earth_plate、arrange_sky_plate、arrange_doors、arrange_shen）"""
+        template = get_plate_template(self.is_yang, self.ju_number, self.hour_gz)
+        
+        self.xunshou_ganzhi = template.xunshou_ganzhi
+        self.xunshou_original_pos = template.xunshou_original_pos
+        self.zhishi_pos = template.zhishi_pos
+        self.zhishi_men = template.zhishi_men
+        self._plate = self._make_plate(template)
+        self._result = None
+        
+        logger.info(f"盘面模板: {'阳遁' if self.is_yang else '阴遁'}{self.ju_number}局 "
+                    f"{GanzhiConstants.JIAZI[self.hour_gz]}时")
+    
+    @property
+    def plate(self) -> Plate:
+        """排盘结果（逐步排盘时按当前九宫数据生成）"""
+        if self._plate is None:
+            self._plate = self._make_plate(PlateTemplate.from_palaces(
+                self.palaces, self.xunshou_ganzhi, self.xunshou_original_pos,
+                self.zhishi_pos, self.zhishi_men
+            ))
+        return self._plate
+    
+    @property
+    def result(self) -> ChartResult:
+        """排盘结果视图（各字段首次读取时生成）"""
+        if self._result is None:
+            self._result = ChartResult(self.plate)
+        return self._result
+    
+    def _make_plate(self, template: PlateTemplate) -> Plate:
+        """由当前干支、节气、局数和盘面模板生成排盘结果"""
+        return Plate(
+            self.input_dt, self.year_gz, self.month_gz, self.day_gz, self.hour_gz,
+            self.curr_jieqi, self.curr_yuan, self.is_yang, self.ju_number, template
         )
-        
-        logger.info(f"参考节气: {self.period}, 时间: {effective_jieqi}")
-        logger.info(f"参考符头日期: {effective_futou_date}")
-        
-        # 判断是否需要置闰
-        if futou_info['符头差日'] > 9:
-            logger.info("触发置闰")
-            if self.period == '冬至':
-                self.period = '大雪'
-            elif self.period == '夏至':
-                self.period = '芒种'
-        
-        # 计算输入日期与符头日期的差值（只比较日期部分，使用00:00:00）
-        input_date_00 = self.input_dt.replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=None)
-        futou_date_00 = effective_futou_date.replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=None)
-        input_futou_diff = (input_date_00 - futou_date_00).days
-        logger.info(f"输入日期（原始）: {self.input_dt.replace(tzinfo=None)}")
-        logger.info(f"输入日期（计算用）: {input_date_00}")
-        logger.info(f"符头日期（原始）: {effective_futou_date.replace(tzinfo=None)}")
-        logger.info(f"符头日期（计算用）: {futou_date_00}")
-        
-        # 计算当前节气和三元
-        quotient, remainder = divmod(input_futou_diff, 15)
-        logger.info(f"输入日期与符头相差 {input_futou_diff} 天")
-        logger.info(f"除以15: 整数部分={quotient}, 余数部分={remainder}")
-        
-        # 在节气列表中找到起始节气的索引
-        start_index = None
-        for i, (_, _, name) in enumerate(JieqiConstants.JIEQI_INFO):
-            if name == self.period:
-                start_index = i
-                break
-        
-        if start_index is not None:
-            # 计算目标节气的索引（考虑循环）
-            target_index = (start_index + quotient) % len(JieqiConstants.JIEQI_INFO)
-            _, _, target_name = JieqiConstants.JIEQI_INFO[target_index]
-            
-            self.curr_jieqi = target_name
-            
-            # 确定三元
-            quotient_yuan, _ = divmod(remainder, 5)
-            yuan_map = {0: '上元', 1: '中元', 2: '下元'}
-            self.curr_yuan = yuan_map.get(quotient_yuan, '上元')
-            
-            logger.info(f"当前节气: {self.curr_jieqi}, 三元: {self.curr_yuan}")
-            
-            # 确定阴阳遁和局数
-            if self.curr_jieqi in QimenConstants.YANG_JU_MAPPING:
-                self.is_yang = True
-                self.ju_number = QimenConstants.YANG_JU_MAPPING[self.curr_jieqi][self.curr_yuan]
-                logger.info(f"阳遁 {self.ju_number} 局")
-            elif self.curr_jieqi in QimenConstants.YIN_JU_MAPPING:
-                self.is_yang = False
-                self.ju_number = QimenConstants.YIN_JU_MAPPING[self.curr_jieqi][self.curr_yuan]
-                logger.info(f"阴遁 {self.ju_number} 局")
-            else:
-                raise ValueError(f"未找到对应的局数映射：节气={self.curr_jieqi}，元={self.curr_yuan}")
-        else:
-            raise ValueError(f"未找到起始节气：{self.period}")
     
     def arrange_earth_plate(self):
         """排布地盘（三奇六仪）"""
+        self._plate = self._result = None
+        
         # 确定戊的起始宫位
-        start_pos = self.ju_number
-        
-        # 生成九宫遍历路径
-        positions = []
-        current = start_pos
-        for _ in range(9):
-            positions.append(current)
-            # 阳遁顺行，阴遁逆行
-            current = current % 9 + 1 if self.is_yang else (current - 2) % 9 + 1
+        current = self.ju_number
         
-        # 填充天干（六仪→三奇循环）
-        for i, pos in enumerate(positions):
-            if i < 6:
-                self.palaces[pos]['earth'] = QimenConstants.QIYI_ORDER[i]
-            else:
-                self.palaces[pos]['earth'] = QimenConstants.QIYI_ORDER[6 + (i - 6) % 3]
+        # 沿九宫遍历路径填充天干（六仪→三奇），阳遁顺行，阴遁逆行
+        for gan in QimenConstants.QIYI_ORDER:
+            self.palaces[current]['earth'] = gan
+            self.earth_positions[gan] = current
+            current = current % 9 + 1 if self.is_yang else (current - 2) % 9 + 1
         
         # 保存地盘天干数组（用于天盘旋转）
         self.dipan_tiangan_array = [
@@ -816,38 +2034,35 @@ class QiMenDunjiaPan:
             for pos in QimenConstants.PALACE_TRAVERSE_ORDER
         ]
         
-        logger.info("地盘排布完成")
+        self._log_step("地盘排布完成")
     
     def arrange_sky_plate(self):
         """排布天盘和九星"""
-        shigan = self.hour_gz[0]
-        positions = QimenConstants.PALACE_TRAVERSE_ORDER + [5]
+        shigan = self.hour_gz % 10
+        traverse_index = QimenConstants.PALACE_TRAVERSE_INDEX
         
         # 计算旬首
         self.xunshou_ganzhi = GanzhiCalculator.calculate_xunshou(self.hour_gz)
         
         # 获取旬首对应的地盘宫位
-        xunshou_liuyi = QimenConstants.XUNSHOU_LIUYI[self.xunshou_ganzhi]
+        xunshou_liuyi = QimenConstants.XUNSHOU_LIUYI[self.xunshou_ganzhi // 10]
         xunshou_original_pos = self._find_earth_pos(xunshou_liuyi)
         
         # 中宫寄2宫（坤宫）
         xunshou_original_pos = 2 if xunshou_original_pos == 5 else xunshou_original_pos
         self.xunshou_original_pos = xunshou_original_pos
         
-        logger.info(f"旬首: {self.xunshou_ganzhi}, 原始宫位: {xunshou_original_pos}")
+        self._log_step(f"旬首: {GanzhiConstants.JIAZI[self.xunshou_ganzhi]}, 原始宫位: {xunshou_original_pos}")
         
         # 获取时干宫位
         target_pos = self._get_shigan_position(shigan)
         # 如果是中宫5，寄到坤宫2
         target_pos = 2 if target_pos == 5 else target_pos
-        logger.info(f"时干: {shigan}, 宫位: {target_pos}")
+        self._log_step(f"时干: {GanzhiConstants.TIANGAN[shigan]}, 宫位: {target_pos}")
         
         # 计算旋转步数
-        rotation_steps = (
-            positions.index(target_pos) - 
-            positions.index(xunshou_original_pos)
-        )
-        logger.info(f"旋转步数: {rotation_steps}")
+        rotation_steps = traverse_index[target_pos] - traverse_index[xunshou_original_pos]
+        self._log_step(f"旋转步数: {rotation_steps}")
         
         # 旋转九星和三奇六仪
         stars_rotated = deque(QimenConstants.STAR_ORIGIN_ARRAY)
@@ -861,39 +2076,23 @@ class QiMenDunjiaPan:
             self.palaces[pos]['sky'] = qiyi_rotated[i]
             self.palaces[pos]['star'] = stars_rotated[i]
         
-        # 中宫数据
+        # 中宫数据（天禽随天芮，天芮所在宫的天盘干另加中宫天盘干，见 PlateTemplate.sky_gans）
         self.palaces[5]['sky'] = self.palaces[5]['earth']
-        self.palaces[5]['star'] = '天禽'
-        
-        # 天芮星所在宫的天盘干需加5宫天盘干（天禽随天芮）
-        for pos in QimenConstants.PALACE_TRAVERSE_ORDER:
-            if self.palaces[pos]['star'] == '天芮':
-                sky_self = self.palaces[pos]['sky']
-                sky_5 = self.palaces[5]['sky']
-                self.palaces[pos]['sky'] = f"{sky_self}/{sky_5}" if sky_5 != sky_self else sky_self
-                break
+        self.palaces[5]['star'] = QimenConstants.TIANQIN
         
-        logger.info("天盘和九星排布完成")
+        self._log_step("天盘和九星排布完成")
     
     def arrange_doors(self):
         """排布八门"""
-        positions = QimenConstants.PALACE_TRAVERSE_ORDER + [5]
+        traverse_index = QimenConstants.PALACE_TRAVERSE_INDEX
         
-        # 生成完整的六十甲子列表
-        sixty_jiazi = [
-            f"{GanzhiConstants.TIANGAN[i % 10]}{GanzhiConstants.DIZHI[i % 12]}"
-            for i in range(60)
-        ]
-        
-        xunshou_index = sixty_jiazi.index(self.xunshou_ganzhi)
-        current_index = sixty_jiazi.index(self.hour_gz)
-        xunshou_diff = current_index - xunshou_index
+        xunshou_diff = self.hour_gz - self.xunshou_ganzhi
         
-        logger.info(f"距离旬首: {xunshou_diff} 个时辰")
+        self._log_step(f"距离旬首: {xunshou_diff} 个时辰")
         
         # 计算值使门的新宫位
         xunshou_ganzhi_earth_pos = self._find_earth_pos(
-            QimenConstants.XUNSHOU_LIUYI[self.xunshou_ganzhi]
+            QimenConstants.XUNSHOU_LIUYI[self.xunshou_ganzhi // 10]
         )
         
         if self.is_yang:
@@ -904,28 +2103,24 @@ class QiMenDunjiaPan:
         self.zhishi_pos = 9 if self.zhishi_pos == 0 else self.zhishi_pos
         self.zhishi_pos = 2 if self.zhishi_pos == 5 else self.zhishi_pos
         
-        logger.info(f"值使门位置: {self.zhishi_pos}")
+        self._log_step(f"值使门位置: {self.zhishi_pos}")
         
-        # 确定值使门名称
-        men_pos = positions.index(self.xunshou_original_pos)
-        self.zhishi_men = QimenConstants.MEN_ORDER[men_pos]
-        logger.info(f"值使门: {self.zhishi_men}")
+        # 确定值使门（八门序号即原始宫位的遍历顺序）
+        self.zhishi_men = traverse_index[self.xunshou_original_pos]
+        self._log_step(f"值使门: {QimenConstants.MEN_ORDER[self.zhishi_men]}")
         
         # 计算旋转步数
-        men_pos_diff = (
-            positions.index(self.zhishi_pos) - 
-            positions.index(self.xunshou_original_pos)
-        )
+        men_pos_diff = traverse_index[self.zhishi_pos] - traverse_index[self.xunshou_original_pos]
         
         # 旋转八门
-        men_order = deque(QimenConstants.MEN_ORDER)
+        men_order = deque(range(len(QimenConstants.MEN_ORDER)))
         men_order.rotate(men_pos_diff)
         
         # 填充八门（不含中宫）
         for pos, men in zip(QimenConstants.PALACE_TRAVERSE_ORDER, men_order):
             self.palaces[pos]['door'] = men
         
-        logger.info("八门排布完成")
+        self._log_step("八门排布完成")
     
     def arrange_shen(self):
         """排布八神"""
@@ -938,11 +2133,11 @@ class QiMenDunjiaPan:
         )
         
         # 获取时干所在宫位（八神值符所在宫位）
-        shigan_pos = self._find_earth_pos(self.hour_gz[0])
+        shigan_pos = self._find_earth_pos(self.hour_gz % 10)
         shigan_pos = 2 if shigan_pos == 5 else shigan_pos
         
         # 计算旋转步数
-        shigan_pos_index = positions.index(shigan_pos)
+        shigan_pos_index = QimenConstants.PALACE_TRAVERSE_INDEX[shigan_pos]
         
         # 旋转八神
         shen_order_deque = deque(shen_order)
@@ -952,199 +2147,114 @@ class QiMenDunjiaPan:
         for pos, shen in zip(positions, shen_order_deque):
             self.palaces[pos]['shen'] = shen
         
-        logger.info("八神排布完成")
+        self._log_step("八神排布完成")
     
     # ========================================================================
     # 辅助方法
     # ========================================================================
     
-    def _get_earth_display(self, pos: int) -> str:
-        """
-        获取地盘干的显示值。2宫需显示寄宫关系（中宫寄坤宫）：
-        - 2宫：2宫地盘干 + 5宫地盘干
-        """
-        raw = self.palaces[pos]['earth']
-        if pos == 2:
-            other = self.palaces[5]['earth']
-            return f"{raw}/{other}" if other and other != raw else raw
-        return raw
+    def _log_step(self, message: str):
+        """输出逐步排盘的步骤日志（log_steps 关闭时不输出）"""
+        if self.log_steps:
+            logger.info(message)
     
-    def _find_earth_pos(self, target_gan: str) -> int:
+    def _find_earth_pos(self, target_gan: int) -> int:
         """
         找到地盘天干对应的宫位
         
         Args:
-            target_gan: 目标天干
+            target_gan: 目标天干序号
             
         Returns:
-            int: 对应的宫位号
+            int: 对应的宫位号（不在地盘时返回中宫）
         """
-        for pos, data in self.palaces.items():
-            if data['earth'] == target_gan:
-                return pos
-        return 5  # 默认返回中宫
+        return self.earth_positions[target_gan]
     
-    def _get_shigan_position(self, shigan: str) -> int:
+    def _get_shigan_position(self, shigan: int) -> int:
         """
-        根据时干在宫位字典中查找对应的宫位
+        根据时干查找地盘对应的宫位
         
         Args:
-            shigan: 时干
+            shigan: 时干序号
             
         Returns:
-            int: 对应的宫位号
+            int: 对应的宫位号（不在地盘时返回中宫）
         """
-        for palace_num, palace_data in self.palaces.items():
-            if palace_data['earth'] == shigan:
-                return palace_num
-        return 5  # 默认返回中宫
+        return self.earth_positions[shigan]
+    
+    def _ganzhi_text(self) -> str:
+        """年月日时干支的显示文本"""
+        jiazi = GanzhiConstants.JIAZI
+        return (f"{jiazi[self.year_gz]}年 {jiazi[self.month_gz]}月 "
+                f"{jiazi[self.day_gz]}日 {jiazi[self.hour_gz]}时")
     
     def get_rumu_palaces(self) -> List[Dict]:
         """
-        计算哪些宫位的天盘干入墓
-        
-        天盘干入墓：天盘干落在其墓库对应宫位即为入墓
-        例如：甲墓在未(坤二宫)，若天盘甲在2宫则入墓
+        计算哪些宫位的天盘干入墓（见 PlateTemplate._find_rumu）
         
         Returns:
             list: 入墓信息列表，每项为 {'宫位': int, '天盘干': str, '墓库地支': str, '宫名': str}
         """
-        rumu_list = []
-        for pos, data in self.palaces.items():
-            sky_raw = data['sky']
-            if not sky_raw:
-                continue
-            # 天芮所在宫可能为 "戊/己" 格式，需分开判断
-            for gan in sky_raw.split('/'):
-                gan = gan.strip()
-                if gan and gan in QimenConstants.TIANGAN_MUKU:
-                    muku_info = QimenConstants.TIANGAN_MUKU[gan]
-                    if muku_info['宫位'] == pos:
-                        palace_name, _ = QimenConstants.PALACE_MAP[pos]
-                        rumu_list.append({
-                            '宫位': pos,
-                            '天盘干': gan,
-                            '墓库地支': muku_info['地支'],
-                            '宫名': palace_name
-                        })
-        return rumu_list
+        return self.plate.rumu_palaces()
     
     def get_liuyi_jixing(self) -> List[Dict]:
         """
-        计算哪些宫位的天盘六仪击刑
-        
-        六仪击刑：天盘六仪（戊己庚辛壬癸）落在其击刑宫位即为击刑
-        例如：戊（甲子戊）击刑宫位在震三宫，若天盘戊在3宫则击刑
+        计算哪些宫位的天盘六仪击刑（见 PlateTemplate._find_jixing）
         
         Returns:
             list: 击刑信息列表，每项为 {'宫位': int, '六仪': str, '旬首': str, '刑理': str, '地支关系': str, '宫名': str}
         """
-        jixing_list = []
-        for pos, data in self.palaces.items():
-            sky_raw = data['sky']
-            if not sky_raw:
-                continue
-            for gan in sky_raw.split('/'):
-                gan = gan.strip()
-                if gan and gan in QimenConstants.LIUYI_JIXING:
-                    jx_info = QimenConstants.LIUYI_JIXING[gan]
-                    if jx_info['击刑宫位'] == pos:
-                        palace_name, _ = QimenConstants.PALACE_MAP[pos]
-                        jixing_list.append({
-                            '宫位': pos,
-                            '六仪': gan,
-                            '旬首': jx_info['旬首'],
-                            '刑理': jx_info['刑理'],
-                            '地支关系': jx_info['地支关系'],
-                            '宫名': palace_name
-                        })
-        return jixing_list
+        return self.plate.liuyi_jixing()
     
     def get_men_po(self) -> List[Dict]:
         """
-        计算哪些宫位门迫
-        
-        门迫：门与宫位五行相克
-        伤门、杜门（木）落坤二宫、艮八宫（土）→ 门迫
-        惊门、开门（金）落震三宫、巽四宫（木）→ 门迫
-        景门（火）落乾六宫、兑七宫（金）→ 门迫
-        休门（水）落离九宫（火）→ 门迫
-        生门、死门（土）落坎一宫（水）→ 门迫
+        计算哪些宫位门迫（见 PlateTemplate._find_men_po）
         
         Returns:
             list: 门迫信息列表，每项为 {'宫位': int, '门': str, '宫名': str, '描述': str}
         """
-        men_po_list = []
-        for pos, data in self.palaces.items():
-            men = data.get('door')
-            if not men:
-                continue
-            key = (men, pos)
-            if key in QimenConstants.MEN_PO:
-                palace_name, _ = QimenConstants.PALACE_MAP[pos]
-                men_po_list.append({
-                    '宫位': pos,
-                    '门': men,
-                    '宫名': palace_name,
-                    '描述': QimenConstants.MEN_PO[key]
-                })
-        return men_po_list
+        return self.plate.men_po()
     
     def get_maxing_palace(self) -> Optional[Dict]:
         """
-        计算马星所落宫位
-        
-        根据时支确定马星地支及奇门宫位：
-        申、子、辰 → 寅 → 艮八宫
-        亥、卯、未 → 巳 → 巽四宫
-        寅、午、戌 → 申 → 坤二宫
-        巳、酉、丑 → 亥 → 乾六宫
+        计算马星所落宫位（见 Plate.maxing_palace）
         
         Returns:
             dict: {'时支': str, '马星地支': str, '宫位': int, '宫名': str} 或 None
         """
-        shi_zhi = self.hour_gz[1]  # 时支
-        if shi_zhi not in QimenConstants.MAXING:
-            return None
-        maxing_zhi, pos = QimenConstants.MAXING[shi_zhi]
-        palace_name, _ = QimenConstants.PALACE_MAP[pos]
-        return {
-            '时支': shi_zhi,
-            '马星地支': maxing_zhi,
-            '宫位': pos,
-            '宫名': palace_name
-        }
+        return self.plate.maxing_palace()
     
     def print_result(self):
-        """打印排盘结果"""
+        """打印排盘结果（入墓、击刑、门迫、马星及九宫显示值取自结果视图，不重复计算）"""
+        result = self.result
         print("\n" + "=" * 60)
         print("奇门遁甲排盘结果")
         print("=" * 60)
         print(f"输入时间: {self.input_dt}")
-        print(f"干支: {self.year_gz}年 {self.month_gz}月 {self.day_gz}日 {self.hour_gz}时")
-        print(f"节气: {self.curr_jieqi} {self.curr_yuan}")
+        print(f"干支: {self._ganzhi_text()}")
+        print(f"节气: {JieqiConstants.JIEQI_NAMES[self.curr_jieqi]} {QimenConstants.SANYUAN[self.curr_yuan]}")
         print(f"局数: {'阳遁' if self.is_yang else '阴遁'}{self.ju_number}局")
-        print(f"旬首: {self.xunshou_ganzhi}")
-        print(f"值使门: {self.zhishi_men}")
-        rumu_list = self.get_rumu_palaces()
+        print(f"旬首: {GanzhiConstants.JIAZI[self.xunshou_ganzhi]}")
+        print(f"值使门: {QimenConstants.MEN_ORDER[self.zhishi_men]}")
+        rumu_list = result['tianpan_rumu']
         if rumu_list:
             rumu_str = ', '.join(f"{r['宫名']}宫{r['天盘干']}(墓在{r['墓库地支']})" for r in rumu_list)
             print(f"天盘干入墓: {rumu_str}")
         else:
             print("天盘干入墓: 无")
-        jixing_list = self.get_liuyi_jixing()
+        jixing_list = result['liuyi_jixing']
         if jixing_list:
             jixing_str = ', '.join(f"{r['宫名']}宫{r['六仪']}({r['刑理']})" for r in jixing_list)
             print(f"六仪击刑: {jixing_str}")
         else:
             print("六仪击刑: 无")
-        men_po_list = self.get_men_po()
+        men_po_list = result['men_po']
         if men_po_list:
             men_po_str = ', '.join(f"{r['宫名']}宫{r['门']}门({r['描述']})" for r in men_po_list)
             print(f"门迫: {men_po_str}")
         else:
             print("门迫: 无")
-        maxing_info = self.get_maxing_palace()
+        maxing_info = result['maxing']
         if maxing_info:
             print(f"马星: {maxing_info['宫名']}宫(马星地支{maxing_info['马星地支']}，时支{maxing_info['时支']})")
         else:
@@ -1153,12 +2263,11 @@ class QiMenDunjiaPan:
         print("\n九宫排盘:")
         print("-" * 60)
         
-        for pos in QimenConstants.PALACE_TRAVERSE_ORDER + [5]:
+        for pos in QimenConstants.PALACE_TRAVERSE_ORDER + (5,):
             palace_name, direction = QimenConstants.PALACE_MAP[pos]
-            data = self.palaces[pos]
-            earth_display = self._get_earth_display(pos)
+            data = result['palaces'][pos]
             print(f"{pos}宫 {palace_name}({direction}):")
-            print(f"  地盘: {earth_display}")
+            print(f"  地盘: {data['earth']}")
             print(f"  天盘: {data['sky']}")
             print(f"  九星: {data['star']}")
             print(f"  八门: {data['door']}")
@@ -1169,65 +2278,364 @@ class QiMenDunjiaPan:
     
     def get_result_dict(self) -> Dict:
         """
-        获取排盘结果字典
+        获取排盘结果字典（完整生成一份新字典；只读取部分字段时可用 run() 返回的结果视图）
         
         Returns:
             dict: 包含所有排盘信息的字典
         """
-        # 构建包含显示值的宫位数据（2宫、5宫的地盘干使用寄宫显示）
-        palaces_export = {}
-        for pos, data in self.palaces.items():
-            palace_copy = dict(data)
-            palace_copy['earth'] = self._get_earth_display(pos)
-            palaces_export[pos] = palace_copy
-        
-        rumu_list = self.get_rumu_palaces()
-        jixing_list = self.get_liuyi_jixing()
-        men_po_list = self.get_men_po()
-        maxing_info = self.get_maxing_palace()
-        return {
-            'input_time': self.input_dt.strftime('%Y-%m-%d %H:%M:%S'),
-            'ganzhi': {
-                'year': self.year_gz,
-                'month': self.month_gz,
-                'day': self.day_gz,
-                'hour': self.hour_gz
-            },
-            'jieqi': self.curr_jieqi,
-            'yuan': self.curr_yuan,
-            'ju_type': '阳遁' if self.is_yang else '阴遁',
-            'ju_number': self.ju_number,
-            'xunshou': self.xunshou_ganzhi,
-            'zhishi_men': self.zhishi_men,
-            'tianpan_rumu': rumu_list,  # 天盘干入墓的宫位列表
-            'liuyi_jixing': jixing_list,  # 六仪击刑的宫位列表
-            'men_po': men_po_list,  # 门迫的宫位列表
-            'maxing': maxing_info,  # 马星所落宫位
-            'palaces': palaces_export
-        }
+        return self.plate.to_dict()
     
-    def run(self) -> Dict:
+    def run(self) -> ChartResult:
         """
         执行完整的排盘流程
         
         Returns:
-            dict: 排盘结果字典
+            ChartResult: 排盘结果视图（只读映射，字段同 get_result_dict，to_dict() 返回完整字典）
         """
         try:
-            self.calculate_ganzhi()
-            self.calculate_futou()
-            self.get_futou_jieqi()
-            self.arrange_earth_plate()
-            self.arrange_sky_plate()
-            self.arrange_doors()
-            self.arrange_shen()
+            self.calculate_ju()
+            self.apply_plate_template()
             
             logger.info("排盘完成")
-            return self.get_result_dict()
+            return self.result
         
         except Exception as e:
             logger.error(f"排盘失败: {str(e)}")
             raise
+    
+    @classmethod
+    def run_many(cls, inputs: Iterable[Union[str, datetime]], backend=None,
+                 method: str = '置闰') -> List[ChartResult]:
+        """
+        批量排盘，结果按输入顺序返回
+        
+        输入按 (日期, 是否23点后, 日内交节时段) 分组：同组的年月日干支、节气、三元和局数相同，
+        每组只完整排盘一次，其余输入只推算时干支并选取盘面模板。日内交节时刻取自整批
+        输入所涉年份一次求得的节气时间（当日及符头日的节气交接都会划分时段）。
+        
+        Args:
+            inputs: 输入时间（字符串或 datetime，同 QiMenDunjiaPan）
+            backend: 天文计算后端（实例或名称），默认 AstronomyConfig.BACKEND
+            method: 定局方法，"置闰" 或 "拆补"
+            
+        Returns:
+            list: 各输入的排盘结果视图
+        """
+        input_dts = [cls.parse_input(value) for value in inputs]
+        if not input_dts:
+            return []
+        
+        batch = _ChartBatch(get_backend(backend), method)
+        years = [input_dt.year for input_dt in input_dts]
+        batch.load_years(min(years), max(years))
+        return [batch.chart(input_dt) for input_dt in input_dts]
+
+
+# ============================================================================
+# 批量与流式排盘
+# ============================================================================
+
+class _ChartBatch:
+    """
+    批量、流式排盘的共享数据：所涉年份的日内交节时刻、各日的时段划分及各时段的干支局数
+    
+    同一 (日期, 是否23点后, 日内交节时段) 的年月日干支、节气、三元和局数相同，
+    每个时段只完整排盘一次，其余时刻只推算时干支并选取盘面模板。
+    """
+    
+    def __init__(self, backend: AstronomyBackend, method: str):
+        """
+        初始化
+        
+        Args:
+            backend: 天文计算后端
+            method: 定局方法，"置闰" 或 "拆补"
+        """
+        if method not in FutouCalculator.METHODS:
+            raise ValueError(f"无效的定局方法: {method}")
+        
+        self.backend = backend
+        self.method = method
+        self.years = None            # 已载入交节时刻的年份范围 (起, 止)
+        self.jieqi_seconds = {}      # 日期 -> 当日交节时刻的秒数列表
+        self.day_breaks = {}         # 日期 -> 日内时段分界（秒数）
+        self.states = {}             # 时段 -> (年, 月, 日干支, 节气, 三元, 是否阳遁, 局数)
+    
+    def load_years(self, first: int, last: int):
+        """载入指定年份范围（前后各多一年，符头日可能在上一年）的日内交节时刻"""
+        self.jieqi_seconds = self.backend.jieqi_day_seconds(range(first - 1, last + 2))
+        self.years = (first, last)
+    
+    def clear(self):
+        """清空时段划分及各时段的干支局数（流式排盘跨日时调用，内存不随输入增长）"""
+        self.day_breaks.clear()
+        self.states.clear()
+    
+    def chart(self, input_dt: datetime) -> ChartResult:
+        """
+        排盘
+        
+        Args:
+            input_dt: 输入时间（无时区的UTC时间，精确到秒）
+            
+        Returns:
+            ChartResult: 排盘结果视图
+        """
+        if self.years is None or not self.years[0] <= input_dt.year <= self.years[1]:
+            self.load_years(input_dt.year, input_dt.year)
+        
+        day = input_dt.date()
+        breaks = self.day_breaks.get(day)
+        if breaks is None:
+            breaks = self.day_breaks[day] = self._day_breaks(day)
+        
+        seconds = input_dt.hour * 3600 + input_dt.minute * 60 + input_dt.second
+        late = input_dt.hour >= 23
+        segment = bisect.bisect_right(breaks, seconds)
+        key = (day, late, segment)
+        state = self.states.get(key)
+        if state is None:
+            # 按时段起点（而非时段内首个输入）排盘，同一时段的结果与输入顺序无关
+            start = max(breaks[segment - 1] if segment else 0, CalendarIndexFormat.LATE_HOUR_SECONDS if late else 0)
+            start_dt = datetime.combine(day, datetime.min.time()) + timedelta(seconds=start)
+            pan = QiMenDunjiaPan(start_dt, backend=self.backend, method=self.method)
+            pan.calculate_ju()
+            state = self.states[key] = (
+                pan.year_gz, pan.month_gz, pan.day_gz,
+                pan.curr_jieqi, pan.curr_yuan, pan.is_yang, pan.ju_number
+            )
+        
+        year_gz, month_gz, day_gz, curr_jieqi, curr_yuan, is_yang, ju_number = state
+        hour_gz = GanzhiCalculator.get_hour_ganzhi(day_gz, input_dt.hour)
+        return ChartResult(Plate(
+            input_dt, year_gz, month_gz, day_gz, hour_gz, curr_jieqi, curr_yuan,
+            is_yang, ju_number, get_plate_template(is_yang, ju_number, hour_gz)
+        ))
+    
+    def _day_breaks(self, day: date) -> List[int]:
+        """
+        某日内可能改变干支、节气或局数的时刻（当日秒数，升序）
+        
+        包括当日的节气交接，以及23点前后两个日干支的符头日的节气交接（置闰法二至锚点）；
+        可查逐日历法索引时，再加上索引记录的失效时刻与交节时刻（索引与后端的节气时刻可能
+        相差不足求解精度的一秒，按两者共同的分界划分，时段内查表与实时计算的结果都不变）。
+        """
+        breaks = set(self.jieqi_seconds.get(day, ()))
+        day_gz = (day - GanzhiConstants.BASE_DATE).days % 60
+        for idx in (day_gz, (day_gz + 1) % 60):
+            futou_day = day - timedelta(days=FutouCalculator.TABLES['置闰'][idx][1])
+            breaks.update(self.jieqi_seconds.get(futou_day, ()))
+        
+        index = get_calendar_index() if self.backend.exact else None
+        row = index.lookup(day) if index else None
+        if row is not None:
+            breaks.update(
+                int(row[field]) for field in ('change', 'term_change')
+                if row[field] < CalendarIndexFormat.SECONDS_PER_DAY
+            )
+        return sorted(breaks)
+
+
+# 流式排盘的时间步长
+CHART_STEPS = {
+    'shichen': timedelta(hours=2),
+    'hour': timedelta(hours=1),
+    'day': timedelta(days=1),
+}
+
+
+def iter_charts(start: Union[str, datetime], end: Union[str, datetime],
+                step: Union[str, timedelta] = 'shichen', backend=None,
+                method: str = '置闰') -> Iterator[ChartResult]:
+    """
+    按固定步长逐个生成时间范围内的排盘结果（start <= 时间 < end，内存占用不随范围增长）
+    
+    时干支随步长推算；年月日干支、节气和局数每日每个时段（23点前后、交节前后）只计算一次，
+    跨年时才重新载入交节时刻。
+    
+    Args:
+        start: 起始时间（字符串或 datetime，同 QiMenDunjiaPan）
+        end: 结束时间（不含）
+        step: 步长："shichen"（两小时）、"hour"、"day"，或 timedelta
+        backend: 天文计算后端（实例或名称），默认 AstronomyConfig.BACKEND
+        method: 定局方法，"置闰" 或 "拆补"
+        
+    Yields:
+        ChartResult: 各时刻的排盘结果视图
+    """
+    if isinstance(step, str):
+        if step not in CHART_STEPS:
+            raise ValueError(f"无效的步长: {step}")
+        step = CHART_STEPS[step]
+    if step <= timedelta(0):
+        raise ValueError(f"无效的步长: {step}")
+    
+    current = QiMenDunjiaPan.parse_input(start)
+    end = QiMenDunjiaPan.parse_input(end)
+    batch = _ChartBatch(get_backend(backend), method)
+    
+    day = None
+    while current < end:
+        if current.date() != day:
+            batch.clear()
+            day = current.date()
+        yield batch.chart(current)
+        current += step
+
+
+# ============================================================================
+# 多进程批量排盘
+# ============================================================================
+
+# 工作进程返回的每盘字段（各占一字节）：年月日时干支、节气、三元、是否阳遁、局数
+_PARALLEL_FIELDS = ('year_gz', 'month_gz', 'day_gz', 'hour_gz', 'curr_jieqi', 'curr_yuan', 'is_yang', 'ju_number')
+
+
+def _parallel_chunk(task: Tuple[List[int], List[datetime], Optional[str], str]) -> Tuple[List[int], bytes]:
+    """工作进程：批量排一个分块（同一年份、按时间排序），返回输入序号及每盘8字节的干支、节气和局数"""
+    indexes, input_dts, backend, method = task
+    results = QiMenDunjiaPan.run_many(input_dts, backend=backend, method=method)
+    return indexes, bytes(
+        getattr(result.plate, name) for result in results for name in _PARALLEL_FIELDS
+    )
+
+
+def parallel_run(inputs: Iterable[Union[str, datetime]], workers: Optional[int] = None,
+                 chunksize: Optional[int] = None, ordered: bool = True, backend: Optional[str] = None,
+                 method: str = '置闰', start_method: Optional[str] = None):
+    """
+    多进程批量排盘
+    
+    输入按年份分组、组内按时间排序后切成分块，交给进程池中的工作进程用 run_many 排盘；
+    同一分块内的输入同年且相邻，工作进程的节气缓存和日内时段划分保持命中。
+    工作进程只由进程池的初始化函数 init_worker 初始化（加载节气表、日历索引及后端所需的星历，
+    并预先求解所涉年份的节气），父进程的配置与已加载的数据不受影响。
+    
+    ordered 为 False 时返回生成器：首次迭代时才创建进程池，迭代完毕或生成器关闭时终止工作进程；
+    提前停止迭代时应调用其 close()（或用 contextlib.closing 包装），以免工作进程一直运行到生成器被回收。
+    
+    Args:
+        inputs: 输入时间（字符串或 datetime，同 QiMenDunjiaPan）
+        workers: 工作进程数，默认 CPU 核数
+        chunksize: 每个分块的输入数，默认使每个工作进程约分到4个分块
+        ordered: True 时返回按输入顺序排列的结果列表；
+                 False 时返回迭代器，按分块完成的先后逐个给出 (输入序号, 结果)
+        backend: 天文计算后端名称，默认 AstronomyConfig.BACKEND
+        method: 定局方法，"置闰" 或 "拆补"
+        start_method: 进程启动方式（"fork"、"spawn" 等），默认 multiprocessing 的默认方式
+        
+    Returns:
+        list: ordered 为 True 时，各输入的排盘结果视图；
+        generator: ordered 为 False 时，(输入序号, 排盘结果视图) 的生成器
+    """
+    if method not in FutouCalculator.METHODS:
+        raise ValueError(f"无效的定局方法: {method}")
+    if backend is not None and not isinstance(backend, str):
+        raise ValueError("多进程排盘的 backend 须为后端名称")
+    
+    input_dts = [QiMenDunjiaPan.parse_input(value) for value in inputs]
+    
+    workers = workers or os.cpu_count() or 1
+    chunksize = chunksize or max(1, -(-len(input_dts) // (workers * 4)))
+    
+    # 按年份分组、组内按时间排序后切块
+    by_year = {}
+    for i, input_dt in enumerate(input_dts):
+        by_year.setdefault(input_dt.year, []).append(i)
+    tasks = []
+    for year in sorted(by_year):
+        indexes = sorted(by_year[year], key=input_dts.__getitem__)
+        for start in range(0, len(indexes), chunksize):
+            chunk = indexes[start:start + chunksize]
+            tasks.append((chunk, [input_dts[i] for i in chunk], backend, method))
+    
+    context = multiprocessing.get_context(start_method)
+    years = [year + offset for year in by_year for offset in (-1, 0, 1)]
+    initargs = (worker_config(), backend, years)
+    
+    width = len(_PARALLEL_FIELDS)
+    
+    def stream():
+        if not tasks:
+            return
+        pool = context.Pool(workers, initializer=init_worker, initargs=initargs)
+        try:
+            for indexes, codes in pool.imap_unordered(_parallel_chunk, tasks):
+                for k, i in enumerate(indexes):
+                    year_gz, month_gz, day_gz, hour_gz, curr_jieqi, curr_yuan, is_yang, ju_number = \
+                        codes[k * width:(k + 1) * width]
+                    yield i, ChartResult(Plate(
+                        input_dts[i], year_gz, month_gz, day_gz, hour_gz, curr_jieqi, curr_yuan,
+                        bool(is_yang), ju_number, get_plate_template(is_yang, ju_number, hour_gz)
+                    ))
+        finally:
+            # 迭代完毕、出错或提前关闭时立即终止并回收工作进程
+            pool.terminate()
+            pool.join()
+    
+    if not ordered:
+        return stream()
+    
+    results = [None] * len(input_dts)
+    for i, result in stream():
+        results[i] = result
+    return results
+
+
+# ============================================================================
+# 盘面模板
+# ============================================================================
+
+def _build_plate_template(is_yang: bool, ju_number: int, hour_gz: int) -> PlateTemplate:
+    """
+    按排盘流程生成一个盘面模板
+    
+    Args:
+        is_yang: 是否阳遁
+        ju_number: 局数（1-9）
+        hour_gz: 时干支的六十甲子序号
+        
+    Returns:
+        PlateTemplate: 盘面模板
+    """
+    pan = QiMenDunjiaPan.__new__(QiMenDunjiaPan)
+    pan.log_steps = False
+    pan._reset_plate()
+    pan.is_yang, pan.ju_number, pan.hour_gz = is_yang, ju_number, hour_gz
+    pan.arrange_earth_plate()
+    pan.arrange_sky_plate()
+    pan.arrange_doors()
+    pan.arrange_shen()
+    
+    return PlateTemplate.from_palaces(
+        pan.palaces, pan.xunshou_ganzhi, pan.xunshou_original_pos, pan.zhishi_pos, pan.zhishi_men
+    )
+
+
+# 盘面模板数：地盘、天盘九星、八门、八神只取决于 (阴阳遁, 局数, 时干支)，共 2×9×60 个
+PLATE_TEMPLATE_COUNT = 2 * 9 * 60
+
+# 盘面模板表（首次用到时逐个生成；模板只读，并发时重复生成的结果相同，无需加锁）
+_plate_templates: List[Optional[PlateTemplate]] = [None] * PLATE_TEMPLATE_COUNT
+
+
+def get_plate_template(is_yang: bool, ju_number: int, hour_gz: int) -> PlateTemplate:
+    """
+    获取盘面模板
+    
+    Args:
+        is_yang: 是否阳遁
+        ju_number: 局数（1-9）
+        hour_gz: 时干支的六十甲子序号
+        
+    Returns:
+        PlateTemplate: 盘面模板
+    """
+    index = (bool(is_yang) * 9 + ju_number - 1) * 60 + hour_gz
+    template = _plate_templates[index]
+    if template is None:
+        template = _plate_templates[index] = _build_plate_template(bool(is_yang), ju_number, hour_gz)
+    return template
 
 
 # ============================================================================
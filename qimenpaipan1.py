@@ -17,12 +17,12 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from functools import lru_cache
 from typing import Dict, List, Tuple, Optional
 from collections import deque
 import logging
 
-from skyfield.api import load
+from ephemeris import EphemerisProvider
+from jieqi_cache import single_flight
 
 # -----------------------------------------------------------------------------
 # logging
@@ -153,28 +153,27 @@ def _rotate(seq: List[str], steps: int) -> List[str]:
 
 
 # -----------------------------------------------------------------------------
-# 天文计算（带缓存）
+# 天文计算（带缓存：线程安全，同一参数并发未命中时只计算一次）
 # -----------------------------------------------------------------------------
-load.directory = AstronomyConfig.EPHEMERIS_DIR
-ts = load.timescale()
-eph = load(AstronomyConfig.EPHEMERIS_FILE)
+# 首次使用时加载（服务端可调用 ephemeris.preload() 预加载）
+ephemeris = EphemerisProvider(AstronomyConfig.EPHEMERIS_FILE, AstronomyConfig.EPHEMERIS_DIR)
 
 
 class Astronomy:
     @staticmethod
     def sun_longitude(t) -> float:
-        astro = eph["earth"].at(t).observe(eph["sun"])
+        astro = ephemeris.earth.at(t).observe(ephemeris.sun)
         _, lon, _ = astro.ecliptic_latlon()
         return lon.degrees % 360
 
     @staticmethod
-    @lru_cache(maxsize=256)
+    @single_flight(maxsize=256)
     def find_lichun(year: int) -> datetime:
-        start = ts.utc(year, 2, 1)
-        end   = ts.utc(year, 2, 15)
+        start = ephemeris.ts.utc(year, 2, 1)
+        end   = ephemeris.ts.utc(year, 2, 15)
         t0, t1 = start, end
         for _ in range(AstronomyConfig.BINARY_SEARCH_ITERATIONS):
-            tm = ts.tt_jd((t0.tt + t1.tt) / 2)
+            tm = ephemeris.ts.tt_jd((t0.tt + t1.tt) / 2)
             if Astronomy.sun_longitude(tm) >= AstronomyConfig.LICHUN_DEGREE:
                 t1 = tm
             else:
@@ -182,7 +181,7 @@ class Astronomy:
         return t1.utc_datetime()
 
     @staticmethod
-    @lru_cache(maxsize=4096)
+    @single_flight(maxsize=4096)
     def jieqi_time(year: int, target_degree: int) -> datetime:
         # 找到该黄经对应的“标称月份”，然后向前后各扩一个月做二分范围
         month = next((m for deg, m, _ in Jieqi.INFO if deg == target_degree), 1)
@@ -197,13 +196,13 @@ class Astronomy:
             end_month = 1
             end_year += 1
 
-        start = ts.utc(start_year, start_month, 1)
-        end   = ts.utc(end_year, end_month, 1)
+        start = ephemeris.ts.utc(start_year, start_month, 1)
+        end   = ephemeris.ts.utc(end_year, end_month, 1)
 
         t0, t1 = start, end
         target = target_degree % 360
         for _ in range(AstronomyConfig.BINARY_SEARCH_ITERATIONS):
-            tm = ts.tt_jd((t0.tt + t1.tt) / 2)
+            tm = ephemeris.ts.tt_jd((t0.tt + t1.tt) / 2)
             if Astronomy.sun_longitude(tm) >= target:
                 t1 = tm
             else:
@@ -211,7 +210,7 @@ class Astronomy:
         return t1.utc_datetime()
 
     @staticmethod
-    @lru_cache(maxsize=128)
+    @single_flight(maxsize=128)
     def solstices(year: int) -> Tuple[datetime, datetime]:
         summer = Astronomy.jieqi_time(year, 90)   # 夏至
         winter = Astronomy.jieqi_time(year, 270)  # 冬至
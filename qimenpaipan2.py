@@ -1,13 +1,10 @@
 # 奇门遁甲排盘
 from datetime import  datetime, timezone, timedelta
-from skyfield.api import load, Topos
-from skyfield.units import Angle
+from ephemeris import EphemerisProvider
 import bisect
 from collections import deque
-# 初始化天文数据
-load.directory = './'  # 从当前目录加载星历文件
-ts = load.timescale()
-eph = load('de421.bsp')
+# 天文数据（首次使用时从当前目录加载星历文件）
+ephemeris = EphemerisProvider('de421.bsp', './')
 tiangan = ['甲','乙','丙','丁','戊','己','庚','辛','壬','癸']
 dizhi = ['子','丑','寅','卯','辰','巳','午','未','申','酉','戌','亥']
 jieqi_info = [
@@ -106,18 +103,18 @@ jieqi_order = {name: idx for idx, (_, _, name) in enumerate(jieqi_info)}
 # 获取输入年份的立春准确时间
 def find_lichun(year):
     # 设置搜索范围（2月前后）
-    start = ts.utc(year, 2, 1)
-    end = ts.utc(year, 2, 15)
+    start = ephemeris.ts.utc(year, 2, 1)
+    end = ephemeris.ts.utc(year, 2, 15)
     
     # 定义黄经检测函数
     def sun_longitude(t):
-        astro = eph['earth'].at(t).observe(eph['sun'])
+        astro = ephemeris.earth.at(t).observe(ephemeris.sun)
         lat, lon, _ = astro.ecliptic_latlon()
         return lon.degrees
     # 二分法查找黄经315度的时刻
     t0, t1 = start, end
     for _ in range(20):  # 迭代20次达微秒精度
-        tm = ts.tt_jd((t0.tt + t1.tt) / 2)
+        tm = ephemeris.ts.tt_jd((t0.tt + t1.tt) / 2)
         if sun_longitude(tm) >= 315:
             t1 = tm
         else:
@@ -192,17 +189,17 @@ def get_jieqi_time(year, target_degree):
         end_year += 1
     
     # 创建时间范围（前后各扩展一个月）
-    start = ts.utc(start_year, start_month, 1)
-    end = ts.utc(end_year, end_month, 1)
+    start = ephemeris.ts.utc(start_year, start_month, 1)
+    end = ephemeris.ts.utc(end_year, end_month, 1)
 
     # 二分法查找
     def sun_longitude(t):
-        astro = eph['earth'].at(t).observe(eph['sun'])
+        astro = ephemeris.earth.at(t).observe(ephemeris.sun)
         return astro.ecliptic_latlon()[1].degrees % 360
 
     t0, t1 = start, end
     for _ in range(20):
-        tm = ts.tt_jd((t0.tt + t1.tt) / 2)
+        tm = ephemeris.ts.tt_jd((t0.tt + t1.tt) / 2)
         if sun_longitude(tm) >= target_degree % 360:
             t1 = tm
         else:
@@ -271,10 +268,10 @@ def get_day_houre_ganzhi(input_str):
 def get_solar_longitude(year, month, day, hour=0, minute=0, second=0):
     """根据输入时间获取太阳黄经度数"""
     # 创建时间对象
-    t = ts.utc(year, month, day, hour, minute, second)
+    t = ephemeris.ts.utc(year, month, day, hour, minute, second)
     # 获取天体位置
-    sun = eph['sun']
-    earth = eph['earth']
+    sun = ephemeris.sun
+    earth = ephemeris.earth
     astrometric = earth.at(t).observe(sun)
     # 转换黄道坐标系
     lat, lon, _ = astrometric.ecliptic_latlon(t)
@@ -14,7 +14,7 @@
 from datetime import datetime, timezone, timedelta
 from typing import Tuple, Dict, List, Optional
 from collections import deque
-from skyfield.api import load
+from ephemeris import EphemerisProvider
 import logging
 
 # ============================================================================
@@ -181,10 +181,8 @@ class QimenConstants:
 # 天文计算模块
 # ============================================================================
 
-# 初始化天文数据
-load.directory = AstronomyConfig.EPHEMERIS_DIR
-ts = load.timescale()
-eph = load(AstronomyConfig.EPHEMERIS_FILE)
+# 天文数据（首次使用时加载，服务端可调用 ephemeris.preload() 预加载）
+ephemeris = EphemerisProvider(AstronomyConfig.EPHEMERIS_FILE, AstronomyConfig.EPHEMERIS_DIR)
 
 
 class AstronomyCalculator:
@@ -201,7 +199,7 @@ class AstronomyCalculator:
         Returns:
             float: 太阳黄经度数
         """
-        astro = eph['earth'].at(t).observe(eph['sun'])
+        astro = ephemeris.earth.at(t).observe(ephemeris.sun)
         lat, lon, _ = astro.ecliptic_latlon()
         return lon.degrees
     
@@ -216,12 +214,12 @@ class AstronomyCalculator:
         Returns:
             datetime: 立春时间（UTC）
         """
-        start = ts.utc(year, 2, 1)
-        end = ts.utc(year, 2, 15)
+        start = ephemeris.ts.utc(year, 2, 1)
+        end = ephemeris.ts.utc(year, 2, 15)
         
         t0, t1 = start, end
         for _ in range(AstronomyConfig.BINARY_SEARCH_ITERATIONS):
-            tm = ts.tt_jd((t0.tt + t1.tt) / 2)
+            tm = ephemeris.ts.tt_jd((t0.tt + t1.tt) / 2)
             if AstronomyCalculator.get_sun_longitude(tm) >= AstronomyConfig.LICHUN_DEGREE:
                 t1 = tm
             else:
@@ -261,13 +259,13 @@ class AstronomyCalculator:
             end_month = 1
             end_year += 1
         
-        start = ts.utc(start_year, start_month, 1)
-        end = ts.utc(end_year, end_month, 1)
+        start = ephemeris.ts.utc(start_year, start_month, 1)
+        end = ephemeris.ts.utc(end_year, end_month, 1)
         
         # 二分法查找
         t0, t1 = start, end
         for _ in range(AstronomyConfig.BINARY_SEARCH_ITERATIONS):
-            tm = ts.tt_jd((t0.tt + t1.tt) / 2)
+            tm = ephemeris.ts.tt_jd((t0.tt + t1.tt) / 2)
             if AstronomyCalculator.get_sun_longitude(tm) % 360 >= target_degree % 360:
                 t1 = tm
             else:
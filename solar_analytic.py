@@ -0,0 +1,190 @@
+"""
+太阳黄经解析计算（无需星历文件）
+
+主要功能：
+1. 按 Meeus《天文算法》附录的截断 VSOP87 地球黄经级数计算太阳几何黄经（瞬时黄道、平春分点）
+2. 扣除岁差换算到 J2000 黄道，与 qimenpaipan 中星历计算的黄经基准一致
+3. 与 de421 星历比对，给出节气时刻的误差
+
+以 de421 为基准实测 1901-2050 年：黄经最大误差约 0.75 角秒，节气时刻最大误差约 16 秒、平均约 3 秒
+（python solar_analytic.py 1901 2050 重新测量）。截断级数的精度随年代远离 2000 年缓慢下降，
+可用于没有星历文件的环境或超出星历覆盖范围的年份；需要精确交节时刻时仍应使用星历。
+
+用法：
+    python solar_analytic.py 1900 2050
+
+作者：redrockhorse
+"""
+
+from typing import Tuple
+import argparse
+
+import numpy as np
+
+J2000_JD = 2451545.0  # J2000.0 儒略日
+DAYS_PER_MILLENNIUM = 365250.0
+ARCSEC = 1 / 3600  # 角秒（度）
+
+# 1901-2050 年与 de421 比对的节气时刻最大误差（秒）
+MAX_ERROR_SECONDS = 16.0
+
+# ============================================================================
+# 截断 VSOP87D 地球日心黄经级数：(A, B, C)，项值 A·cos(B + C·τ)，单位 1e-8 弧度，τ 为儒略千年数
+# ============================================================================
+
+EARTH_L0 = (
+    (175347046, 0, 0), (3341656, 4.6692568, 6283.0758500), (34894, 4.6261, 12566.1517),
+    (3497, 2.7441, 5753.3849), (3418, 2.8289, 3.5231), (3136, 3.6277, 77713.7715),
+    (2676, 4.4181, 7860.4194), (2343, 6.1352, 3930.2097), (1324, 0.7425, 11506.7698),
+    (1273, 2.0371, 529.6910), (1199, 1.1096, 1577.3435), (990, 5.233, 5884.927),
+    (902, 2.045, 26.298), (857, 3.508, 398.149), (780, 1.179, 5223.694),
+    (753, 2.533, 5507.553), (505, 4.583, 18849.228), (492, 4.205, 775.523),
+    (357, 2.920, 0.067), (317, 5.849, 11790.629), (284, 1.899, 796.298),
+    (271, 0.315, 10977.079), (243, 0.345, 5486.778), (206, 4.806, 2544.314),
+    (205, 1.869, 5573.143), (202, 2.458, 6069.777), (156, 0.833, 213.299),
+    (132, 3.411, 2942.463), (126, 1.083, 20.775), (115, 0.645, 0.980),
+    (103, 0.636, 4694.003), (102, 0.976, 15720.839), (102, 4.267, 7.114),
+    (99, 6.21, 2146.17), (98, 0.68, 155.42), (86, 5.98, 161000.69),
+    (85, 1.30, 6275.96), (85, 3.67, 71430.70), (80, 1.81, 17260.15),
+    (79, 3.04, 12036.46), (75, 1.76, 5088.63), (74, 3.50, 3154.69),
+    (74, 4.68, 801.82), (70, 0.83, 9437.76), (62, 3.98, 8827.39),
+    (61, 1.82, 7084.90), (57, 2.78, 6286.60), (56, 4.39, 14143.50),
+    (56, 3.47, 6279.55), (52, 0.19, 12139.55), (52, 1.33, 1748.02),
+    (51, 0.28, 5856.48), (49, 0.49, 1194.45), (41, 5.37, 8429.24),
+    (41, 2.40, 19651.05), (39, 6.17, 10447.39), (37, 6.04, 10213.29),
+    (37, 2.57, 1059.38), (36, 1.71, 2352.87), (36, 1.78, 6812.77),
+    (33, 0.59, 17789.85), (30, 0.44, 83996.85), (30, 2.74, 1349.87),
+    (25, 3.16, 4690.48),
+)
+
+EARTH_L1 = (
+    (628331966747, 0, 0), (206059, 2.678235, 6283.075850), (4303, 2.6351, 12566.1517),
+    (425, 1.590, 3.523), (119, 5.796, 26.298), (109, 2.966, 1577.344),
+    (93, 2.59, 18849.23), (72, 1.14, 529.69), (68, 1.87, 398.15),
+    (67, 4.41, 5507.55), (59, 2.89, 5223.69), (56, 2.17, 155.42),
+    (45, 0.40, 796.30), (36, 0.47, 775.52), (29, 2.65, 7.11),
+    (21, 5.34, 0.98), (19, 1.85, 5486.78), (19, 4.97, 213.30),
+    (17, 2.99, 6275.96), (16, 0.03, 2544.31), (16, 1.43, 2146.17),
+    (15, 1.21, 10977.08), (12, 2.83, 1748.02), (12, 3.26, 5088.63),
+    (12, 5.27, 1194.45), (12, 2.08, 4694.00), (11, 0.77, 553.57),
+    (10, 1.30, 6286.60), (10, 4.24, 1349.87), (9, 2.70, 242.73),
+    (9, 5.64, 951.72), (8, 5.30, 2352.87), (6, 2.65, 9437.76),
+    (6, 4.67, 4690.48),
+)
+
+EARTH_L2 = (
+    (52919, 0, 0), (8720, 1.0721, 6283.0758), (309, 0.867, 12566.152),
+    (27, 0.05, 3.52), (16, 5.19, 26.30), (16, 3.68, 155.42),
+    (10, 0.76, 18849.23), (9, 2.06, 77713.77), (7, 0.83, 775.52),
+    (5, 4.66, 1577.34), (4, 1.03, 7.11), (4, 3.44, 5573.14),
+    (3, 5.14, 796.30), (3, 6.05, 5507.55), (3, 1.19, 242.73),
+    (3, 6.12, 529.69), (3, 0.31, 398.15), (3, 2.28, 553.57),
+    (2, 4.38, 5223.69), (2, 3.75, 0.98),
+)
+
+EARTH_L3 = (
+    (289, 5.844, 6283.076), (35, 0, 0), (17, 5.49, 12566.15),
+    (3, 5.20, 155.42), (1, 4.72, 3.52), (1, 5.30, 18849.23),
+    (1, 5.97, 242.73),
+)
+
+EARTH_L4 = (
+    (114, 3.142, 0), (8, 4.13, 6283.08), (1, 3.84, 12566.15),
+)
+
+EARTH_L5 = (
+    (1, 3.14, 0),
+)
+
+EARTH_L = (EARTH_L0, EARTH_L1, EARTH_L2, EARTH_L3, EARTH_L4, EARTH_L5)
+
+
+def julian_millennia(tt) -> np.ndarray:
+    """
+    计算自 J2000.0 起的儒略千年数
+
+    Args:
+        tt: TT儒略日（标量或数组）
+
+    Returns:
+        np.ndarray: 儒略千年数
+    """
+    return (np.asarray(tt, dtype=float) - J2000_JD) / DAYS_PER_MILLENNIUM
+
+
+def _series(terms, tau: np.ndarray) -> np.ndarray:
+    """计算一组 VSOP87 级数 ΣA·cos(B + C·τ)"""
+    a, b, c = np.array(terms, dtype=float).T
+    return np.cos(b + c * tau[..., None]) @ a
+
+
+def sun_longitude(tt) -> np.ndarray:
+    """
+    计算太阳几何黄经（J2000黄道，不含光行差、章动）
+
+    Args:
+        tt: TT儒略日（标量或数组）
+
+    Returns:
+        np.ndarray: 太阳黄经度数 [0, 360)
+    """
+    tau = julian_millennia(tt)
+
+    # 地球日心黄经（瞬时黄道、平春分点）
+    earth_longitude = sum(
+        _series(terms, tau) * tau ** power for power, terms in enumerate(EARTH_L)
+    ) / 1e8
+
+    # 地心太阳黄经，换算到 FK5 基准
+    t = tau * 10
+    longitude = np.degrees(earth_longitude) + 180 - 0.09033 * ARCSEC
+
+    # 扣除黄经总岁差，换算到 J2000 黄道
+    precession = (5029.0966 * t + 1.11113 * t ** 2 - 0.000006 * t ** 3) * ARCSEC
+
+    return (longitude - precession) % 360
+
+
+# ============================================================================
+# 与星历比对
+# ============================================================================
+
+def validate_against_ephemeris(start_year: int, end_year: int) -> Tuple[float, float, float]:
+    """
+    与星历后端比对指定年份范围内的全部节气时刻
+
+    Args:
+        start_year: 起始年份（含）
+        end_year: 结束年份（含）
+
+    Returns:
+        tuple: (黄经最大误差（角秒）, 节气时刻最大误差（秒）, 节气时刻平均误差（秒）)
+    """
+    from qimenpaipan import AnalyticBackend, SkyfieldBackend
+
+    years = list(range(start_year, end_year + 1))
+    reference, _ = SkyfieldBackend().jieqi_instants(years)
+    analytic, _ = AnalyticBackend().jieqi_instants(years)
+    errors = np.array([abs((a - r).total_seconds()) for a, r in zip(analytic, reference)])
+
+    # 黄经误差：按1日步长采样
+    tt = np.arange(_year_start_jd(start_year), _year_start_jd(end_year + 1), 1.0)
+    longitude_error = (sun_longitude(tt) - SkyfieldBackend().sun_longitude(tt) + 180) % 360 - 180
+
+    return float(np.abs(longitude_error).max() / ARCSEC), float(errors.max()), float(errors.mean())
+
+
+def _year_start_jd(year: int) -> float:
+    """指定年份1月1日0时的儒略日"""
+    return float(np.datetime64(f'{year:04d}-01-01', 'D').astype(float)) + 2440587.5
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='与星历比对解析太阳黄经的节气时刻误差')
+    parser.add_argument('start_year', type=int, help='起始年份（含）')
+    parser.add_argument('end_year', type=int, help='结束年份（含）')
+    args = parser.parse_args()
+
+    longitude_error, max_error, mean_error = validate_against_ephemeris(args.start_year, args.end_year)
+    print(f"{args.start_year}-{args.end_year}: 黄经最大误差 {longitude_error:.2f}″，"
+          f"节气时刻最大误差 {max_error:.1f} 秒，平均误差 {mean_error:.1f} 秒")
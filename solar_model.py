@@ -0,0 +1,241 @@
+"""
+分段切比雪夫多项式太阳黄经模型
+
+主要功能：
+1. 将星历给出的太阳黄经按固定天数分段（默认32日），每段拟合一组切比雪夫多项式
+2. 纯 NumPy 计算任意时刻的太阳黄经及其变化率，不再调用星历
+3. 基于多项式导数的牛顿法求节气时刻
+
+拟合时在各段中点之间的检验点上与星历比对，实测最大误差记录在模型中（max_error_degrees），
+拟合所用的星历文件名一并记录（ephemeris），加载方据此判断模型是否与当前星历一致。
+以 de421、32日分段、13阶多项式拟合 1901-2050 年，最大误差约 8e-7 度（节气时刻误差约 0.07 秒）。
+
+用法：
+    python solar_model.py 1900 2050 -o solar_model.npz
+
+作者：redrockhorse
+"""
+
+from typing import Callable, Tuple
+import argparse
+import os
+
+import numpy as np
+from numpy.polynomial import chebyshev
+
+
+class SolarLongitudeModel:
+    """分段切比雪夫多项式太阳黄经模型（时间均为TT儒略日）"""
+
+    SEGMENT_DAYS = 32  # 默认分段天数
+    DEGREE = 13  # 默认多项式阶数
+    SUN_MIN_SPEED = 0.95  # 太阳最小视角速度（度/日），用于将黄经误差换算为时刻误差
+
+    def __init__(self, start_tt: float, segment_days: float, coefficients: np.ndarray,
+                 max_error_degrees: float = float('nan'), ephemeris: str = ''):
+        """
+        初始化模型
+
+        Args:
+            start_tt: 首段起点（TT儒略日）
+            segment_days: 分段天数
+            coefficients: 各段切比雪夫系数，形状 (段数, 阶数+1)，拟合对象为连续展开（未取模）的黄经
+            max_error_degrees: 拟合检验的最大误差（度）
+            ephemeris: 拟合所用的星历文件名（未知时为空）
+        """
+        self.start_tt = float(start_tt)
+        self.segment_days = float(segment_days)
+        self.coefficients = np.asarray(coefficients, dtype=float)
+        self.derivative_coefficients = chebyshev.chebder(self.coefficients, axis=1) * (2 / self.segment_days)
+        self.max_error_degrees = float(max_error_degrees)
+        self.ephemeris = str(ephemeris)
+
+    @property
+    def end_tt(self) -> float:
+        """末段终点（TT儒略日）"""
+        return self.start_tt + self.segment_days * len(self.coefficients)
+
+    @property
+    def max_error_seconds(self) -> float:
+        """拟合最大误差对应的节气时刻误差（秒）"""
+        return self.max_error_degrees / self.SUN_MIN_SPEED * 86400
+
+    def covers(self, tt) -> bool:
+        """判断时刻是否全部在模型范围内"""
+        tt = np.asarray(tt, dtype=float)
+        return bool(np.all((tt >= self.start_tt) & (tt < self.end_tt)))
+
+    # ========================================================================
+    # 拟合与存取
+    # ========================================================================
+
+    @classmethod
+    def fit(cls, start_tt: float, end_tt: float, longitude_func: Callable[[np.ndarray], np.ndarray],
+            segment_days: float = SEGMENT_DAYS, degree: int = DEGREE) -> 'SolarLongitudeModel':
+        """
+        拟合模型：所有段的节点一次性交给 longitude_func 计算
+
+        Args:
+            start_tt: 起始时刻（TT儒略日）
+            end_tt: 结束时刻（TT儒略日）
+            longitude_func: 太阳黄经函数，输入TT儒略日数组，返回黄经度数数组
+            segment_days: 分段天数
+            degree: 多项式阶数
+
+        Returns:
+            SolarLongitudeModel: 拟合好的模型（已记录最大误差）
+        """
+        segment_count = int(np.ceil((end_tt - start_tt) / segment_days))
+        segment_starts = start_tt + segment_days * np.arange(segment_count)
+
+        # 切比雪夫节点
+        node_count = degree + 1
+        nodes = np.cos(np.pi * (np.arange(node_count) + 0.5) / node_count)
+        node_tt = segment_starts[:, None] + (nodes + 1) / 2 * segment_days
+        values = np.unwrap(longitude_func(node_tt.ravel()).reshape(node_tt.shape), period=360, axis=1)
+        coefficients = chebyshev.chebfit(nodes, values.T, degree).T
+
+        model = cls(start_tt, segment_days, coefficients)
+
+        # 检验：相邻节点之间的中点
+        check_x = (nodes[:-1] + nodes[1:]) / 2
+        check_tt = (segment_starts[:, None] + (check_x + 1) / 2 * segment_days).ravel()
+        error = (model.longitude(check_tt) - longitude_func(check_tt) + 180) % 360 - 180
+        model.max_error_degrees = float(np.abs(error).max())
+
+        return model
+
+    @classmethod
+    def load(cls, path: str) -> 'SolarLongitudeModel':
+        """从 .npz 文件加载模型（早期文件未记录星历时 ephemeris 为空）"""
+        with np.load(path) as data:
+            return cls(
+                float(data['start_tt']), float(data['segment_days']),
+                data['coefficients'], float(data['max_error_degrees']),
+                str(data['ephemeris']) if 'ephemeris' in data.files else ''
+            )
+
+    def save(self, path: str):
+        """将模型写入 .npz 文件"""
+        np.savez(
+            path, start_tt=self.start_tt, segment_days=self.segment_days,
+            coefficients=self.coefficients, max_error_degrees=self.max_error_degrees,
+            ephemeris=np.str_(self.ephemeris)
+        )
+
+    # ========================================================================
+    # 计算
+    # ========================================================================
+
+    def longitude(self, tt) -> np.ndarray:
+        """
+        计算太阳黄经
+
+        Args:
+            tt: TT儒略日（标量或数组）
+
+        Returns:
+            np.ndarray: 太阳黄经度数 [0, 360)
+        """
+        return self._evaluate(self.coefficients, tt) % 360
+
+    def speed(self, tt) -> np.ndarray:
+        """
+        计算太阳黄经变化率
+
+        Args:
+            tt: TT儒略日（标量或数组）
+
+        Returns:
+            np.ndarray: 角速度（度/日）
+        """
+        return self._evaluate(self.derivative_coefficients, tt)
+
+    def solve(self, target_degrees, guess_tt, tolerance_seconds: float = 0.5,
+              max_iterations: int = 20) -> Tuple[np.ndarray, int]:
+        """
+        牛顿法求太阳黄经到达目标度数的时刻（使用多项式导数，不调用星历）
+
+        Args:
+            target_degrees: 目标黄经度数（标量或数组）
+            guess_tt: 初始猜测时刻（TT儒略日，标量或数组）
+            tolerance_seconds: 精度（秒）
+            max_iterations: 最大迭代次数
+
+        Returns:
+            tuple: (各目标的TT儒略日数组, 迭代次数)
+        """
+        tolerance_days = tolerance_seconds / 86400
+        target_degrees = np.asarray(target_degrees, dtype=float)
+        t = np.broadcast_to(np.asarray(guess_tt, dtype=float), target_degrees.shape).copy()
+
+        for iteration in range(1, max_iterations + 1):
+            offset = (self.longitude(t) - target_degrees + 180) % 360 - 180
+            step = -offset / self.speed(t)
+            t = t + step
+            if np.all(np.abs(step) <= tolerance_days):
+                return t, iteration
+
+        raise ValueError(f"太阳黄经求解未收敛：{max_iterations}次迭代后误差超过{tolerance_seconds}秒")
+
+    # ========================================================================
+    # 辅助方法
+    # ========================================================================
+
+    def _evaluate(self, coefficients: np.ndarray, tt) -> np.ndarray:
+        """按时刻所在分段计算切比雪夫级数（Clenshaw递推）"""
+        tt = np.asarray(tt, dtype=float)
+        if not self.covers(tt):
+            raise ValueError(f"时刻超出模型范围 JD {self.start_tt:.1f} - {self.end_tt:.1f}")
+
+        index, offset = np.divmod(tt - self.start_tt, self.segment_days)
+        c = coefficients[index.astype(int)]
+        x = 2 * offset / self.segment_days - 1
+
+        b1 = b2 = np.zeros_like(x)
+        for k in range(c.shape[-1] - 1, 0, -1):
+            b1, b2 = 2 * x * b1 - b2 + c[..., k], b1
+        return x * b1 - b2 + c[..., 0]
+
+
+def fit_solar_model(start_year: int, end_year: int, segment_days: float = SolarLongitudeModel.SEGMENT_DAYS,
+                    degree: int = SolarLongitudeModel.DEGREE) -> SolarLongitudeModel:
+    """
+    用星历拟合指定年份范围（含前后各一个月余量）的太阳黄经模型
+
+    Args:
+        start_year: 起始年份（含）
+        end_year: 结束年份（含）
+        segment_days: 分段天数
+        degree: 多项式阶数
+
+    Returns:
+        SolarLongitudeModel: 拟合好的模型（记录当前星历文件名）
+    """
+    from qimenpaipan import AstronomyCalculator, AstronomyConfig, ephemeris
+
+    ts = ephemeris.ts
+    start_tt = ts.utc(start_year - 1, 12, 1).tt
+    end_tt = ts.utc(end_year + 1, 2, 1).tt
+
+    def longitude_func(tt: np.ndarray) -> np.ndarray:
+        return AstronomyCalculator.get_sun_longitude(ts.tt_jd(tt))
+
+    model = SolarLongitudeModel.fit(start_tt, end_tt, longitude_func, segment_days, degree)
+    model.ephemeris = os.path.basename(AstronomyConfig.EPHEMERIS_FILE)
+    return model
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='拟合分段切比雪夫太阳黄经模型')
+    parser.add_argument('start_year', type=int, help='起始年份（含）')
+    parser.add_argument('end_year', type=int, help='结束年份（含）')
+    parser.add_argument('-o', '--output', default='solar_model.npz', help='输出文件路径')
+    parser.add_argument('--segment-days', type=float, default=SolarLongitudeModel.SEGMENT_DAYS, help='分段天数')
+    parser.add_argument('--degree', type=int, default=SolarLongitudeModel.DEGREE, help='多项式阶数')
+    args = parser.parse_args()
+
+    model = fit_solar_model(args.start_year, args.end_year, args.segment_days, args.degree)
+    model.save(args.output)
+    print(f"太阳黄经模型已写入 {args.output}: {model.ephemeris}，{len(model.coefficients)} 段，"
+          f"最大误差 {model.max_error_degrees:.2e}° (约 {model.max_error_seconds:.4f} 秒)")
@@ -0,0 +1,93 @@
+"""
+测试公共配置
+
+测试在仓库根目录运行（星历、节气表、日历索引按 AstronomyConfig.EPHEMERIS_DIR 查找）：
+    python -m pytest tests
+
+需要星历文件的测试标记为 requires_ephemeris，文件不存在时跳过（否则 skyfield 会尝试联网下载）。
+"""
+
+from collections import namedtuple
+from datetime import datetime, timedelta
+from typing import List, Optional
+import logging
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import qimenpaipan  # noqa: E402
+from qimenpaipan import AstronomyConfig, QiMenDunjiaPan  # noqa: E402
+
+EPHEMERIS_PATH = os.path.join(AstronomyConfig.EPHEMERIS_DIR, AstronomyConfig.EPHEMERIS_FILE)
+
+requires_ephemeris = pytest.mark.skipif(
+    not os.path.exists(EPHEMERIS_PATH), reason=f"星历文件 {EPHEMERIS_PATH} 不存在"
+)
+
+METHODS = ('置闰', '拆补')
+BACKENDS = ('table', 'skyfield')
+
+# 交节边界用例覆盖的年份（含节气表内外、置闰与拆补结果不同的年份）
+BOUNDARY_YEARS = list(range(1970, 1982)) + [1991, 2024]
+
+# 交节边界用例：定局方法、后端、输入时间及逐个 run() 的结果
+BoundaryCase = namedtuple('BoundaryCase', ['method', 'backend', 'times', 'expected'])
+
+
+@pytest.fixture(autouse=True)
+def quiet_logging():
+    """排盘逐步日志在测试中关闭"""
+    logging.disable(logging.INFO)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+def jieqi_boundary_times(years: List[int]) -> List[datetime]:
+    """
+    交节前后的输入时间：交节时刻前后几秒、其后一小时、当日23点前后及次日0点
+
+    Args:
+        years: 年份列表
+
+    Returns:
+        list: 无时区的UTC时间（精确到秒）
+    """
+    if not os.path.exists(EPHEMERIS_PATH):
+        pytest.skip(f"星历文件 {EPHEMERIS_PATH} 不存在")
+    times = []
+    for instant in qimenpaipan.SkyfieldBackend().jieqi_instants(years)[0]:
+        instant = instant.replace(tzinfo=None, microsecond=0)
+        day = instant.replace(hour=0, minute=0, second=0)
+        times += [instant + timedelta(seconds=offset) for offset in (-1, 0, 1, 2, 3600)]
+        times += [day + timedelta(hours=22, minutes=59, seconds=59), day + timedelta(hours=23), day + timedelta(days=1)]
+    return times
+
+
+def chart_key(result) -> dict:
+    """排盘结果的完整字典（用于比较）"""
+    return result.to_dict()
+
+
+def expected_charts(times, method: str = '置闰', backend: Optional[str] = None) -> List[dict]:
+    """逐个 run() 的排盘结果（chart_key）"""
+    return [chart_key(QiMenDunjiaPan(t, backend=backend, method=method).run()) for t in times]
+
+
+def assert_matches_run(results, times, method: str = '置闰', backend: Optional[str] = None):
+    """结果须与逐个 run() 一致（数量、顺序及每盘内容）"""
+    results = [chart_key(result) for result in results]
+    assert len(results) == len(times)
+    for t, result, expected in zip(times, results, expected_charts(times, method, backend)):
+        assert result == expected, t
+
+
+@pytest.fixture(scope='session', params=[(method, backend) for method in METHODS for backend in BACKENDS],
+                ids=lambda param: '-'.join(param))
+def boundary_case(request) -> BoundaryCase:
+    """交节前后的输入及逐个 run() 的结果（按定局方法 × 后端参数化，每个会话只计算一次）"""
+    method, backend = request.param
+    times = jieqi_boundary_times(BOUNDARY_YEARS)
+    return BoundaryCase(method, backend, times, expected_charts(times, method, backend))
@@ -0,0 +1,24 @@
+"""批量排盘：run_many 的结果须与逐个 run() 一致（重点覆盖交节前后的时段划分）"""
+
+import pytest
+
+from qimenpaipan import QiMenDunjiaPan
+from conftest import METHODS, assert_matches_run, chart_key, jieqi_boundary_times, requires_ephemeris
+
+pytestmark = requires_ephemeris
+
+
+def test_run_many_matches_run_at_jieqi_boundaries(boundary_case):
+    results = QiMenDunjiaPan.run_many(boundary_case.times, backend=boundary_case.backend, method=boundary_case.method)
+    assert [chart_key(result) for result in results] == boundary_case.expected
+
+
+@pytest.mark.parametrize('method', METHODS)
+def test_run_many_does_not_depend_on_input_order(method):
+    times = jieqi_boundary_times([2024])[::-1]
+    assert_matches_run(QiMenDunjiaPan.run_many(times, method=method), times, method)
+
+
+def test_run_many_segment_starting_on_jieqi_second():
+    times = ['1991-07-07 11:52:19', '1991-07-07 11:52:20', '1991-07-07 12:52:19', '1991-07-07 22:00:00']
+    assert_matches_run(QiMenDunjiaPan.run_many(times), times)
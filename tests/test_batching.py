@@ -0,0 +1,40 @@
+"""合批后端：并发提交的黄经计算合并为一批，各调用按自身输入形状取回结果"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from qimenpaipan import AnalyticBackend, BatchingBackend
+
+TT = 2451545.0
+
+
+def test_mixed_shapes_in_one_batch():
+    reference = AnalyticBackend()
+    backend = BatchingBackend(reference, window_seconds=0.2, max_items=10000)
+    inputs = [
+        TT + np.arange(12.0).reshape(3, 4),
+        TT + 100 + np.arange(5.0),
+        np.float64(TT + 200),
+        TT + 300 + np.arange(8.0).reshape(2, 2, 2),
+    ]
+    barrier = threading.Barrier(len(inputs))
+
+    def task(tt):
+        barrier.wait()
+        return backend.sun_longitude(tt)
+
+    with ThreadPoolExecutor(max_workers=len(inputs)) as executor:
+        results = list(executor.map(task, inputs))
+
+    assert backend.longitude_batcher.batches == 1
+    for tt, result in zip(inputs, results):
+        assert np.shape(result) == np.shape(tt)
+        np.testing.assert_allclose(result, reference.sun_longitude(tt), rtol=0, atol=1e-9)
+
+
+def test_single_multidimensional_call():
+    tt = TT + np.arange(6.0).reshape(2, 3)
+    result = BatchingBackend(AnalyticBackend(), window_seconds=0).sun_longitude(tt)
+    np.testing.assert_allclose(result, AnalyticBackend().sun_longitude(tt), rtol=0, atol=1e-9)
@@ -0,0 +1,25 @@
+"""排盘结果视图：to_dict() 每次生成新字典，修改它不影响视图缓存的字段"""
+
+import copy
+
+from qimenpaipan import QiMenDunjiaPan
+from conftest import requires_ephemeris
+
+pytestmark = requires_ephemeris
+
+
+def test_mutating_to_dict_leaves_result_intact():
+    result = QiMenDunjiaPan('2024-11-19 20:00:00').run()
+    palaces = result['palaces']  # 先读取，使视图缓存该字段
+    original = copy.deepcopy(result.to_dict())
+
+    mutated = result.to_dict()
+    mutated['ganzhi']['hour'] = None
+    mutated['palaces'][1]['天盘'] = None
+    mutated['men_po'].append(0)
+    mutated['palaces'].clear()
+
+    assert result['palaces'] is palaces
+    assert dict(result) == original
+    assert result.to_dict() == original
+    assert result.plate.to_dict() == original
@@ -0,0 +1,142 @@
+"""排盘服务：GET /chart、POST /charts 的请求与响应约定、长连接及请求上限"""
+
+from urllib.parse import quote
+import asyncio
+import http.client
+import json
+
+import pytest
+
+import qimenpaipan
+from chart_server import ChartServer, ChartServerConfig
+from conftest import expected_charts, requires_ephemeris
+
+TIMES = ['2024-11-19 20:00:00', '1991-07-07 11:52:19', '1991-07-07 11:52:20', '2024-02-04 23:30:00']
+
+
+def serve(check, **options):
+    """在本机任意端口启动服务，在线程中运行 check(connection)，结束后关闭服务"""
+    async def main():
+        service = ChartServer(**options)
+        await service.start(port=0)
+
+        def run_check():
+            connection = http.client.HTTPConnection('127.0.0.1', service.address[1])
+            try:
+                return check(connection)
+            finally:
+                connection.close()
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(None, run_check)
+        finally:
+            await service.close()
+
+    return asyncio.run(main())
+
+
+def request(connection, verb, path, body=None, headers=None):
+    """发送请求，返回 (状态码, 响应头, 解码后的 JSON)"""
+    connection.request(verb, path, body, headers or {})
+    response = connection.getresponse()
+    return response.status, response, json.loads(response.read())
+
+
+def as_json(charts):
+    """经 JSON 编解码的排盘结果（与服务响应可直接比较）"""
+    return json.loads(json.dumps(charts, ensure_ascii=False))
+
+
+@requires_ephemeris
+@pytest.mark.parametrize('method', ('置闰', '拆补'))
+def test_responses_are_run_results_over_one_connection(method):
+    expected = as_json(expected_charts(TIMES, method))
+
+    def check(connection):
+        # 同一长连接上依次发送单盘与批量请求
+        for t, chart in zip(TIMES, expected):
+            status, response, payload = request(connection, 'GET', f"/chart?t={quote(t)}&method={quote(method)}")
+            assert status == 200
+            assert response.getheader('Content-Type') == 'application/json; charset=utf-8'
+            assert payload == chart
+
+        status, _, payload = request(connection, 'POST', '/charts', json.dumps({'times': TIMES, 'method': method}))
+        assert status == 200
+        assert payload == expected
+
+    serve(check)
+
+
+@requires_ephemeris
+def test_default_method_and_empty_batch():
+    expected = as_json(expected_charts(TIMES[:1], '拆补'))[0]
+
+    def check(connection):
+        status, _, payload = request(connection, 'GET', f"/chart?t={quote(TIMES[0])}")
+        assert (status, payload) == (200, expected)
+        status, _, payload = request(connection, 'POST', '/charts', '{"times": []}')
+        assert (status, payload) == (200, [])
+
+    serve(check, method='拆补')
+
+
+@requires_ephemeris
+def test_invalid_requests():
+    def check(connection):
+        cases = [
+            ('GET', '/chart?t=bad', None, 400),
+            ('GET', '/chart', None, 400),
+            ('GET', '/chart?t=2024-11-19+20:00:00&method=x', None, 400),
+            ('POST', '/chart', None, 405),
+            ('GET', '/charts', None, 405),
+            ('POST', '/charts', 'not json', 400),
+            ('POST', '/charts', '{"times": [1]}', 400),
+            ('POST', '/charts', '{"times": ["2024-11-19 20:00:00"], "method": "x"}', 400),
+            ('GET', '/unknown', None, 404),
+        ]
+        for verb, path, body, status in cases:
+            code, _, payload = request(connection, verb, path, body)
+            assert code == status, (verb, path)
+            assert 'error' in payload
+
+    serve(check)
+
+
+@requires_ephemeris
+def test_batch_and_body_limits(monkeypatch):
+    monkeypatch.setattr(ChartServerConfig, 'MAX_BATCH', 2)
+    monkeypatch.setattr(ChartServerConfig, 'MAX_BODY_BYTES', 256)
+
+    def check(connection):
+        status, _, _ = request(connection, 'POST', '/charts', json.dumps({'times': TIMES[:3]}))
+        assert status == 413
+
+        # 声明的请求体过大时不读取请求体，返回 400 并关闭连接
+        connection.putrequest('POST', '/charts')
+        connection.putheader('Content-Length', str(ChartServerConfig.MAX_BODY_BYTES + 1))
+        connection.endheaders()
+        response = connection.getresponse()
+        assert response.status == 400
+        assert response.getheader('Connection') == 'close'
+        assert 'error' in json.loads(response.read())
+
+    serve(check)
+
+
+@requires_ephemeris
+def test_connection_close_is_honoured():
+    def check(connection):
+        _, response, _ = request(connection, 'GET', f"/chart?t={quote(TIMES[0])}", headers={'Connection': 'close'})
+        assert response.getheader('Connection') == 'close'
+
+    serve(check)
+
+
+def test_start_does_not_load_ephemeris_when_table_covers(monkeypatch):
+    if qimenpaipan.get_jieqi_table() is None:
+        pytest.skip("节气表不存在")
+
+    preloads = []
+    monkeypatch.setattr(qimenpaipan.ephemeris, 'preload', lambda: preloads.append(True))
+    serve(lambda connection: None, backend='table')
+    assert preloads == []
@@ -0,0 +1,66 @@
+"""流式排盘：iter_charts 惰性生成，按步长取 [start, end) 内的时刻，结果与逐个 run() 一致"""
+
+from datetime import datetime, timedelta
+from itertools import islice
+
+import pytest
+
+import qimenpaipan
+from qimenpaipan import iter_charts
+from conftest import METHODS, assert_matches_run, requires_ephemeris
+
+START = datetime(2024, 11, 19, 20, 0, 0)
+
+
+def input_times(results):
+    return [result.plate.input_dt for result in results]
+
+
+@requires_ephemeris
+def test_charts_are_computed_on_demand(monkeypatch):
+    calls = []
+    chart = qimenpaipan._ChartBatch.chart
+
+    def counted(self, input_dt):
+        calls.append(input_dt)
+        return chart(self, input_dt)
+
+    monkeypatch.setattr(qimenpaipan._ChartBatch, 'chart', counted)
+
+    charts = iter_charts(START, datetime(9000, 1, 1), 'hour')
+    assert calls == []
+    assert input_times(islice(charts, 3)) == [START + timedelta(hours=i) for i in range(3)]
+    assert len(calls) == 3
+
+
+@requires_ephemeris
+@pytest.mark.parametrize('step, delta', [
+    ('shichen', timedelta(hours=2)),
+    ('hour', timedelta(hours=1)),
+    ('day', timedelta(days=1)),
+    (timedelta(minutes=25), timedelta(minutes=25)),
+])
+def test_step_and_exclusive_end(step, delta):
+    end = START + delta * 5
+    assert input_times(iter_charts(START, end, step)) == [START + delta * i for i in range(5)]
+    assert input_times(iter_charts(START, end + timedelta(seconds=1), step))[-1] == end
+
+
+def test_empty_range():
+    assert list(iter_charts(START, START)) == []
+    assert list(iter_charts(START, START - timedelta(hours=1))) == []
+
+
+@pytest.mark.parametrize('step', ['week', timedelta(0), timedelta(hours=-1)])
+def test_invalid_step(step):
+    with pytest.raises(ValueError):
+        next(iter_charts(START, START + timedelta(days=1), step))
+
+
+@requires_ephemeris
+@pytest.mark.parametrize('method', METHODS)
+def test_stream_across_days_from_jieqi_second(method):
+    # 起点恰为交节那一秒，跨越多个 23 点与日界（每日重新划分时段）
+    start = datetime(1991, 7, 7, 11, 52, 19)
+    results = list(iter_charts(start, start + timedelta(days=3), 'hour', method=method))
+    assert_matches_run(results, input_times(results), method)
@@ -0,0 +1,75 @@
+"""多进程批量排盘：parallel_run 按输入顺序返回（或按完成先后流式给出）各输入的结果"""
+
+import multiprocessing
+import os
+import pickle
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+import qimenpaipan
+from qimenpaipan import QiMenDunjiaPan, parallel_run, worker_config
+from conftest import assert_matches_run, chart_key, requires_ephemeris
+
+pytestmark = requires_ephemeris
+
+START_METHODS = [method for method in ('fork', 'spawn') if method in multiprocessing.get_all_start_methods()]
+
+
+@pytest.fixture(scope='module')
+def shuffled_times():
+    """跨多个年份、顺序打乱的输入（分块按年份分组并排序，结果须还原为输入顺序）"""
+    times = [datetime(year, 1, 1) + timedelta(hours=37 * i) for year in (1980, 2024, 2051) for i in range(40)]
+    random.Random(0).shuffle(times)
+    return times
+
+
+@pytest.mark.parametrize('start_method', START_METHODS)
+def test_ordered_results_follow_input_order(shuffled_times, start_method):
+    results = parallel_run(shuffled_times, workers=2, chunksize=7, start_method=start_method)
+    assert_matches_run(results, shuffled_times)
+
+
+@pytest.mark.parametrize('start_method', START_METHODS)
+def test_unordered_stream_yields_every_input_once(shuffled_times, start_method):
+    streamed = list(parallel_run(shuffled_times, workers=2, chunksize=7, ordered=False, start_method=start_method))
+    assert sorted(i for i, _ in streamed) == list(range(len(shuffled_times)))
+
+    results = dict(streamed)
+    assert_matches_run([results[i] for i in range(len(shuffled_times))], shuffled_times)
+
+
+@pytest.mark.parametrize('start_method', START_METHODS)
+def test_closing_stream_early_stops_workers(shuffled_times, start_method):
+    stream = parallel_run(shuffled_times, workers=2, chunksize=1, ordered=False, start_method=start_method)
+    assert multiprocessing.active_children() == []  # 首次迭代前不创建进程池
+
+    next(stream)
+    workers = multiprocessing.active_children()
+    assert workers
+    stream.close()
+    assert not any(worker.is_alive() for worker in workers)
+
+
+@pytest.mark.parametrize('start_method', START_METHODS)
+def test_workers_are_set_up_without_touching_the_parent(shuffled_times, start_method, monkeypatch):
+    preloads = []
+    monkeypatch.setattr(qimenpaipan.ephemeris, 'preload', lambda: preloads.append(os.getpid()))
+    config = worker_config()
+
+    parallel_run(shuffled_times[:10], workers=2, backend='skyfield', start_method=start_method)
+    assert os.getpid() not in preloads
+    assert worker_config() == config
+
+
+def test_empty_input():
+    assert parallel_run([]) == []
+    assert list(parallel_run([], ordered=False)) == []
+
+
+def test_plate_pickles_with_shared_template():
+    result = QiMenDunjiaPan('2024-11-19 20:00:00').run()
+    restored = pickle.loads(pickle.dumps(result.plate))
+    assert restored.template is result.plate.template
+    assert restored.to_dict() == chart_key(result)
@@ -0,0 +1,51 @@
+"""盘面模板：首次用到时生成，与逐步排盘一致，生成时不改动模块日志器"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+import qimenpaipan
+from qimenpaipan import PlateTemplate, QiMenDunjiaPan, get_plate_template
+
+
+def test_import_does_not_build_templates():
+    code = "import qimenpaipan; print(sum(t is not None for t in qimenpaipan._plate_templates))"
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(qimenpaipan.__file__)).stdout
+    assert output.split()[-1] == '0'
+
+
+def fields(template: PlateTemplate) -> tuple:
+    return tuple(getattr(template, name) for name in PlateTemplate.__slots__)
+
+
+@pytest.mark.parametrize('is_yang', [False, True])
+@pytest.mark.parametrize('ju_number', [1, 5, 9])
+def test_template_matches_step_by_step_arrangement(is_yang, ju_number):
+    for hour_gz in range(0, 60, 7):
+        pan = QiMenDunjiaPan.__new__(QiMenDunjiaPan)
+        pan._reset_plate()
+        pan.is_yang, pan.ju_number, pan.hour_gz = is_yang, ju_number, hour_gz
+        pan.arrange_earth_plate()
+        pan.arrange_sky_plate()
+        pan.arrange_doors()
+        pan.arrange_shen()
+        expected = PlateTemplate.from_palaces(
+            pan.palaces, pan.xunshou_ganzhi, pan.xunshou_original_pos, pan.zhishi_pos, pan.zhishi_men
+        )
+        template = get_plate_template(is_yang, ju_number, hour_gz)
+        assert fields(template) == fields(expected)
+        assert template is get_plate_template(is_yang, ju_number, hour_gz)
+
+
+def test_building_templates_leaves_logger_state_alone(monkeypatch):
+    monkeypatch.setattr(qimenpaipan, '_plate_templates', [None] * qimenpaipan.PLATE_TEMPLATE_COUNT)
+    monkeypatch.setattr(qimenpaipan.logger, 'disabled', True)
+    get_plate_template(True, 3, 11)
+    assert qimenpaipan.logger.disabled
+
+    monkeypatch.setattr(qimenpaipan.logger, 'disabled', False)
+    get_plate_template(False, 4, 12)
+    assert not qimenpaipan.logger.disabled
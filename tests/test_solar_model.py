@@ -0,0 +1,57 @@
+"""切比雪夫太阳黄经模型：记录拟合所用星历，星历后端在模型覆盖范围内用模型求黄经"""
+
+import numpy as np
+import pytest
+
+import qimenpaipan
+from qimenpaipan import AstronomyCalculator, AstronomyConfig, SkyfieldBackend, get_solar_model
+from solar_model import SolarLongitudeModel
+from conftest import requires_ephemeris
+
+START_TT = 2451545.0
+SEGMENT_DAYS = 32.0
+
+
+def linear_model(ephemeris: str) -> SolarLongitudeModel:
+    """黄经按每日1度线性增长的两段模型（便于与星历结果区分）"""
+    coefficients = np.array([[16.0, 16.0], [48.0, 16.0]])
+    return SolarLongitudeModel(START_TT, SEGMENT_DAYS, coefficients, max_error_degrees=0.0, ephemeris=ephemeris)
+
+
+@pytest.fixture
+def model_dir(tmp_path, monkeypatch):
+    """以临时目录为星历目录，并在前后重置已加载的模型"""
+    monkeypatch.setattr(AstronomyConfig, 'EPHEMERIS_DIR', str(tmp_path))
+    monkeypatch.setattr(qimenpaipan, '_solar_model', None)
+    monkeypatch.setattr(qimenpaipan, '_solar_model_checked', False)
+    return tmp_path
+
+
+def test_save_and_load_keep_ephemeris(tmp_path):
+    path = str(tmp_path / 'model.npz')
+    linear_model('de421.bsp').save(path)
+    assert SolarLongitudeModel.load(path).ephemeris == 'de421.bsp'
+
+
+@pytest.mark.parametrize('ephemeris', ['', 'de440s.bsp'])
+def test_model_from_other_ephemeris_is_ignored(model_dir, ephemeris):
+    linear_model(ephemeris).save(str(model_dir / AstronomyConfig.SOLAR_MODEL_FILE))
+    assert get_solar_model() is None
+
+
+@requires_ephemeris
+def test_sun_longitude_uses_model_within_range(model_dir, monkeypatch):
+    linear_model(AstronomyConfig.EPHEMERIS_FILE).save(str(model_dir / AstronomyConfig.SOLAR_MODEL_FILE))
+    calls = []
+    get_sun_longitude = AstronomyCalculator.get_sun_longitude
+    monkeypatch.setattr(AstronomyCalculator, 'get_sun_longitude',
+                        staticmethod(lambda t: calls.append(t) or get_sun_longitude(t)))
+
+    backend = SkyfieldBackend()
+    tt = START_TT + np.array([0.5, 10.0, 63.5])
+    np.testing.assert_allclose(backend.sun_longitude(tt), [0.5, 10.0, 63.5])
+    assert not calls
+
+    # 部分时刻超出模型范围时整批改用星历
+    backend.sun_longitude(np.append(tt, START_TT + 2 * SEGMENT_DAYS))
+    assert len(calls) == 1
@@ -0,0 +1,110 @@
+"""多线程并发：结果须与单线程一致，同一键（年份）只计算一次"""
+
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from jieqi_cache import SingleFlightCache
+from qimenpaipan import QiMenDunjiaPan, SkyfieldBackend
+from conftest import chart_key, requires_ephemeris
+
+THREAD_COUNT = 16
+YEARS = list(range(2020, 2026))
+
+
+def run_concurrently(task, items):
+    """所有线程在屏障处同时出发，返回各项结果（顺序与 items 一致）"""
+    barrier = threading.Barrier(len(items))
+
+    def start(item):
+        barrier.wait()
+        return task(item)
+
+    with ThreadPoolExecutor(max_workers=len(items)) as executor:
+        return list(executor.map(start, items))
+
+
+def counted_backend():
+    """新建星历后端（空缓存），返回 (后端, 各年份的求解次数)"""
+    backend = SkyfieldBackend()
+    solved = Counter()
+    solve_crossings = backend.solve_crossings
+
+    def counted(years, target_degrees, tolerance_seconds=None):
+        solved.update(set(int(year) for year in years))
+        return solve_crossings(years, target_degrees, tolerance_seconds)
+
+    backend.solve_crossings = counted
+    return backend, solved
+
+
+@requires_ephemeris
+def test_concurrent_jieqi_instants_match_serial_and_solve_each_year_once():
+    # 相邻线程请求的年份互相重叠
+    requests = [YEARS[i % len(YEARS):i % len(YEARS) + 2] for i in range(THREAD_COUNT)]
+    serial = SkyfieldBackend()
+    expected = [serial.jieqi_instants(years) for years in requests]
+
+    backend, solved = counted_backend()
+    results = run_concurrently(backend.jieqi_instants, requests)
+
+    for (times, indexes), (expected_times, expected_indexes) in zip(results, expected):
+        assert list(times) == list(expected_times)
+        assert list(indexes) == list(expected_indexes)
+    assert solved == Counter({year: 1 for year in YEARS})
+
+
+@requires_ephemeris
+def test_concurrent_find_jieqi_matches_serial():
+    samples = [datetime(YEARS[i % len(YEARS)], i % 12 + 1, 15, 12, tzinfo=timezone.utc) for i in range(THREAD_COUNT)]
+    serial = SkyfieldBackend()
+    expected = [(serial.find_jieqi(t), serial.find_jieqi(t, forward=False)) for t in samples]
+
+    backend, solved = counted_backend()
+    results = run_concurrently(lambda t: (backend.find_jieqi(t), backend.find_jieqi(t, forward=False)), samples)
+
+    assert results == expected
+    assert max(solved.values()) == 1
+
+
+@requires_ephemeris
+def test_concurrent_charts_match_serial():
+    samples = [f'{YEARS[i % len(YEARS)]}-{i % 12 + 1:02d}-15 {i % 24:02d}:00:00' for i in range(THREAD_COUNT)]
+    expected = [chart_key(QiMenDunjiaPan(sample, backend='skyfield').run()) for sample in samples]
+
+    backend = SkyfieldBackend()
+    results = run_concurrently(lambda sample: chart_key(QiMenDunjiaPan(sample, backend=backend).run()), samples)
+
+    assert results == expected
+
+
+def test_single_flight_cache_computes_each_key_once():
+    cache = SingleFlightCache()
+    computed = Counter()
+    lock = threading.Lock()
+
+    def compute(keys):
+        time.sleep(0.01)  # 拉长计算时间，使各线程的未命中相互重叠
+        with lock:
+            computed.update(keys)
+        return {key: key * key for key in keys}
+
+    requests = [list(range(i % 4, i % 4 + 5)) for i in range(THREAD_COUNT)]
+    results = run_concurrently(lambda keys: cache.get_many(keys, compute), requests)
+
+    for keys, result in zip(requests, results):
+        assert result == {key: key * key for key in keys}
+    assert computed == Counter({key: 1 for key in range(8)})
+
+
+def test_bounded_single_flight_cache_matches_serial():
+    cache = SingleFlightCache(maxsize=4)
+    requests = [[(i * 3 + j) % 10 for j in range(3)] for i in range(THREAD_COUNT)]
+
+    results = run_concurrently(lambda keys: cache.get_many(keys, lambda missing: {k: -k for k in missing}), requests)
+
+    for keys, result in zip(requests, results):
+        assert result == {key: -key for key in keys}
+    assert len(cache) <= 4
@@ -0,0 +1,56 @@
+"""进程池内存：每个工作进程的内存不随进程数增长，星历映射由各进程共享"""
+
+import multiprocessing
+import os
+
+import pytest
+
+import qimenpaipan
+from qimenpaipan import worker_config
+from worker_memory import init_memory_worker, memory_worker_chart
+from conftest import requires_ephemeris
+
+WORKER_COUNTS = (1, 2, 4)
+
+# 允许的波动：比例与绝对值（MB）
+GROWTH_RATIO = 1.25
+SLACK_MB = 8.0
+
+pytestmark = [
+    pytest.mark.skipif(not os.path.exists('/proc/self/smaps'), reason="需要 Linux /proc/self/smaps"),
+    requires_ephemeris,
+]
+
+
+def pool_memory(count: int, start_method: str) -> dict:
+    """启动 count 个工作进程各自排盘，返回 {进程号: 内存占用}"""
+    context = multiprocessing.get_context(start_method)
+    samples = [f'{year}-06-15 12:00:00' for year in range(1990, 1990 + 8 * count)]
+    with context.Pool(count, initializer=init_memory_worker, initargs=(worker_config(),)) as pool:
+        return dict(pool.map(memory_worker_chart, samples, chunksize=1))
+
+
+def mean(memory: dict, field: str) -> float:
+    return sum(m[field] for m in memory.values()) / len(memory)
+
+
+@pytest.mark.parametrize('start_method', [
+    method for method in ('fork', 'spawn') if method in multiprocessing.get_all_start_methods()
+])
+def test_worker_memory_stays_flat(start_method):
+    if start_method == 'fork':
+        # fork 的子进程继承父进程已映射的星历
+        qimenpaipan.init_worker(backend='skyfield')
+
+    usage = {count: pool_memory(count, start_method) for count in WORKER_COUNTS}
+    single = usage[1]
+
+    for count, memory in usage.items():
+        # 每个工作进程的驻留内存、私有内存不随进程数增长
+        for field in ('rss', 'private'):
+            limit = mean(single, field) * GROWTH_RATIO + SLACK_MB
+            assert mean(memory, field) <= limit, (count, field, mean(memory, field), limit)
+
+        # 星历映射各进程共享：按共享进程数分摊后的合计不超过单个进程的驻留量
+        shared = sum(m['ephemeris_pss'] for m in memory.values())
+        assert shared <= max(m['ephemeris_rss'] for m in single.values()) * 1.1 + 1.0, (count, shared)
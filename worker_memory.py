@@ -0,0 +1,61 @@
+"""
+进程内存统计
+
+主要功能：
+1. process_memory()：读取 Linux /proc/self/smaps，统计进程的驻留、分摊、私有内存及星历映射的占用
+2. 进程池工作进程的初始化与排盘任务（返回进程号与内存占用），供基准测试和内存测试共用
+
+作者：redrockhorse
+"""
+
+from datetime import timedelta
+from typing import Dict, Tuple
+import logging
+import os
+
+from qimenpaipan import AstronomyCalculator, AstronomyConfig, QiMenDunjiaPan, init_worker
+
+
+def process_memory() -> Dict[str, float]:
+    """
+    当前进程的内存占用（MB，读取 Linux /proc/self/smaps）
+
+    Returns:
+        dict: rss / pss 为进程全部驻留内存及按共享进程数分摊后的内存；private 为进程私有内存；
+              ephemeris_rss / ephemeris_pss 为星历文件映射的驻留内存及按共享进程数分摊后的内存
+    """
+    ephemeris_path = os.path.realpath(
+        os.path.join(AstronomyConfig.EPHEMERIS_DIR, AstronomyConfig.EPHEMERIS_FILE)
+    )
+    memory = {'rss': 0.0, 'pss': 0.0, 'private': 0.0, 'ephemeris_rss': 0.0, 'ephemeris_pss': 0.0}
+    in_ephemeris = False
+
+    with open('/proc/self/smaps') as f:
+        for line in f:
+            fields = line.split()
+            if not line[0].isupper():
+                # 映射区头部：地址范围 权限 偏移 设备 inode [路径]
+                in_ephemeris = len(fields) >= 6 and os.path.realpath(fields[5]) == ephemeris_path
+            elif fields[0] in ('Private_Clean:', 'Private_Dirty:'):
+                memory['private'] += int(fields[1]) / 1024
+            elif fields[0] in ('Rss:', 'Pss:'):
+                name = fields[0][:-1].lower()
+                memory[name] += int(fields[1]) / 1024
+                if in_ephemeris:
+                    memory['ephemeris_' + name] += int(fields[1]) / 1024
+
+    return memory
+
+
+def init_memory_worker(config: Dict):
+    """工作进程初始化：关闭排盘日志后按父进程配置初始化（星历后端，预加载星历）"""
+    logging.getLogger().setLevel(logging.WARNING)
+    init_worker(config, backend='skyfield')
+
+
+def memory_worker_chart(sample: str) -> Tuple[int, Dict[str, float]]:
+    """工作进程：排一盘并观测一年的太阳黄经（访问星历段），返回进程号与内存占用"""
+    QiMenDunjiaPan(sample, backend='skyfield').run()
+    start = QiMenDunjiaPan.parse_input(sample)
+    AstronomyCalculator.sun_longitudes([start + timedelta(days=day) for day in range(0, 366, 5)], backend='skyfield')
+    return os.getpid(), process_memory()